@@ -40,11 +40,17 @@ setup(
         "requests==2.31.0",
         "numpy==1.26.4",
         "pandas==2.2.1",
+        "pyarrow==15.0.2",
         "prometheus-client==0.20.0",
         "pytest==8.1.1",
         "httpx==0.27.0",
         "loguru==0.7.0",
 
+        # 응답 직렬화 / 압축 (없으면 json / JSON 응답 / gzip 으로 대체)
+        "orjson==3.8.3",
+        "msgpack==1.0.8",
+        "brotli==1.1.0",
+
         # 의존성 해결
         "jsonpatch==1.33",
         "packaging==23.2",
@@ -58,7 +64,8 @@ setup(
     entry_points={
         "console_scripts": [
             "rag-server=main:app",
-            "rag-load-wiki=scripts.load_wiki_data:load_wiki_data"
+            "rag-load-wiki=scripts.load_wiki_data:load_wiki_data",
+            "rag-snapshot=scripts.snapshot:main"
         ],
     }
 ) 
\ No newline at end of file
@@ -0,0 +1,124 @@
+"""
+적응형 검색 노력 오프라인 평가: 고정 nprobe vs AdaptiveSearchPolicy
+
+    python -m benchmarks.bench_adaptive_search --queries queries.txt --limit 5 --fixed-nprobe 10 \
+        --levels 8,32,128 --min-margin 0.05
+
+--queries 가 없으면 collection 에 저장된 문서 앞부분을 질의로 쓴다.
+정답은 nprobe = nlist (IVF_FLAT 전체 탐색) 결과이고, 질의 임베딩 시간은 제외한 검색 시간만 잰다.
+"""
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import time
+
+from loguru import logger
+
+from services.adaptive_search import AdaptiveSearchPolicy, adaptive_search
+from services.embedding import EmbeddingService
+from services.milvus import MilvusService, SearchProjection
+
+
+def load_queries(milvus_service: MilvusService,
+                 path: str,
+                 num_samples: int,
+                 seed: int = 0
+                 ):
+    if path:
+        with open(path, encoding="utf-8") as f:
+            return [line.strip() for line in f if line.strip()]
+
+    texts = []
+    for rows in milvus_service.iterate_documents(output_fields=["text"]):
+        texts.extend(row["text"][:200] for row in rows)
+    random.Random(seed).shuffle(texts)
+    return texts[:num_samples]
+
+
+async def evaluate(milvus_service: MilvusService,
+                   query_embeddings,
+                   limit: int,
+                   fixed_nprobe: int,
+                   policy: AdaptiveSearchPolicy,
+                   exact_nprobe: int
+                   ):
+    async def search(query_embedding, nprobe, search_limit):
+        return await milvus_service.search_documents(
+            query_embedding=query_embedding,
+            limit=search_limit,
+            projection=SearchProjection.ids,
+            nprobe=nprobe
+        )
+
+    stats = {name: {"latency": [], "recall": [], "nprobe": []} for name in ("fixed", "adaptive")}
+    reasons = {}
+    for query_embedding in query_embeddings:
+        truth = {hit["id"] for hit in await search(query_embedding, exact_nprobe, limit)}
+        if not truth:
+            continue
+
+        start = time.perf_counter()
+        fixed = await search(query_embedding, fixed_nprobe, limit)
+        stats["fixed"]["latency"].append(time.perf_counter() - start)
+        stats["fixed"]["recall"].append(len(truth & {hit["id"] for hit in fixed}) / len(truth))
+        stats["fixed"]["nprobe"].append(fixed_nprobe)
+
+        start = time.perf_counter()
+        result = await adaptive_search(
+            lambda nprobe, search_limit: search(query_embedding, nprobe, search_limit), limit, policy
+        )
+        stats["adaptive"]["latency"].append(time.perf_counter() - start)
+        stats["adaptive"]["recall"].append(len(truth & {hit["id"] for hit in result.documents}) / len(truth))
+        stats["adaptive"]["nprobe"].append(result.nprobe)
+        reasons[result.reason] = reasons.get(result.reason, 0) + 1
+
+    return stats, reasons
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--collection", default=None, help="기본값: CFG.milvus_collection")
+    parser.add_argument("--queries", default=None, help="한 줄에 질의 하나인 파일")
+    parser.add_argument("--samples", type=int, default=200, help="--queries 가 없을 때 문서에서 뽑을 질의 수")
+    parser.add_argument("--limit", type=int, default=5)
+    parser.add_argument("--fixed-nprobe", type=int, default=10)
+    parser.add_argument("--levels", default="8,32,128")
+    parser.add_argument("--min-score", type=float, default=None)
+    parser.add_argument("--min-margin", type=float, default=0.05)
+    args = parser.parse_args()
+
+    logger.remove()
+    logger.add(os.devnull, level="INFO")
+
+    milvus_service = MilvusService(collection_name=args.collection)
+    milvus_service.load()
+    exact_nprobe = milvus_service.stats()["nlist"] or 65536
+    queries = load_queries(milvus_service, args.queries, args.samples)
+    query_embeddings = EmbeddingService().encode_documents(queries)
+
+    policy = AdaptiveSearchPolicy(
+        levels=[int(level) for level in args.levels.split(",")],
+        min_score=args.min_score,
+        min_margin=args.min_margin
+    )
+    stats, reasons = asyncio.run(
+        evaluate(milvus_service, query_embeddings, args.limit, args.fixed_nprobe, policy, exact_nprobe)
+    )
+
+    print(f"queries={len(stats['fixed']['recall'])} limit={args.limit} exact_nprobe={exact_nprobe}")
+    print(f"{'mode':<10}{'recall@k':>10}{'mean ms':>10}{'p95 ms':>10}{'mean nprobe':>13}")
+    for name, values in stats.items():
+        latencies = sorted(values["latency"])
+        p95 = latencies[int(0.95 * (len(latencies) - 1))] if latencies else 0.0
+        print(
+            f"{name:<10}{statistics.fmean(values['recall'] or [0]):>10.3f}"
+            f"{statistics.fmean(latencies or [0]) * 1000:>10.2f}{p95 * 1000:>10.2f}"
+            f"{statistics.fmean(values['nprobe'] or [0]):>13.1f}"
+        )
+    print(f"stop reasons: {reasons}")
+
+
+if __name__ == "__main__":
+    main()
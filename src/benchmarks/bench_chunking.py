@@ -0,0 +1,121 @@
+"""
+문서 분할 처리량 벤치마크: 기존 공백 기반 _split_text vs TokenChunker
+
+    python -m benchmarks.bench_chunking --model <embedding model> --docs 500
+
+- 처리량 (docs/s, MB/s)
+- max_seq_length 를 넘어 모델에서 잘려 사라지는 토큰 수
+- stride=0 일 때 chunk 토큰을 이어붙이면 문서 토큰과 같음 (유실 토큰 없음) 검증
+"""
+import argparse
+import random
+import time
+from typing import List
+
+from transformers import AutoTokenizer
+from services.chunker import TokenChunker
+
+
+# ---- 기존 EmbeddingService._split_text (문자 수 기준) ---- #
+def legacy_split_text(text: str, max_seq_length: int) -> List[str]:
+    words = text.split()
+    chunks = []
+    current_chunk = []
+    current_length = 0
+
+    for word in words:
+        word_length = len(word)
+        if current_length + len(word) + 1 > max_seq_length:
+            if current_chunk:
+                chunks.append(' '.join(current_chunk))
+            current_chunk = [word]
+            current_length = word_length
+        else:
+            current_chunk.append(word)
+            current_length += word_length + 1
+
+    if current_chunk:
+        chunks.append(" ".join(current_chunk))
+
+    return chunks if chunks else [text]
+
+
+def make_corpus(num_docs: int, seed: int = 0) -> List[str]:
+    rng = random.Random(seed)
+    syllables = [chr(c) for c in range(0xAC00, 0xAC00 + 400)]
+    docs = []
+    for _ in range(num_docs):
+        # 띄어쓰기가 드문 한국어 문서를 흉내낸다 (어절 길이 2~20자)
+        words = [
+            "".join(rng.choices(syllables, k=rng.randint(2, 20)))
+            for _ in range(rng.randint(100, 1000))
+        ]
+        docs.append(" ".join(words))
+    return docs
+
+
+def count_tokens(tokenizer, texts: List[str]) -> List[int]:
+    encoded = tokenizer(texts, add_special_tokens=False, verbose=False)
+    return [len(ids) for ids in encoded["input_ids"]]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--model", required=True, help="embedding model (fast tokenizer)")
+    parser.add_argument("--max-seq-length", type=int, default=512)
+    parser.add_argument("--stride", type=int, default=0)
+    parser.add_argument("--docs", type=int, default=500)
+    args = parser.parse_args()
+
+    tokenizer = AutoTokenizer.from_pretrained(args.model, use_fast=True)
+    chunker = TokenChunker(tokenizer, args.max_seq_length, args.stride)
+    docs = make_corpus(args.docs)
+    total_mb = sum(len(doc.encode("utf-8")) for doc in docs) / 1e6
+
+    # legacy: 분할 후 모델 입력을 위한 토큰화까지 (실제 임베딩 경로와 동일한 비용)
+    start = time.perf_counter()
+    legacy_chunks = [legacy_split_text(doc, args.max_seq_length) for doc in docs]
+    legacy_flat = [chunk for chunks in legacy_chunks for chunk in chunks]
+    legacy_lengths = count_tokens(tokenizer, legacy_flat)
+    legacy_elapsed = time.perf_counter() - start
+
+    # token: 토큰 id 가 바로 모델 입력이 된다
+    start = time.perf_counter()
+    token_chunks = chunker.split_batch(docs)
+    token_elapsed = time.perf_counter() - start
+
+    num_special = tokenizer.num_special_tokens_to_add(pair=False)
+    token_lengths = [
+        len(chunk.input_ids) - num_special
+        for chunks in token_chunks for chunk in chunks
+    ]
+
+    legacy_lost = sum(max(0, n - chunker.window) for n in legacy_lengths)
+    token_lost = sum(max(0, n - chunker.window) for n in token_lengths)
+
+    print(f"docs={len(docs)} size={total_mb:.1f}MB window={chunker.window} stride={args.stride}")
+    print(f"{'splitter':<10}{'sec':>8}{'docs/s':>10}{'MB/s':>8}{'chunks':>8}{'avg tok':>9}{'lost tok':>10}")
+    for name, elapsed, lengths, lost in (
+        ("legacy", legacy_elapsed, legacy_lengths, legacy_lost),
+        ("token", token_elapsed, token_lengths, token_lost),
+    ):
+        print(
+            f"{name:<10}{elapsed:>8.3f}{len(docs) / elapsed:>10.1f}{total_mb / elapsed:>8.2f}"
+            f"{len(lengths):>8}{sum(lengths) / len(lengths):>9.1f}{lost:>10}"
+        )
+
+    if args.stride == 0:
+        doc_ids = tokenizer(docs, add_special_tokens=False, verbose=False)["input_ids"]
+        for ids, chunks in zip(doc_ids, token_chunks):
+            rebuilt = [
+                token
+                for chunk in chunks
+                for token in tokenizer.convert_tokens_to_ids(
+                    tokenizer.convert_ids_to_tokens(chunk.input_ids, skip_special_tokens=True)
+                )
+            ]
+            assert rebuilt == ids, "chunk tokens do not cover the document"
+        print(f"coverage ok: {sum(map(len, doc_ids))} tokens, 0 lost")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""
+VLLMService 프롬프트 검증 CPU 시간 벤치마크: 프롬프트별 반복 토큰화 vs 배치 토큰화
+
+    python -m benchmarks.bench_validate_batch --model <vLLM model> --prompts 1000
+
+legacy 는 기존 _call/_validate_batch 경로를 그대로 흉내낸다.
+    _count_tokens -> _validate_and_truncate_prompt (재토큰화, 잘라낼 때 한 번 더) ->
+    info 로그에 프롬프트 전체 출력 -> vLLM 엔진의 재토큰화
+batched 는 한 번의 fast tokenizer 호출로 얻은 토큰 id 를 그대로 엔진에 넘긴다.
+"""
+import argparse
+import os
+import random
+import time
+
+from loguru import logger
+from transformers import AutoTokenizer
+
+
+def make_prompts(num_prompts: int, seed: int = 0):
+    rng = random.Random(seed)
+    syllables = [chr(c) for c in range(0xAC00, 0xAC00 + 400)]
+
+    def sentence(num_words):
+        return " ".join("".join(rng.choices(syllables, k=rng.randint(2, 6))) for _ in range(num_words))
+
+    header = "다음 문서들을 참고하여 질문에 답변해주세요.\n\n"
+    prompts = []
+    for _ in range(num_prompts):
+        docs = "".join(f"문서 {i + 1}:\n{sentence(rng.randint(100, 600))}\n\n" for i in range(3))
+        prompts.append(header + docs + f"질문: {sentence(12)}?\n\n답변:")
+    return prompts
+
+
+# ---- 기존 구현 ---- #
+def legacy_validate(tokenizer, prompts, token_limit):
+    validated = []
+    for prompt in prompts:
+        len(tokenizer.encode(prompt))                   # _count_tokens
+        token_count = len(tokenizer.encode(prompt))     # _validate_and_truncate_prompt
+        if token_count > token_limit:
+            tokens = tokenizer.encode(prompt)[:token_limit]
+            prompt = tokenizer.decode(tokens)
+            logger.info(f"Truncated prompt: {prompt}")
+        else:
+            logger.info(f"Prompt: {prompt}")
+        tokenizer.encode(prompt)                        # vLLM 엔진 토큰화
+        validated.append(prompt)
+    return validated
+
+
+# ---- 배치 구현 (VLLMService._validate_batch 와 동일) ---- #
+def batched_validate(tokenizer, prompts, token_limit):
+    encoded = tokenizer(prompts, return_attention_mask=False, verbose=False)["input_ids"]
+    validated = []
+    for token_ids in encoded:
+        if len(token_ids) > token_limit:
+            head = token_ids[:1] if token_ids and token_ids[0] == tokenizer.bos_token_id else []
+            token_ids = head + token_ids[len(token_ids) - (token_limit - len(head)):]
+        validated.append(token_ids)
+    logger.debug(f"Validated {len(prompts)} prompts")
+    return validated
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--model", required=True, help="vLLM model tokenizer")
+    parser.add_argument("--prompts", type=int, default=1000)
+    parser.add_argument("--token-limit", type=int, default=1024)
+    args = parser.parse_args()
+
+    # 로그 I/O 비용은 포함하되 화면 출력은 하지 않는다
+    logger.remove()
+    logger.add(os.devnull, level="INFO")
+
+    tokenizer = AutoTokenizer.from_pretrained(args.model, use_fast=True)
+    prompts = make_prompts(args.prompts)
+
+    timings = {}
+    for name, fn in (("legacy", legacy_validate), ("batched", batched_validate)):
+        cpu_start, wall_start = time.process_time(), time.perf_counter()
+        fn(tokenizer, prompts, args.token_limit)
+        timings[name] = (time.process_time() - cpu_start, time.perf_counter() - wall_start)
+
+    scale = 1000 / len(prompts)
+    print(f"prompts={len(prompts)} token_limit={args.token_limit}")
+    print(f"{'path':<10}{'cpu s/1k':>10}{'wall s/1k':>11}")
+    for name, (cpu, wall) in timings.items():
+        print(f"{name:<10}{cpu * scale:>10.3f}{wall * scale:>11.3f}")
+    saved = (timings["legacy"][0] - timings["batched"][0]) * scale
+    print(f"cpu saved per 1k prompts: {saved:.3f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,18 @@
+"""
+RAG 프롬프트 템플릿
+
+vLLM prefix caching 이 최대한 적중하도록 변하지 않는 내용을 앞에 둔다.
+    1. 지시문 (모든 요청 공통)
+    2. 참고 문서 (문서 id 순의 정해진 순서)
+    3. 질문 (요청마다 다름)
+문구는 자유롭게 수정해도 되지만, 질문은 항상 마지막에 두어야 한다.
+"""
+
+RAG_SYSTEM_PROMPT = "다음 문서들을 참고하여 질문에 답변해주세요.\n\n"
+
+RAG_DOCUMENT_TEMPLATE = "문서 {index}:\n{context}\n\n"
+
+RAG_QUESTION_TEMPLATE = "질문: {question}\n\n답변:"
+
+# 대화 session: 이전 턴의 프롬프트 + 답변 뒤에 새 문서와 질문을 덧붙인다 (prefix 는 그대로)
+RAG_TURN_SEPARATOR = "\n\n"
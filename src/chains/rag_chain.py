@@ -1,28 +1,47 @@
 from langchain.chains import RetrievalQA
 from langchain.prompts import PromptTemplate
-from services.vllm import VLLMService
+from services.vllm import VLLMService, GenerationParams
 from services.document import DocumentService
-from typing import Dict, Any, List
+from chains.prompts import RAG_SYSTEM_PROMPT, RAG_DOCUMENT_TEMPLATE, RAG_QUESTION_TEMPLATE, RAG_TURN_SEPARATOR
+from services.tracing import span
+from services.cache import LRUCache
+from services.session import InvalidSessionError, Session, SessionStore
+from services.metrics import SESSION_RETRIEVAL
+from typing import Dict, Any, List, Optional
 from loguru import logger
 from utils.config import CFG
 
 
 class RAGChain:
     # ---- RAG (Retrieval Augmented Generation) 체인 ---- #
-    def __init__(self):
-        self.llm_service = VLLMService()
-        self.document_service = DocumentService()
+    def __init__(self, 
+                 llm_service=None, 
+                 document_service: Optional[DocumentService] = None,
+                 answer_cache: Optional[LRUCache] = None,
+                 session_store: Optional[SessionStore] = None
+                 ):
+        # llm_service: VLLMService 또는 RemoteLLMService (generation router 사용 시)
+        self.llm_service = llm_service or VLLMService()
+        self.document_service = document_service or DocumentService()
+        self.answer_cache = answer_cache    # 문서가 바뀌면 호출 측에서 clear()
+        self.session_store = session_store
         self.max_context_length = CFG.max_seq_length
+        self._system_prompt_tokens: Optional[int] = None
         
     # ---- 텍스트 길이 제한 ---- #
     def _truncate_context(self, 
                           text: str, 
                           max_length: int
                           ) -> str:
-        if len(text) > max_length:
+        if len(text) <= max_length:
             return text
         return text[:max_length] + "..."
 
+    # ---- prefix cache 를 위한 문서 정렬 ---- #
+    def _canonical_order(self, documents: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        # 검색 점수 순서와 무관하게 같은 문서 집합은 항상 같은 prompt prefix 를 갖도록 id 순 정렬
+        return sorted(documents, key=lambda doc: str(doc.get("id", "")))
+
     def _create_prompt(self,
                        question: str,
                        contexts: List[str]
@@ -30,41 +49,46 @@ class RAGChain:
         """
         Context 기반 프롬프트 생성
         
+        지시문 -> 문서 -> 질문 순서로 고정해 요청 간 공통 prefix 가 vLLM prefix cache 에 적중하도록 한다.
+        
         Args:
             question (str): 사용자 질문
-            contexts (List[str]): 관련 문서 목록
+            contexts (List[str]): 관련 문서 목록 (정해진 순서로 정렬된 상태)
             
         Returns:
             str: 프롬프트
             
         """
-        # 각 컨텍스트 길이 제한
-        truncated_contexts = [
-            self._truncate_context(context, self.max_context_length)
-            for context in contexts
-        ]
-        
         # 컨텍스트 결합
-        context_text = "\n\n".join(
-            f"문서 {i+1}:\n{context}"
-            for i, context in enumerate(truncated_contexts)
-        )
+        context_text = self._format_contexts(contexts)
         
         # 프롬프트 템플릿
-        prompt = f"""다음 문서들을 참고하여 질문에 답변해주세요.
-
-{context_text}
+        return RAG_SYSTEM_PROMPT + context_text + RAG_QUESTION_TEMPLATE.format(question=question)
 
-질문: {question}
 
-답변:"""
-        
-        return prompt
+    def _format_contexts(self,
+                         contexts: List[str],
+                         start: int = 1
+                         ) -> str:
+        # 각 컨텍스트 길이 제한 후 번호를 붙여 결합
+        return "".join(
+            RAG_DOCUMENT_TEMPLATE.format(
+                index=start + i, 
+                context=self._truncate_context(context, self.max_context_length)
+            )
+            for i, context in enumerate(contexts)
+        )
 
 
     async def query(self,
                     question: str,
-                    max_docs: int = 3
+                    max_docs: int = 3,
+                    params: Optional[GenerationParams] = None,
+                    mmr: bool = False,
+                    fetch_k: Optional[int] = None,
+                    lambda_mult: float = 0.5,
+                    duplicate_threshold: Optional[float] = None,
+                    session_id: Optional[str] = None
                     ) -> Dict[str, Any]:
         """
         질문에 대한 RAG 처리
@@ -72,28 +96,64 @@ class RAGChain:
         Args:
             question (str): 사용자 질문
             max_docs (int): 검색할 최대 문서 수
+            params (Optional[GenerationParams]): 생성 파라미터 (기본값: CFG)
+            mmr (bool): MMR 로 중복이 적은 문서를 고를지 여부
+            fetch_k (Optional[int]): MMR 후보 수
+            lambda_mult (float): MMR 관련도 가중치
+            duplicate_threshold (Optional[float]): 이 cosine 유사도 이상인 중복 문서 제외
+            session_id (Optional[str]): 대화 session id (이전 턴의 문서 / 프롬프트를 이어서 사용)
             
         Returns:
             Dict[str, Any]: 응답 및 참조 문서
         """
+        if session_id is not None and self.session_store is not None:
+            # 다음 턴 프롬프트에 이어 붙일 답변은 하나여야 한다
+            if params is not None and params.n > 1:
+                raise InvalidSessionError("Session queries generate a single answer (n must be 1)")
+            session = self.session_store.get_or_create(session_id)
+            async with session.lock:
+                return await self._session_query(
+                    session, question, max_docs, params, mmr, fetch_k, lambda_mult, duplicate_threshold
+                )
+        
+        # n > 1 샘플링은 매번 다른 답을 원하는 요청이므로 캐시하지 않는다
+        cache_key = None
+        if self.answer_cache is not None and (params is None or params.n == 1):
+            cache_key = (
+                question, max_docs, params.json() if params else None, 
+                mmr, fetch_k, lambda_mult, duplicate_threshold
+            )
+            cached = self.answer_cache.get(cache_key)
+            if cached is not None:
+                return cached
+        
         try:
             # ---- 1. 관련 문서 검색 ---- #
-            relevant_docs = await self.document_service.search_similar_documents(
-                query=question, 
-                limit=max_docs
-            )
+            with span("rag.retrieve", max_docs=max_docs, mmr=mmr):
+                relevant_docs = await self.document_service.search_similar_documents(
+                    query=question, 
+                    limit=max_docs,
+                    mmr=mmr,
+                    fetch_k=fetch_k,
+                    lambda_mult=lambda_mult,
+                    duplicate_threshold=duplicate_threshold
+                )
             
             # ---- 2. 문서 컨텍스트 추출 ---- #
-            contexts = [doc['text'] for doc in relevant_docs]
+            contexts = [doc['text'] for doc in self._canonical_order(relevant_docs)]
             
             # ---- 3. 프롬프트 생성 ---- #
-            prompt = self._create_prompt(question, contexts)
+            with span("rag.build_prompt", documents=len(contexts)) as current:
+                prompt = self._create_prompt(question, contexts)
+                if current:
+                    current.set_attribute("prompt_chars", len(prompt))
             
             # ---- 4. LLM으로 질문에 대한 답변 생성 ---- #
-            responses = await self.llm_service.agenerate([prompt])
+            with span("rag.generate"):
+                responses = await self.llm_service.agenerate([prompt], params)
             response = responses[0] if responses else ""
             
-            return {
+            result = {
                 "answer": response, 
                 "context": contexts,
                 "metadata": {
@@ -101,17 +161,137 @@ class RAGChain:
                     "question": question,
                 }
             }
+            if cache_key is not None:
+                self.answer_cache.put(cache_key, result)
+            
+            return result
         
         except Exception as e:
             logger.error(f"RAGChain error: {str(e)}")
             raise e
+
+
+    # ---- 대화 session 턴 ---- #
+    async def _session_query(self,
+                             session: Session,
+                             question: str,
+                             max_docs: int,
+                             params: Optional[GenerationParams],
+                             mmr: bool,
+                             fetch_k: Optional[int],
+                             lambda_mult: float,
+                             duplicate_threshold: Optional[float]
+                             ) -> Dict[str, Any]:
+        """
+        이전 턴의 문서 (working set) 로 답할 수 있으면 Milvus 검색을 건너뛰고,
+        프롬프트는 이전 턴의 프롬프트 + 답변 뒤에 새 문서와 질문만 덧붙여 prefix cache 가 턴 사이에 적중하게 한다.
+        생성 길이를 뺀 프롬프트 토큰 한도 (llm_service.prompt_token_budget) 를 넘으면 오래된 턴부터 통째로 버린다.
+        답변은 대화 맥락에 따라 달라지므로 answer cache 는 사용하지 않는다.
+        """
+        # 재임베딩으로 모델이 바뀌면 이전 모델의 working set 과 비교하지 않도록 처음부터
+        embedding_model = self.document_service.embedding_service.model_name
+        if session.embedding_model != embedding_model:
+            if session.embedding_model is not None:
+                session.reset()
+            session.embedding_model = embedding_model
+        epoch = session.epoch
+        session.stale.clear()
+        try:
+            # ---- 1. working set 확인 후 필요할 때만 검색 ---- #
+            with span("rag.retrieve", max_docs=max_docs, mmr=mmr, session=True) as current:
+                query_embedding = await self.document_service.embed_query(question)
+                relevant_docs = None
+                # 질의를 임베딩하는 사이 모델이 바뀌었으면 working set 과 비교하지 않고 검색
+                if self.document_service.embedding_service.model_name == embedding_model:
+                    relevant_docs = session.match(query_embedding, max_docs, CFG.session_reuse_threshold)
+                source = "working_set" if relevant_docs is not None else "search"
+                if relevant_docs is None:
+                    relevant_docs = await self.document_service.search_similar_documents(
+                        query=question,
+                        limit=max_docs,
+                        mmr=mmr,
+                        fetch_k=fetch_k,
+                        lambda_mult=lambda_mult,
+                        duplicate_threshold=duplicate_threshold,
+                        with_embeddings=True,
+                        query_embedding=query_embedding,
+                        embedding_model=embedding_model
+                    )
+                if current:
+                    current.set_attribute("source", source)
+            if session.turns > 0:
+                SESSION_RETRIEVAL.labels(source=source).inc()
+            
+            # ---- 2. 이전 프롬프트 뒤에 새 문서와 질문 추가 (append-only) ---- #
+            with span("rag.build_prompt", documents=len(relevant_docs), session=True) as current:
+                budget = self.llm_service.prompt_token_budget(params)
+                trimmed = 0
+                while True:
+                    new_docs = self._canonical_order(session.missing(relevant_docs))
+                    turn = (
+                        self._format_contexts([doc["text"] for doc in new_docs], start=session.next_index)
+                        + RAG_QUESTION_TEMPLATE.format(question=question)
+                    )
+                    [turn_tokens] = self.llm_service.count_tokens([turn])
+                    if not session.history or self._system_tokens() + session.tokens + turn_tokens <= budget:
+                        break
+                    # 토큰 한도를 넘으면 오래된 턴부터 통째로 버림 (버린 턴의 문서가 필요하면 이번 턴에 다시 들어감)
+                    session.drop_oldest_turn()
+                    trimmed += 1
+                if trimmed:
+                    logger.info(f"Session {session.session_id} dropped {trimmed} oldest turns to fit {budget} prompt tokens")
+                prompt = RAG_SYSTEM_PROMPT + session.transcript + turn
+                if current:
+                    current.set_attribute("prompt_tokens", self._system_tokens() + session.tokens + turn_tokens)
+                    current.set_attribute("new_documents", len(new_docs))
+                    current.set_attribute("trimmed_turns", trimmed)
+            
+            # ---- 3. 답변 생성 ---- #
+            with span("rag.generate"):
+                responses = await self.llm_service.agenerate([prompt], params)
+            response = responses[0] if responses else ""
+            
+            # 턴 진행 중 working set (→ reset) 이나 이번 턴 문서가 수정 / 삭제됐으면 이번 턴은 기록하지 않음
+            answered = response + RAG_TURN_SEPARATOR
+            if session.epoch == epoch and not session.stale & {doc["id"] for doc in relevant_docs}:
+                [answer_tokens] = self.llm_service.count_tokens([answered])
+                session.add_turn(turn + answered, turn_tokens + answer_tokens, new_docs)
+            else:
+                logger.info(f"Session {session.session_id} documents changed during the turn, not recording it")
+                session.turns += 1
+            
+            contexts = [doc["text"] for doc in self._canonical_order(relevant_docs)]
+            return {
+                "answer": response,
+                "context": contexts,
+                "metadata": {
+                    "num_docs": len(contexts),
+                    "question": question,
+                    "session_id": session.session_id,
+                    "turn": session.turns,
+                    "retrieval": source,
+                }
+            }
         
+        except Exception as e:
+            logger.error(f"RAGChain session error: {str(e)}")
+            raise e
         
+        finally:
+            session.stale.clear()
+
+
+    # ---- 지시문 토큰 수 (session 프롬프트 한도 계산용, 한 번만 셈) ---- #
+    def _system_tokens(self) -> int:
+        if self._system_prompt_tokens is None:
+            [self._system_prompt_tokens] = self.llm_service.count_tokens([RAG_SYSTEM_PROMPT])
+        return self._system_prompt_tokens
 
 
     async def batch_query(self,
                           questions: List[str],
-                          max_docs: int = 3
+                          max_docs: int = 3,
+                          params: Optional[GenerationParams] = None
                           ) -> List[Dict[str, Any]]:
         """
         여러 질문에 대한 RAG 처리
@@ -119,6 +299,7 @@ class RAGChain:
         Args:
             questions (List[str]): 질문 목록
             max_docs (int): 검색할 최대 문서 수
+            params (Optional[GenerationParams]): 생성 파라미터 (기본값: CFG)
             
         Returns:
             List[Dict[str, Any]]: 응답 및 참조 문서
@@ -128,7 +309,8 @@ class RAGChain:
             for question in questions:
                 result = await self.query(
                     question=question, 
-                    max_docs=max_docs
+                    max_docs=max_docs,
+                    params=params
                 )
                 results.append(result)
             return results
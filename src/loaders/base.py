@@ -1,26 +1,33 @@
+import asyncio
 from abc import ABC, abstractmethod
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, AsyncIterator, Hashable
+from loguru import logger
+
+
+_DONE = object()
 
 
 class BaseLoader(ABC):
     """ 모든 문서 loader의 기본 인터페이스 """
-    
+
     @abstractmethod
-    def load(self, 
-             query: str, 
-             language: str = "ko", 
+    def load(self,
+             query: str,
+             language: str = "ko",
              load_max_docs: Optional[int] = None
-             ) -> List[Dict[str, Any]]:
-        
-        """ 문서를 로드하는 기본 메서드
-        
+             ) -> AsyncIterator[Dict[str, Any]]:
+
+        """ 문서를 하나씩 비동기로 돌려주는 기본 메서드 (async generator 로 구현)
+
+        전체 목록을 메모리에 모으지 않고 문서가 준비되는 대로 yield 한다.
+
         Args:
-            query (str): 검색 쿼리
+            query (str): 검색 쿼리 (로컬 loader 는 파일/디렉토리 경로)
             language (str, optional): 문서 언어. Defaults to "ko".
             load_max_docs (Optional[int], optional): 최대 로드할 문서 수. Defaults to None.
-            
-        Returns:
-            List[Dict[str, Any]]: 로드된 문서 리스트. 각 문서는 다음 형식을 따름:
+
+        Yields:
+            Dict[str, Any]: 로드된 문서. 각 문서는 다음 형식을 따름:
             {
                 "text": str,  # 문서 본문
                 "metadata": {
@@ -30,7 +37,102 @@ class BaseLoader(ABC):
                     ...             # 기타 메타데이터
                 }
             }
-            
+
+        """
+
+        pass
+
+
+    # ---- 중복 판단 key (None 이면 중복 제거 안 함) ---- #
+    def _dedupe_key(self, document: Dict[str, Any]) -> Optional[Hashable]:
+        return None
+
+
+    # ---- 여러 쿼리를 동시에 로드해 하나의 queue 로 모음 ---- #
+    async def _fan_in(self,
+                      queries: List[str],
+                      language: str,
+                      load_max_docs: Optional[int],
+                      concurrency: int,
+                      queue: asyncio.Queue
+                      ):
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def run(query: str):
+            async with semaphore:
+                async for document in self.load(query, language, load_max_docs):
+                    await queue.put(document)
+
+        try:
+            results = await asyncio.gather(*(run(query) for query in queries), return_exceptions=True)
+            for query, result in zip(queries, results):
+                if isinstance(result, Exception):
+                    logger.error(f"Error processing query '{query}': {result}")
+        finally:
+            await queue.put(_DONE)
+
+
+    async def load_batches(self,
+                           queries: List[str],
+                           language: str = "ko",
+                           load_max_docs: Optional[int] = None,
+                           concurrency: int = 4,
+                           batch_size: int = 16
+                           ) -> AsyncIterator[List[Dict[str, Any]]]:
+        """ 여러 쿼리를 concurrency 개씩 동시에 로드하면서 문서를 batch 로 묶어 yield
+
+        batch 가 다 차지 않아도 당장 준비된 문서가 없으면 바로 내보내므로,
+        뒤 문서를 로드하는 동안 앞 문서의 임베딩을 시작할 수 있다.
+        queue 크기가 제한되어 있어 소비가 늦으면 로드도 멈춘다 (bounded memory).
+
+        Args:
+            queries (List[str]): 검색 쿼리 목록
+            language (str, optional): 문서 언어. Defaults to "ko".
+            load_max_docs (Optional[int], optional): 쿼리별 최대 문서 수. Defaults to None.
+            concurrency (int, optional): 동시에 로드할 쿼리 수. Defaults to 4.
+            batch_size (int, optional): 최대 batch 크기. Defaults to 16.
+
+        Yields:
+            List[Dict[str, Any]]: 중복이 제거된 문서 batch
         """
-        
-        pass
\ No newline at end of file
+        queue = asyncio.Queue(maxsize=batch_size * 2)
+        producer = asyncio.create_task(
+            self._fan_in(queries, language, load_max_docs, concurrency, queue)
+        )
+        seen = set()
+        done = False
+
+        try:
+            while not done:
+                batch = []
+                document = await queue.get()
+                while True:
+                    if document is _DONE:
+                        done = True
+                        break
+
+                    key = self._dedupe_key(document)
+                    if key is None or key not in seen:
+                        seen.add(key)
+                        batch.append(document)
+
+                    if len(batch) >= batch_size or queue.empty():
+                        break
+                    document = queue.get_nowait()
+
+                if batch:
+                    yield batch
+
+        finally:
+            producer.cancel()
+
+
+    async def load_many(self,
+                        queries: List[str],
+                        language: str = "ko",
+                        load_max_docs: Optional[int] = None,
+                        concurrency: int = 4
+                        ) -> AsyncIterator[Dict[str, Any]]:
+        """ load_batches 와 같지만 문서를 하나씩 yield """
+        async for batch in self.load_batches(queries, language, load_max_docs, concurrency, batch_size=1):
+            yield batch[0]
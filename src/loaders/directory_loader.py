@@ -0,0 +1,52 @@
+import asyncio
+import os
+from typing import Optional, Dict, Any, AsyncIterator, Tuple
+from loguru import logger
+from loaders.base import BaseLoader
+
+
+class DirectoryLoader(BaseLoader):
+    """ 텍스트/Markdown 파일 디렉토리 loader. query 는 디렉토리 경로, 파일 하나가 문서 하나 """
+
+    def __init__(self, extensions: Tuple[str, ...] = (".txt", ".md", ".markdown")):
+        self.extensions = extensions
+
+
+    @staticmethod
+    def _read(path: str) -> str:
+        with open(path, "r", encoding="utf-8", errors="replace") as f:
+            return f.read()
+
+
+    async def load(self,
+                   query: str,
+                   language: str = "ko",
+                   load_max_docs: Optional[int] = None
+                   ) -> AsyncIterator[Dict[str, Any]]:
+
+        loaded = 0
+        for root, dirs, files in os.walk(query):
+            dirs.sort()
+            for name in sorted(files):
+                if not name.lower().endswith(self.extensions):
+                    continue
+                if load_max_docs is not None and loaded >= load_max_docs:
+                    return
+
+                path = os.path.join(root, name)
+                text = await asyncio.to_thread(self._read, path)
+                if not text.strip():
+                    continue
+
+                loaded += 1
+                yield {
+                    "text": text,
+                    "metadata": {
+                        "title": os.path.splitext(name)[0],
+                        "source": os.path.abspath(path),
+                        "lang": language,
+                        "format": "markdown" if name.lower().endswith((".md", ".markdown")) else "text",
+                    }
+                }
+
+        logger.info(f"Loaded {loaded} documents from {query}")
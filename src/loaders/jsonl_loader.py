@@ -0,0 +1,64 @@
+import asyncio
+import json
+import os
+from typing import Optional, Dict, Any, AsyncIterator
+from loguru import logger
+from loaders.base import BaseLoader
+
+
+class JsonlLoader(BaseLoader):
+    """ JSON Lines 파일 loader. query 는 파일 경로, 한 줄에 문서 하나 """
+
+    def __init__(self,
+                 text_field: str = "text",
+                 read_size: int = 1 << 20
+                 ):
+        self.text_field = text_field
+        self.read_size = read_size    # 한 번에 읽을 바이트 수 (메모리 상한)
+
+
+    async def load(self,
+                   query: str,
+                   language: str = "ko",
+                   load_max_docs: Optional[int] = None
+                   ) -> AsyncIterator[Dict[str, Any]]:
+
+        loaded = 0
+        with open(query, "r", encoding="utf-8") as f:
+            while True:
+                lines = await asyncio.to_thread(f.readlines, self.read_size)
+                if not lines:
+                    break
+
+                for line in lines:
+                    if not line.strip():
+                        continue
+                    if load_max_docs is not None and loaded >= load_max_docs:
+                        return
+
+                    try:
+                        record = json.loads(line)
+                    except json.JSONDecodeError as e:
+                        logger.warning(f"Skipping invalid JSON line in {query}: {e}")
+                        continue
+
+                    # 문서 형태가 아닌 줄도 전체 적재를 멈추지 않고 건너뜀
+                    if not isinstance(record, dict) or not isinstance(record.get(self.text_field), str):
+                        logger.warning(f"Skipping record without string '{self.text_field}' field in {query}")
+                        continue
+                    if not isinstance(record.get("metadata", {}), dict):
+                        logger.warning(f"Skipping record with non-object metadata in {query}")
+                        continue
+
+                    loaded += 1
+                    yield {
+                        "text": record[self.text_field],
+                        "metadata": {
+                            "title": record.get("title", ""),
+                            "source": os.path.abspath(query),
+                            "lang": language,
+                            **record.get("metadata", {}),
+                        }
+                    }
+
+        logger.info(f"Loaded {loaded} documents from {query}")
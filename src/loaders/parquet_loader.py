@@ -0,0 +1,58 @@
+import asyncio
+import os
+import pyarrow.parquet as pq
+from typing import Optional, Dict, Any, AsyncIterator
+from loguru import logger
+from loaders.base import BaseLoader
+
+
+class ParquetLoader(BaseLoader):
+    """ Parquet 파일 loader. query 는 파일 경로, row 하나가 문서 하나 (record batch 단위로 읽음) """
+
+    def __init__(self,
+                 text_field: str = "text",
+                 title_field: str = "title",
+                 batch_size: int = 1024
+                 ):
+        self.text_field = text_field
+        self.title_field = title_field
+        self.batch_size = batch_size
+
+
+    async def load(self,
+                   query: str,
+                   language: str = "ko",
+                   load_max_docs: Optional[int] = None
+                   ) -> AsyncIterator[Dict[str, Any]]:
+
+        parquet_file = pq.ParquetFile(query)
+        columns = [self.text_field]
+        if self.title_field in parquet_file.schema_arrow.names:
+            columns.append(self.title_field)
+
+        batches = parquet_file.iter_batches(batch_size=self.batch_size, columns=columns)
+        loaded = 0
+        while True:
+            batch = await asyncio.to_thread(next, batches, None)
+            if batch is None:
+                break
+
+            records = batch.to_pydict()
+            titles = records.get(self.title_field, [""] * batch.num_rows)
+            for text, title in zip(records[self.text_field], titles):
+                if load_max_docs is not None and loaded >= load_max_docs:
+                    return
+                if not text:
+                    continue
+
+                loaded += 1
+                yield {
+                    "text": text,
+                    "metadata": {
+                        "title": title or "",
+                        "source": os.path.abspath(query),
+                        "lang": language,
+                    }
+                }
+
+        logger.info(f"Loaded {loaded} documents from {query}")
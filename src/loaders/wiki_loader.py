@@ -1,45 +1,70 @@
-from langchain_community.document_loaders import WikipediaLoader
-from typing import List, Optional, Dict, Any
+import asyncio
+from langchain_community.utilities.wikipedia import WikipediaAPIWrapper
+from typing import Optional, Dict, Any, AsyncIterator, Hashable
 from loguru import logger
 from loaders.base import BaseLoader
 
 
 class WikiLoader(BaseLoader):
-    def __init__(self):
-        pass
-        
+    def __init__(self, concurrency: int = 4):
+        # 동시에 가져올 Wikipedia 페이지 수 (blocking 요청은 thread 에서 실행)
+        self._semaphore = asyncio.Semaphore(concurrency)
+        # 쿼리 간 중복 제목 (한 번 가져온 문서는 다른 쿼리에서 다시 가져오지 않음)
+        self._seen_titles = set()
+
+
+    def _dedupe_key(self, document: Dict[str, Any]) -> Optional[Hashable]:
+        return (document["metadata"]["lang"], document["metadata"]["title"])
+
+
+    async def _fetch(self,
+                     wrapper: WikipediaAPIWrapper,
+                     title: str
+                     ):
+        async with self._semaphore:
+            page = await asyncio.to_thread(wrapper._fetch_page, title)
+            return wrapper._page_to_document(title, page) if page else None
+
+
     async def load(self,
                    query: str,
                    language: str = "ko",
                    load_max_docs: Optional[int] = None
-                   ) -> List[Dict[str, Any]]:
-        
+                   ) -> AsyncIterator[Dict[str, Any]]:
+
         try:
-            # WikipediaLoader 인스턴스 직접 생성
-            loader = WikipediaLoader(
-                query=query,
+            wrapper = WikipediaAPIWrapper(
                 lang=language,
-                load_max_docs=load_max_docs
+                top_k_results=load_max_docs or 100
+            )
+
+            # 제목 검색 후, 다른 쿼리에서 이미 가져온 제목은 건너뜀
+            titles = await asyncio.to_thread(
+                wrapper.wiki_client.search, query[:300], results=wrapper.top_k_results
             )
+            titles = [title for title in titles if (language, title) not in self._seen_titles]
+            self._seen_titles.update((language, title) for title in titles)
 
-            documents = loader.load()
-            
-            articles = []
-            for document in documents:
-                articles.append({
+            # 페이지는 동시에 가져오고 도착하는 순서대로 yield
+            loaded = 0
+            for future in asyncio.as_completed([self._fetch(wrapper, title) for title in titles]):
+                document = await future
+                if document is None:
+                    continue
+
+                loaded += 1
+                yield {
                     "text": document.page_content,
                     "metadata": {
-                        "source": "wikipedia",
                         "title": document.metadata.get("title", ""),
                         "source": document.metadata.get("source", ""),
                         "lang": language,
                         "query": query,
                     }
-                })
-                
-            logger.info(f"Loaded {len(articles)} articles for {query} from Wikipedia")
-            return articles
-        
+                }
+
+            logger.info(f"Loaded {loaded} articles for {query} from Wikipedia")
+
         except Exception as e:
             logger.error(f"Error loading articles for {query} from Wikipedia: {e}")
-            raise e
\ No newline at end of file
+            raise e
@@ -1,11 +1,33 @@
+import asyncio
+import json
+import random
+import secrets
 import uvicorn
-from fastapi import FastAPI, HTTPException
+from fastapi import Depends, FastAPI, Header, HTTPException, Request, Response
+from fastapi.responses import JSONResponse, StreamingResponse
+from starlette.background import BackgroundTask
+from starlette.datastructures import MutableHeaders
+from prometheus_client import generate_latest, CONTENT_TYPE_LATEST
 from pymilvus import connections
-from services.document import DocumentService, Document, DocumentBatch
+from services.document import Document, DocumentBatch
+from services.embedding import EmbeddingService
+from services.milvus import SearchProjection
 from utils.config import CFG
-from typing import List
-from chains.rag_chain import RAGChain
-from services.vllm import VLLMService
+from typing import AsyncIterator, Dict, List, Optional, Tuple, Union
+from services.vllm import VLLMService, GenerationParams, GenerationRequest
+from services.remote_llm import RemoteLLMService
+from services.admission import AdmissionController, AdmissionRejected
+from services.deadline import DeadlineExceeded
+from services.tracing import JsonlSpanExporter, start_trace
+from services.profiler import profile_request
+from services.tenant import InvalidTenantError, Tenant, TenantRegistry, UnknownTenantError
+from services.maintenance import IndexMaintenance
+from services.ingest import ingest_stream, iter_ndjson
+from services.scheduler import parse_priority, priority_scope
+from services.session import InvalidSessionError
+from services.responses import (
+    FastJSONResponse, GenerateResponse, RAGResponse, SearchResponse, encode_body, pack_vectors
+)
 from loguru import logger
 import torch
 
@@ -17,10 +39,23 @@ logger.info(f"GPU Status: {torch.cuda.is_available()}")
 if torch.cuda.is_available():
     logger.info(f"Used GPU Number: {torch.cuda.current_device()}")
 
-app = FastAPI()
-document_service = DocumentService()
-llm_service = VLLMService()
-rag_chain = RAGChain()
+# 기본 응답도 orjson 으로 렌더링 (검색 / RAG / 생성은 respond() 로 jsonable_encoder 를 건너뜀)
+app = FastAPI(default_response_class=FastJSONResponse)
+embedding_service = EmbeddingService()
+# generation router 가 설정되면 이 프로세스는 검색/API 만 담당하고 vLLM 을 올리지 않는다
+llm_service = RemoteLLMService() if CFG.generation_router_url else VLLMService()
+# X-Tenant-Id 헤더별 collection / 캐시 / 요청률 제한 (헤더가 없으면 default tenant)
+# 재구축 / 재임베딩 중인 tenant 는 release / 제거하지 않는다
+tenants = TenantRegistry(embedding_service, llm_service, busy=lambda name: maintenance.rebuilding(name))
+# 적재된 tenant collection 의 flush / compaction / index 재구축
+maintenance = IndexMaintenance(
+    lambda: [milvus_service for tenant in tenants.loaded() for milvus_service in tenant.milvus_services]
+)
+# endpoint 별 동시 실행 수 / 대기열 / deadline 제한
+# endpoint 별 우선순위 class (기본: 대량 처리 endpoint 는 bulk, 나머지 interactive)
+admission = AdmissionController(CFG.admission_limits, CFG.endpoint_priorities)
+# trace 는 OTLP/JSON 한 줄씩 파일로 저장 (collector 의 filelog / otlpjsonfile receiver 로 수집 가능)
+trace_exporter = JsonlSpanExporter(CFG.trace_export_path) if CFG.trace_export_path else None
 
 
 @app.on_event("startup")
@@ -30,107 +65,493 @@ async def startup():
         port=CFG.milvus_port,
         db_name=CFG.milvus_db
     )
+    # default collection 을 적재하면서 기록된 임베딩 모델 / 차원과 현재 모델을 비교 (불일치 시 기동 실패)
+    async with tenants.use(None):
+        pass
+    if CFG.tenant_idle_seconds:
+        asyncio.create_task(release_idle_tenants())
+    # 재구축 중 이중 쓰기는 이 프로세스 안에서만 일어난다 (API 는 단일 replica, deployment.yaml 참고)
+    if CFG.maintenance_enabled:
+        asyncio.create_task(maintenance.run())
+
+
+# ---- 오래 쓰이지 않은 tenant collection 을 주기적으로 release ---- #
+async def release_idle_tenants():
+    while True:
+        await asyncio.sleep(max(CFG.tenant_idle_seconds / 2, 1))
+        try:
+            await tenants.release_idle()
+        except Exception as e:
+            logger.error(f"Failed to release idle tenants: {e}")
+
+
+async def get_tenant(x_tenant_id: Optional[str] = Header(default=None)) -> AsyncIterator[Tenant]:
+    try:
+        tenant_id = tenants.normalize(x_tenant_id)
+    except UnknownTenantError as e:
+        raise HTTPException(status_code=403, detail=str(e))
+    except InvalidTenantError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    # 요청이 끝날 때까지 tenant collection 이 release 되지 않도록 사용 중 표시
+    async with tenants.use(tenant_id) as tenant:
+        yield tenant
+
+
+async def require_admin(x_admin_token: Optional[str] = Header(default=None)):
+    # 운영 endpoint 는 CFG.admin_token 이 설정된 경우에만 열고 X-Admin-Token 헤더로 확인
+    if not CFG.admin_token:
+        raise HTTPException(status_code=403, detail="Admin endpoints are disabled")
+    if x_admin_token is None or not secrets.compare_digest(x_admin_token, CFG.admin_token):
+        raise HTTPException(status_code=401, detail="Invalid admin token")
+
+
+async def check_tenant_rate_limit(x_tenant_id: Optional[str] = Header(default=None)):
+    try:
+        tenants.check_rate_limit(x_tenant_id)
+    except UnknownTenantError as e:
+        raise HTTPException(status_code=403, detail=str(e))
+    except InvalidTenantError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+class TraceMiddleware:
+    """
+    X-Trace: 1 헤더 (또는 CFG.trace_sample_rate 샘플링) 요청만 단계별 span 을 기록하고,
+    CFG.profiling_enabled 일 때 X-Profile: 1 헤더 요청은 cProfile 결과를 CFG.profile_dir 에 남김
+
+    BaseHTTPMiddleware 는 응답을 보내는 동안 요청 본문 메시지를 가로채므로, 업로드를 받으면서
+    진행 상황을 내보내는 /documents/stream 을 위해 ASGI middleware 로 구현
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        
+        request = Request(scope)
+        profiled = CFG.profiling_enabled and request.headers.get("x-profile") == "1"
+        traced = (
+            profiled 
+            or request.headers.get("x-trace") == "1" 
+            or random.random() < CFG.trace_sample_rate
+        )
+        if not traced:
+            await self.app(scope, receive, send)
+            return
+        
+        profile = None
+        with start_trace(
+            f"{request.method} {request.url.path}", 
+            trace_exporter,
+            **{"http.method": request.method, "http.target": request.url.path}
+        ) as root:
+            async def send_with_timing(message):
+                if message["type"] == "http.response.start":
+                    root.set_attribute("http.status_code", message["status"])
+                    # 단계별 시간은 Server-Timing 헤더로도 돌려줌 (브라우저 devtools / curl -v 로 확인)
+                    headers = MutableHeaders(scope=message)
+                    headers["X-Trace-Id"] = root.trace.trace_id
+                    timings = {
+                        name: duration for name, duration in root.trace.breakdown().items() if name != root.name
+                    }
+                    timings["total"] = root.duration_ms
+                    headers["Server-Timing"] = ", ".join(
+                        f"{name};dur={duration:.1f}" for name, duration in timings.items()
+                    )
+                    if profile is not None:
+                        headers["X-Profile-Path"] = profile.path
+                await send(message)
+
+            if profiled:
+                with profile_request(CFG.profile_dir, root.trace.trace_id) as profile:
+                    await self.app(scope, receive, send_with_timing)
+            else:
+                await self.app(scope, receive, send_with_timing)
+
+
+class PriorityMiddleware:
+    """ X-Priority: interactive | bulk 헤더로 endpoint 기본 우선순위 class 를 덮어씀 """
+
+    def __init__(self, app):
+        self.app = app
+
+
+    async def __call__(self, scope, receive, send):
+        priority = None
+        if scope["type"] == "http":
+            priority = parse_priority(Request(scope).headers.get("x-priority"))
+        
+        with priority_scope(priority):
+            await self.app(scope, receive, send)
+
+
+app.add_middleware(TraceMiddleware)
+app.add_middleware(PriorityMiddleware)
+
+
+@app.exception_handler(AdmissionRejected)
+async def admission_rejected_handler(request: Request, 
+                                     exc: AdmissionRejected
+                                     ):
+    # 과부하 시 대기하지 않고 바로 거절 → 클라이언트가 재시도
+    return JSONResponse(
+        status_code=exc.status_code,
+        content={"detail": str(exc)},
+        headers={"Retry-After": "1"}
+    )
+
+
+def respond(request: Request, content: dict) -> Response:
+    """ 큰 응답용: jsonable_encoder 없이 바로 직렬화하고 Accept / Accept-Encoding 에 맞춰 msgpack / 압축 """
+    body, media_type, headers = encode_body(
+        content,
+        accept=request.headers.get("accept"),
+        accept_encoding=request.headers.get("accept-encoding"),
+        compress_min_bytes=CFG.response_compress_min_bytes,
+        gzip_level=CFG.response_gzip_level,
+        brotli_quality=CFG.response_brotli_quality
+    )
+    return Response(content=body, media_type=media_type, headers=headers)
+
+
+def check_batch_size(size: int, 
+                     limit: Optional[int], 
+                     name: str
+                     ):
+    if limit and size > limit:
+        raise HTTPException(status_code=413, detail=f"Too many {name}: {size} > {limit}")
 
 
 @app.get("/health")                  # 요청 url 경로
 async def health_check():
-    return {"status": "healthy"}     # 응답 데이터
+    return {
+        "status": "healthy", 
+        "admission": admission.status(), 
+        "schedulers": {
+            "embedding": embedding_service.scheduler.status(),
+            "generation": llm_service.scheduler_status(),
+        },
+        "tenants": tenants.status()
+    }     # 응답 데이터
+
+
+@app.get("/maintenance")
+async def maintenance_status():
+    return {"status": "success", "results": maintenance.status()}
+
+
+# ---- 새 임베딩 모델로 무중단 재임베딩 ---- #
+@app.post("/maintenance/reembed", dependencies=[Depends(require_admin)])
+async def reembed_collection(model: str, 
+                             tenant: Tenant = Depends(get_tenant)
+                             ):
+    # 임의의 모델 이름으로 모델을 내려받아 적재하지 않도록 허용한 모델만
+    if model not in (CFG.reembed_models or []):
+        raise HTTPException(status_code=400, detail=f"Model {model} is not allowed for re-embedding")
+    # 재임베딩 중 들어온 삽입도 새 모델로 새 collection 에 써야 하므로 API process 안에서 실행
+    if tenant.document_service.chunk_service is not None:
+        # chunk collection 은 문서 단위 재임베딩으로 다시 만들 수 없다 (문서를 다시 넣어야 함)
+        raise HTTPException(status_code=409, detail="Re-embedding is not supported with hierarchical retrieval")
+    async with admission.slot("maintenance_reembed"):
+        try:
+            embedder = await asyncio.to_thread(tenants.embedder, model)
+            
+            def switch_embedder():
+                # alias 전환과 같은 lock 안에서 (rebuild thread) → 전환 뒤의 질의 / 쓰기는 새 모델로 임베딩
+                tenant.document_service.embedding_service = embedder
+            
+            await maintenance.reembed(
+                tenant.milvus_service, embedder, switch_embedder=switch_embedder, on_swap=tenant.clear_caches
+            )
+            return {
+                "status": "success", 
+                "results": f"Re-embedding {tenant.milvus_service.collection_name} with {model}"
+            }
+        
+        except RuntimeError as e:
+            raise HTTPException(status_code=409, detail=str(e))
+        
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=str(e))
+
+
+@app.get("/metrics")
+async def metrics():
+    return Response(content=generate_latest(), media_type=CONTENT_TYPE_LATEST)
 
 
 # ---- 문서 단일 등록 ---- #
 @app.post("/documents/single")
-async def insert_document(document: Document):
-    try:
-        results = await document_service.process_document([document])
-        return {"status": "success", "results": len(results)}
-    
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+async def insert_document(document: Document, 
+                          tenant: Tenant = Depends(get_tenant)
+                          ):
+    async with admission.slot("documents_single"):
+        try:
+            results, skipped = await tenant.document_service.process_document([document])
+            tenant.invalidate_answers()
+            return {"status": "success", "results": len(results), "duplicates": len(skipped), "skipped": skipped}
+        
+        except DeadlineExceeded as e:
+            raise HTTPException(status_code=504, detail=str(e))
+        
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=str(e))
     
 
 # ---- 문서 일괄 등록 ---- #
 @app.post("/documents/batch")
-async def insert_documents(document_batch: DocumentBatch):
-    try:
-        results = await document_service.process_document(document_batch.documents)
-        return {"status": "success", "results": len(results)}
-    
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+async def insert_documents(document_batch: DocumentBatch, 
+                           tenant: Tenant = Depends(get_tenant)
+                           ):
+    check_batch_size(len(document_batch.documents), CFG.max_batch_documents, "documents")
+    async with admission.slot("documents_batch"):
+        try:
+            results, skipped = await tenant.document_service.process_document(document_batch.documents)
+            tenant.invalidate_answers()
+            return {
+                "status": "success", 
+                "results": len(results),
+                # near-duplicate 로 건너뛴 문서 수와 각 문서가 같다고 본 문서
+                "duplicates": len(skipped),
+                "skipped": skipped
+            }
+        
+        except DeadlineExceeded as e:
+            raise HTTPException(status_code=504, detail=str(e))
+        
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=str(e))
+
+
+# ---- 문서 스트리밍 일괄 등록 (NDJSON, gzip 선택) ---- #
+class NDJSONStreamingResponse(StreamingResponse):
+    """
+    업로드를 읽는 동안 응답을 보내므로 StreamingResponse 의 disconnect 감시를 끔
+    (감시 task 가 receive() 로 아직 읽지 않은 요청 본문 메시지를 가져가 버림)
+    """
+    media_type = "application/x-ndjson"
+
+    async def __call__(self, scope, receive, send):
+        # 응답 시작 전에 연결이 끊겨도 background (슬롯 반납 등) 는 반드시 실행
+        try:
+            await self.stream_response(send)
+        finally:
+            if self.background is not None:
+                await self.background()
+
+
+@app.post("/documents/stream")
+async def stream_documents(request: Request, 
+                           tenant: Tenant = Depends(get_tenant)
+                           ):
+    """
+    한 줄에 문서 하나인 NDJSON 본문 (Content-Encoding: gzip 가능) 을 받는 대로 파싱해
+    CFG.ingest_batch_size 개씩 임베딩 / 삽입하고, batch 마다 진행 상황을 NDJSON 한 줄로 돌려줌.
+    메모리에는 batch 하나와 미완성 한 줄만 남으므로 본문 크기와 무관하게 사용량이 제한된다.
+    잘못된 줄은 건너뛰고 줄 번호와 함께 마지막 요약에 담는다.
+    near-duplicate 로 건너뛴 문서는 batch 진행 상황에 줄 번호 / 같다고 본 문서 id 와 함께 담는다.
+    """
+    gzip = request.headers.get("content-encoding", "").lower() == "gzip"
+    # 응답이 endpoint 반환 뒤에도 이어지므로 슬롯은 응답이 끝날 때 (background) 반납
+    release = await admission.acquire("documents_stream")
+
+    async def process_batch(documents: List[Document]) -> Tuple[int, List[Dict]]:
+        # 응답 generator 는 slot 밖에서 돌므로 우선순위 class 를 직접 지정
+        with priority_scope(admission.priorities.get("documents_stream"), override=False):
+            results, skipped = await tenant.document_service.process_document(documents)
+        tenant.invalidate_answers()
+        return len(results), skipped
+
+    async def progress():
+        records = iter_ndjson(request.stream(), gzip=gzip, max_line_bytes=CFG.ingest_max_line_bytes)
+        async for event in ingest_stream(
+            records, 
+            Document.parse_obj, 
+            process_batch, 
+            batch_size=CFG.ingest_batch_size
+        ):
+            if event["status"] == "error":
+                logger.error(f"Streaming ingest stopped after {event['inserted']} documents: {event['detail']}")
+            yield json.dumps(event, ensure_ascii=False) + "\n"
+
+    return NDJSONStreamingResponse(progress(), background=BackgroundTask(release))
 
 
 # ---- 문서 검색 ---- #
-@app.get("/documents/search")
-async def search_documents(query: str, 
-                           limit: int = 5
+@app.get("/documents/search", response_model=SearchResponse)
+async def search_documents(request: Request,
+                           query: str, 
+                           limit: int = 5,
+                           mmr: bool = False,
+                           fetch_k: Optional[int] = None,
+                           lambda_mult: float = 0.5,
+                           duplicate_threshold: Optional[float] = None,
+                           projection: SearchProjection = SearchProjection.full,
+                           two_phase: Optional[bool] = None,
+                           hierarchical: Optional[bool] = None,
+                           with_embeddings: bool = False,
+                           tenant: Tenant = Depends(get_tenant)
                            ):
-    try:
-        results = await document_service.search_similar_documents(query, limit)
-        return {"status": "success", "results": results}
-    
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+    check_batch_size(max(limit, fetch_k or 0), CFG.max_docs_per_request, "documents")
+    async with admission.slot("documents_search"):
+        try:
+            results = await tenant.document_service.search_similar_documents(
+                query, 
+                limit,
+                mmr=mmr,
+                fetch_k=fetch_k,
+                lambda_mult=lambda_mult,
+                duplicate_threshold=duplicate_threshold,
+                projection=projection,
+                two_phase=two_phase,
+                hierarchical=hierarchical,
+                with_embeddings=with_embeddings
+            )
+            if with_embeddings:
+                results = pack_vectors(results)
+            return respond(request, {"status": "success", "results": results})
+        
+        except DeadlineExceeded as e:
+            raise HTTPException(status_code=504, detail=str(e))
+        
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=str(e))
 
 
 # ---- 문서 삭제 ---- #
 @app.delete("/documents/delete")
-async def delete_documents(doc_ids: List[str]):
-    try:
-        await document_service.delete_documents(doc_ids)
-        return {"status": "success", "results": f"Deleted {len(doc_ids)} documents"}
-    
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+async def delete_documents(doc_ids: List[str], 
+                           tenant: Tenant = Depends(get_tenant)
+                           ):
+    check_batch_size(len(doc_ids), CFG.max_batch_documents, "documents")
+    async with admission.slot("documents_delete"):
+        try:
+            await tenant.document_service.delete_documents(doc_ids)
+            tenant.invalidate_answers(doc_ids)
+            return {"status": "success", "results": f"Deleted {len(doc_ids)} documents"}
+        
+        except DeadlineExceeded as e:
+            raise HTTPException(status_code=504, detail=str(e))
+        
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=str(e))
     
 
 # ---- 문서 업데이트 ---- #
 @app.put("/documents/{doc_id}")
 async def update_document(doc_id: str, 
-                          document: Document
+                          document: Document,
+                          tenant: Tenant = Depends(get_tenant)
                           ):
-    try:
-        result = await document_service.update_document(
-            doc_id=doc_id,
-            new_text=document.text,
-            new_metadata=document.metadata
-        )
-        return {"status": "success", "results": f"Updated {doc_id} document"}
-    
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+    async with admission.slot("documents_update"):
+        try:
+            result = await tenant.document_service.update_document(
+                doc_id=doc_id,
+                new_text=document.text,
+                new_metadata=document.metadata
+            )
+            tenant.invalidate_answers([doc_id])
+            return {"status": "success", "results": f"Updated {doc_id} document"}
+        
+        except DeadlineExceeded as e:
+            raise HTTPException(status_code=504, detail=str(e))
+        
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=str(e))
 
 
 # ---- 텍스트 생성 ---- #
-@app.post("/llm/generate")
-async def generate_text(prompt: str):
-    try:
-        response = await llm_service._call(prompt)
-        return {"status": "success", "results": response}
-    
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+@app.post("/llm/generate", response_model=GenerateResponse, dependencies=[Depends(check_tenant_rate_limit)])
+async def generate_text(request: Request,
+                        prompt: str, 
+                        params: Optional[GenerationParams] = None
+                        ):
+    async with admission.slot("llm_generate"):
+        try:
+            response = await llm_service._call(prompt, params)
+            return respond(request, {"status": "success", "results": response})
+        
+        except DeadlineExceeded as e:
+            raise HTTPException(status_code=504, detail=str(e))
+        
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=str(e))
 
 
 # ---- 텍스트 배치 생성 ---- #
-@app.post("/llm/generate_batch")
-async def generate_batch(prompts: List[str]):
-    try:
-        response = await llm_service.agenerate(prompts)
-        return {"status": "success", "results": response}
-    
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+@app.post("/llm/generate_batch", response_model=GenerateResponse, dependencies=[Depends(check_tenant_rate_limit)])
+async def generate_batch(request: Request,
+                         prompts: List[Union[str, GenerationRequest]]
+                         ):
+    # 문자열은 기본 파라미터, {"prompt", "params"} 객체는 프롬프트별 파라미터로 생성
+    check_batch_size(len(prompts), CFG.max_batch_prompts, "prompts")
+    async with admission.slot("llm_generate_batch"):
+        try:
+            response = await llm_service.agenerate(
+                [prompt if isinstance(prompt, str) else prompt.prompt for prompt in prompts],
+                [None if isinstance(prompt, str) else prompt.params for prompt in prompts]
+            )
+            return respond(request, {"status": "success", "results": response})
+        
+        except DeadlineExceeded as e:
+            raise HTTPException(status_code=504, detail=str(e))
+        
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=str(e))
 
 
 # ---- RAG 체인 쿼리 ---- #
-@app.post("/rag/query")
-async def rag_query(question: str, max_docs: int = 3):
-    try:
-        response = await rag_chain.query(question, max_docs)
-        return {"status": "success", "results": response}
-    
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+@app.post("/rag/query", response_model=RAGResponse)
+async def rag_query(request: Request,
+                    question: str, 
+                    max_docs: int = 3,
+                    params: Optional[GenerationParams] = None,
+                    mmr: bool = False,
+                    fetch_k: Optional[int] = None,
+                    lambda_mult: float = 0.5,
+                    duplicate_threshold: Optional[float] = None,
+                    session_id: Optional[str] = None,
+                    tenant: Tenant = Depends(get_tenant)
+                    ):
+    check_batch_size(max(max_docs, fetch_k or 0), CFG.max_docs_per_request, "documents")
+    async with admission.slot("rag_query"):
+        try:
+            response = await tenant.rag_chain.query(
+                question, 
+                max_docs, 
+                params,
+                mmr=mmr,
+                fetch_k=fetch_k,
+                lambda_mult=lambda_mult,
+                duplicate_threshold=duplicate_threshold,
+                session_id=session_id
+            )
+            return respond(request, {"status": "success", "results": response})
+        
+        except InvalidSessionError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        
+        except DeadlineExceeded as e:
+            raise HTTPException(status_code=504, detail=str(e))
+        
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=str(e))
+
+
+# ---- 대화 session 종료 (working set / 프롬프트 메모리 반환) ---- #
+@app.delete("/rag/sessions/{session_id}")
+async def delete_session(session_id: str,
+                         tenant: Tenant = Depends(get_tenant)
+                         ):
+    session_store = tenant.rag_chain.session_store
+    if session_store is None or not session_store.delete(session_id):
+        raise HTTPException(status_code=404, detail=f"Session {session_id} not found")
+    return {"status": "success", "results": f"Deleted session {session_id}"}
 
 
 
@@ -0,0 +1,149 @@
+import asyncio
+from typing import Any, Dict, List
+
+import httpx
+from fastapi import FastAPI, HTTPException
+from loguru import logger
+from router.balancer import LoadBalancer, NoHealthyWorkerError, Worker
+
+
+# ---- generation worker 앞단 router ---- #
+class GenerationRouter:
+    def __init__(self,
+                 worker_urls: List[str],
+                 policy: str = "least_outstanding",
+                 request_timeout: float = 120.0,
+                 health_interval: float = 5.0,
+                 health_timeout: float = 2.0,
+                 max_failures: int = 3
+                 ):
+        self.balancer = LoadBalancer(worker_urls, policy=policy, max_failures=max_failures)
+        self.request_timeout = request_timeout
+        self.health_interval = health_interval
+        self.health_timeout = health_timeout
+        self._client = None
+        self._health_task = None
+
+
+    async def start(self):
+        self._client = httpx.AsyncClient(timeout=self.request_timeout)
+        await self.check_health()
+        self._health_task = asyncio.create_task(self._health_loop())
+
+    async def stop(self):
+        if self._health_task:
+            self._health_task.cancel()
+        if self._client:
+            await self._client.aclose()
+
+
+    # ---- health check ---- #
+    async def _check_worker(self, worker: Worker):
+        try:
+            response = await self._client.get(f"{worker.url}/health", timeout=self.health_timeout)
+            response.raise_for_status()
+            self.balancer.update_health(
+                worker,
+                healthy=True,
+                kv_cache_usage=response.json().get("kv_cache_usage")
+            )
+        except Exception as e:
+            logger.warning(f"Health check failed for {worker.url}: {e}")
+            self.balancer.update_health(worker, healthy=False)
+
+    async def check_health(self):
+        await asyncio.gather(*(self._check_worker(worker) for worker in self.balancer.workers))
+
+    async def _health_loop(self):
+        while True:
+            await asyncio.sleep(self.health_interval)
+            await self.check_health()
+
+
+    # ---- 요청 전달 ---- #
+    async def forward(self,
+                      path: str,
+                      payload: Dict[str, Any]
+                      ) -> Dict[str, Any]:
+        """
+        선택한 worker 로 요청 전달. 연결 실패 (연결 / connection pool timeout 포함) 나 5xx 는 다른 worker 로 재시도하고,
+        요청을 보낸 뒤의 timeout 은 GPU 작업이 중복되지 않도록 재시도하지 않는다.
+        4xx 는 요청의 문제이므로 재시도하지 않고 worker 의 detail 을 그대로 전달한다.
+        """
+        tried = []
+        while True:
+            try:
+                worker = self.balancer.acquire(exclude=tried)
+            except NoHealthyWorkerError as e:
+                raise HTTPException(status_code=503, detail=str(e))
+
+            tried.append(worker)
+            try:
+                response = await self._client.post(f"{worker.url}{path}", json=payload)
+
+            except httpx.ConnectTimeout as e:
+                # 요청이 전달되지 않았으므로 다른 worker 로 재시도해도 중복 생성이 없다
+                logger.warning(f"Generation worker connect timeout {worker.url}: {e}")
+                self.balancer.mark_failure(worker)
+                continue
+
+            except httpx.PoolTimeout as e:
+                # 이 router 의 연결 pool 이 가득 찬 것 (요청은 전달되지 않았고 worker 의 문제도 아님)
+                logger.warning(f"Connection pool timeout for {worker.url}: {e}")
+                continue
+
+            except httpx.TimeoutException:
+                raise HTTPException(status_code=504, detail=f"Generation worker timed out: {worker.url}")
+
+            except httpx.TransportError as e:
+                logger.warning(f"Generation worker unreachable {worker.url}: {e}")
+                self.balancer.mark_failure(worker)
+                continue
+
+            finally:
+                self.balancer.release(worker)
+
+            # 504 는 worker 에서 요청 deadline 이 지난 것이므로 재시도하지 않는다
+            if response.status_code >= 500 and response.status_code != 504:
+                logger.warning(f"Generation worker error {worker.url}: {response.status_code}")
+                self.balancer.mark_failure(worker)
+                continue
+
+            if response.status_code >= 400:
+                # worker 는 정상 응답한 것이므로 실패로 세지 않는다
+                self.balancer.mark_success(worker)
+                try:
+                    detail = response.json()["detail"]
+                except (ValueError, KeyError, TypeError):
+                    detail = response.text
+                raise HTTPException(status_code=response.status_code, detail=detail)
+
+            self.balancer.mark_success(worker)
+            return response.json()
+
+
+def create_app(router: GenerationRouter) -> FastAPI:
+    app = FastAPI()
+
+    @app.on_event("startup")
+    async def startup():
+        await router.start()
+
+    @app.on_event("shutdown")
+    async def shutdown():
+        await router.stop()
+
+    @app.get("/health")
+    async def health_check():
+        healthy = any(worker.healthy for worker in router.balancer.workers)
+        return {"status": "healthy" if healthy else "unhealthy", "workers": router.balancer.status()}
+
+    @app.post("/generate")
+    async def generate(payload: Dict[str, Any]):
+        return await router.forward("/generate", payload)
+
+    @app.post("/generate_batch")
+    async def generate_batch(payload: Dict[str, Any]):
+        return await router.forward("/generate_batch", payload)
+
+    return app
@@ -0,0 +1,115 @@
+import itertools
+import time
+from typing import Dict, Iterable, List, Optional
+
+
+# ---- generation worker 상태 ---- #
+class Worker:
+    def __init__(self, url: str):
+        self.url = url.rstrip("/")
+        self.outstanding = 0             # router 가 보낸 뒤 응답을 기다리는 요청 수
+        self.kv_cache_usage = 0.0        # worker 가 health 응답으로 알려준 KV cache 사용률 (0~1)
+        self.healthy = True
+        self.consecutive_failures = 0
+        self.last_checked = 0.0
+
+    def to_dict(self) -> Dict:
+        return {
+            "url": self.url,
+            "healthy": self.healthy,
+            "outstanding": self.outstanding,
+            "kv_cache_usage": self.kv_cache_usage,
+            "consecutive_failures": self.consecutive_failures,
+        }
+
+
+class NoHealthyWorkerError(Exception):
+    """사용 가능한 worker 없음"""
+    pass
+
+
+# ---- 부하 분산 ---- #
+class LoadBalancer:
+    """
+    generation worker 선택
+
+    - least_outstanding: router 기준 처리 중 요청이 가장 적은 worker
+    - kv_cache: worker 가 보고한 KV cache 사용률이 가장 낮은 worker (동률이면 처리 중 요청 수)
+    동률은 round-robin 으로 나눈다.
+    """
+
+    POLICIES = ("least_outstanding", "kv_cache")
+
+    def __init__(self,
+                 urls: Iterable[str],
+                 policy: str = "least_outstanding",
+                 max_failures: int = 3
+                 ):
+        if policy not in self.POLICIES:
+            raise ValueError(f"Unknown routing policy: {policy}")
+
+        self.workers = [Worker(url) for url in urls]
+        if not self.workers:
+            raise ValueError("At least one generation worker is required")
+
+        self.policy = policy
+        self.max_failures = max_failures
+        self._rotation = itertools.count()
+
+
+    def _key(self, worker: Worker):
+        if self.policy == "kv_cache":
+            return (worker.kv_cache_usage, worker.outstanding)
+        return (worker.outstanding, worker.kv_cache_usage)
+
+
+    def select(self, exclude: Iterable[Worker] = ()) -> Worker:
+        excluded = {id(worker) for worker in exclude}
+        candidates = [
+            worker for worker in self.workers
+            if worker.healthy and id(worker) not in excluded
+        ]
+        if not candidates:
+            raise NoHealthyWorkerError("No healthy generation worker available")
+
+        best = min(self._key(worker) for worker in candidates)
+        tied = [worker for worker in candidates if self._key(worker) == best]
+        return tied[next(self._rotation) % len(tied)]
+
+
+    def acquire(self, exclude: Iterable[Worker] = ()) -> Worker:
+        worker = self.select(exclude)
+        worker.outstanding += 1
+        return worker
+
+    def release(self, worker: Worker):
+        worker.outstanding = max(0, worker.outstanding - 1)
+
+
+    # ---- 요청/health check 결과 반영 ---- #
+    def mark_success(self, worker: Worker):
+        worker.consecutive_failures = 0
+        worker.healthy = True
+
+    def mark_failure(self, worker: Worker):
+        worker.consecutive_failures += 1
+        if worker.consecutive_failures >= self.max_failures:
+            worker.healthy = False
+
+    def update_health(self,
+                      worker: Worker,
+                      healthy: bool,
+                      kv_cache_usage: Optional[float] = None
+                      ):
+        worker.last_checked = time.time()
+        if not healthy:
+            self.mark_failure(worker)
+            return
+
+        self.mark_success(worker)
+        if kv_cache_usage is not None:
+            worker.kv_cache_usage = kv_cache_usage
+
+
+    def status(self) -> List[Dict]:
+        return [worker.to_dict() for worker in self.workers]
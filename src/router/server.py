@@ -0,0 +1,18 @@
+import uvicorn
+from router.app import GenerationRouter, create_app
+from utils.config import CFG
+
+
+# uvicorn router.server:app --host 0.0.0.0 --port 8100
+app = create_app(
+    GenerationRouter(
+        worker_urls=CFG.generation_workers,
+        policy=CFG.router_policy,
+        request_timeout=CFG.router_request_timeout,
+        health_interval=CFG.router_health_interval
+    )
+)
+
+
+if __name__ == "__main__":
+    uvicorn.run(app, host="0.0.0.0", port=8100)
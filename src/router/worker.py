@@ -0,0 +1,86 @@
+import uvicorn
+from fastapi import FastAPI, HTTPException
+from pydantic import BaseModel
+from typing import List, Optional
+from services.deadline import DeadlineExceeded, deadline_scope
+from services.scheduler import BULK, parse_priority, priority_scope
+from services.vllm import VLLMService, GenerationParams, TokenLimitError
+
+
+# ---- generation worker: VLLMService 하나를 감싸는 HTTP 서버 ---- #
+# uvicorn router.worker:app --host 0.0.0.0 --port 8200
+class WorkerGenerateRequest(BaseModel):
+    prompt: str
+    params: Optional[GenerationParams] = None
+    timeout: Optional[float] = None       # 호출 측에서 남은 deadline (초)
+    priority: Optional[str] = None        # interactive | bulk (호출 측 요청의 class)
+
+
+class WorkerBatchRequest(BaseModel):
+    prompts: List[str]
+    params: Optional[List[Optional[GenerationParams]]] = None
+    timeout: Optional[float] = None
+    priority: Optional[str] = None
+
+
+app = FastAPI()
+llm_service = VLLMService()
+state = {"outstanding": 0}
+
+
+@app.get("/health")
+async def health_check():
+    return {
+        "status": "healthy",
+        "outstanding": state["outstanding"],
+        "kv_cache_usage": llm_service.kv_cache_usage(),
+        "scheduler": llm_service.scheduler_status()
+    }
+
+
+@app.post("/generate")
+async def generate_text(request: WorkerGenerateRequest):
+    state["outstanding"] += 1
+    try:
+        with deadline_scope(request.timeout), priority_scope(parse_priority(request.priority)):
+            response = await llm_service._call(request.prompt, request.params)
+        return {"status": "success", "results": response}
+    
+    except (TokenLimitError, ValueError) as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    except DeadlineExceeded as e:
+        raise HTTPException(status_code=504, detail=str(e))
+    
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    
+    finally:
+        state["outstanding"] -= 1
+
+
+@app.post("/generate_batch")
+async def generate_batch(request: WorkerBatchRequest):
+    state["outstanding"] += 1
+    try:
+        # 직접 호출된 batch 는 기본 bulk
+        with deadline_scope(request.timeout), priority_scope(parse_priority(request.priority) or BULK):
+            response = await llm_service.agenerate(request.prompts, request.params)
+        return {"status": "success", "results": response}
+    
+    # 요청 자체의 문제 (빈 프롬프트 목록 등) 는 다른 worker 에서도 같으므로 4xx 로 반환해 재시도 방지
+    except (TokenLimitError, ValueError) as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    except DeadlineExceeded as e:
+        raise HTTPException(status_code=504, detail=str(e))
+    
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    
+    finally:
+        state["outstanding"] -= 1
+
+
+if __name__ == "__main__":
+    uvicorn.run(app, host="0.0.0.0", port=8200)
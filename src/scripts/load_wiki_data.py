@@ -2,12 +2,13 @@ import asyncio
 from services.document import DocumentService, Document
 from loaders.wiki_loader import WikiLoader
 from loguru import logger
+from utils.config import CFG
 
 
 async def load_wiki_data():
-    wiki_loader = WikiLoader()
+    wiki_loader = WikiLoader(concurrency=CFG.loader_concurrency)
     document_service = DocumentService()
-    
+
     # 검색할 주제 리스트 (query)
     search_queries = [
         "인공지능",
@@ -18,17 +19,17 @@ async def load_wiki_data():
         "머신러닝 프레임워크",
         "딥러닝 프레임워크"
     ]
-    
+
     total_documents = 0
-    
-    for query in search_queries:
-        # try:
-        articles = await wiki_loader.load(
-            query=query,
-            language="ko",
-            load_max_docs=10    # 각 주제별 최대 문서 수
-        )
-        
+
+    # 쿼리들을 동시에 로드하면서, 도착한 문서부터 batch 로 임베딩/저장
+    async for articles in wiki_loader.load_batches(
+        queries=search_queries,
+        language="ko",
+        load_max_docs=10,    # 각 주제별 최대 문서 수
+        concurrency=CFG.loader_concurrency,
+        batch_size=CFG.ingest_batch_size
+    ):
         # Document 객체로 변환
         documents = [
             Document(
@@ -36,21 +37,17 @@ async def load_wiki_data():
                 metadata=article["metadata"]
             ) for article in articles
         ]
-        
+
         # 배치 처리로 Milvus에 저장
-        results = await document_service.process_document(documents)
+        results, _ = await document_service.process_document(documents)
         total_documents += len(results)
-        
-        logger.info(f"Inserted {len(results)} documents for query: {query}")
-            
-        # except Exception as e:
-        #     logger.error(f"Error processing query '{query}': {e}")
-        #     continue
-        
+
+        logger.info(f"Inserted {len(results)} documents ({total_documents} so far)")
+
     logger.info(f"Total documents inserted: {total_documents}")
-    
-            
-            
+
+
+
 if __name__ == "__main__":
     asyncio.run(load_wiki_data())
-    
\ No newline at end of file
+
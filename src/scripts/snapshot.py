@@ -0,0 +1,104 @@
+"""
+색인된 corpus snapshot export / import
+
+    rag-snapshot export corpus.arrow
+    rag-snapshot import corpus.arrow
+    rag-snapshot search corpus.arrow "질문"      # Milvus 없이 memory-map 검색
+
+id, text, metadata, 임베딩(float16)을 Arrow IPC 파일 하나로 저장한다.
+import 는 다시 임베딩하지 않고 Milvus 에 batch 단위로 bulk insert 한다.
+"""
+import argparse
+import asyncio
+import time
+from loguru import logger
+from services.milvus import MilvusService
+from services.snapshot import SnapshotIndex, read_snapshot, read_snapshot_metadata, write_snapshot
+from utils.config import CFG
+
+
+async def export_snapshot(path: str, batch_size: int = 1000):
+    milvus_service = MilvusService()
+    start = time.time()
+
+    count = write_snapshot(
+        path,
+        milvus_service.iterate_documents(batch_size=batch_size),
+        dimension=milvus_service.dimension,
+        metadata={
+            "collection": milvus_service.collection_name,
+            "embedding_model": CFG.embedding_model,
+            "created_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        }
+    )
+
+    logger.info(f"Exported {count} documents to {path} in {time.time() - start:.1f}s")
+    return count
+
+
+async def import_snapshot(path: str):
+    metadata = read_snapshot_metadata(path)
+    if int(metadata["dimension"]) != CFG.milvus_dimension:
+        raise ValueError(
+            f"Snapshot dimension {metadata['dimension']} does not match collection dimension {CFG.milvus_dimension}"
+        )
+    if metadata.get("embedding_model") != CFG.embedding_model:
+        logger.warning(
+            f"Snapshot was embedded with {metadata.get('embedding_model')}, "
+            f"current embedding model is {CFG.embedding_model}"
+        )
+
+    milvus_service = MilvusService()
+    start = time.time()
+    count = 0
+
+    for rows in read_snapshot(path):
+        await milvus_service.insert_document(rows)
+        count += len(rows)
+        logger.info(f"Imported {count} documents")
+
+    milvus_service.collection.flush()
+    logger.info(f"Imported {count} documents from {path} in {time.time() - start:.1f}s")
+    return count
+
+
+async def search_snapshot(path: str,
+                          query: str,
+                          limit: int = 5
+                          ):
+    from services.embedding import EmbeddingService
+
+    index = SnapshotIndex(path)
+    query_embedding = await EmbeddingService().embed_document(query)
+    for result in index.search(query_embedding, limit):
+        logger.info(f"{result['score']:.4f} {result['id']} {result['metadata'].get('title', '')}")
+
+
+def main():
+    parser = argparse.ArgumentParser(prog="rag-snapshot")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    export_parser = subparsers.add_parser("export", help="Milvus collection -> snapshot file")
+    export_parser.add_argument("path")
+    export_parser.add_argument("--batch-size", type=int, default=1000)
+
+    import_parser = subparsers.add_parser("import", help="snapshot file -> Milvus collection")
+    import_parser.add_argument("path")
+
+    search_parser = subparsers.add_parser("search", help="search a snapshot file without Milvus")
+    search_parser.add_argument("path")
+    search_parser.add_argument("query")
+    search_parser.add_argument("--limit", type=int, default=5)
+
+    args = parser.parse_args()
+    if args.command == "export":
+        asyncio.run(export_snapshot(args.path, args.batch_size))
+    elif args.command == "import":
+        asyncio.run(import_snapshot(args.path))
+    else:
+        asyncio.run(search_snapshot(args.path, args.query, args.limit))
+
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+from typing import Awaitable, Callable, Dict, List, NamedTuple, Optional, Sequence
+
+
+# ---- 질의별 검색 노력 (IVF nprobe) 조절 ---- #
+class AdaptiveSearchPolicy:
+    """
+    낮은 nprobe 로 먼저 검색하고, 결과가 확실하면 멈추고 아니면 다음 단계 nprobe 로 다시 검색
+
+    멈추는 조건 (마지막 단계는 항상 멈춤)
+        - score: k 번째 결과의 점수가 min_score 이상 (모든 결과가 충분히 관련)
+        - margin: k 번째와 k+1 번째 결과의 점수 차가 min_margin 이상 (경계가 뚜렷해 더 찾아도 바뀌기 어려움)
+        - stable: 이전 단계와 상위 k 개 id 가 같음
+    """
+
+    def __init__(self,
+                 levels: Sequence[int] = (8, 32, 128),
+                 min_score: Optional[float] = None,
+                 min_margin: Optional[float] = 0.05,
+                 stop_when_stable: bool = True
+                 ):
+        """
+        Args:
+            levels (Sequence[int]): 차례로 시도할 nprobe (오름차순)
+            min_score (Optional[float]): k 번째 결과 점수 기준 (None 이면 사용 안 함)
+            min_margin (Optional[float]): k / k+1 번째 점수 차 기준 (None 이면 사용 안 함)
+            stop_when_stable (bool): 이전 단계와 결과가 같으면 멈춤
+        """
+        if not levels or list(levels) != sorted(levels):
+            raise ValueError(f"levels must be non-empty and ascending: {levels}")
+        self.levels = list(levels)
+        self.min_score = min_score
+        self.min_margin = min_margin
+        self.stop_when_stable = stop_when_stable
+
+
+    def stop_reason(self,
+                    results: List[Dict],
+                    limit: int,
+                    previous_ids: Optional[List]
+                    ) -> Optional[str]:
+        """
+        Args:
+            results (List[Dict]): limit + 1 개까지의 검색 결과 ("id", "score", 점수 내림차순)
+            limit (int): 반환할 결과 수
+            previous_ids (Optional[List]): 이전 단계 상위 limit 개 id
+
+        Returns:
+            Optional[str]: 멈출 이유, 더 검색해야 하면 None
+        """
+        top = results[:limit]
+        # 결과가 모자라면 아직 탐색한 cluster 가 부족한 것
+        if len(top) < limit:
+            return None
+
+        if self.min_score is not None and top[-1]["score"] >= self.min_score:
+            return "score"
+        if (
+            self.min_margin is not None 
+            and len(results) > limit 
+            and top[-1]["score"] - results[limit]["score"] >= self.min_margin
+        ):
+            return "margin"
+        if self.stop_when_stable and previous_ids is not None and [hit["id"] for hit in top] == previous_ids:
+            return "stable"
+        return None
+
+
+class AdaptiveSearchResult(NamedTuple):
+    documents: List[Dict]
+    nprobe: int         # 마지막으로 사용한 nprobe
+    rounds: int         # 검색 횟수
+    reason: str         # score | margin | stable | max
+
+
+async def adaptive_search(search: Callable[[int, int], Awaitable[List[Dict]]],
+                          limit: int,
+                          policy: AdaptiveSearchPolicy
+                          ) -> AdaptiveSearchResult:
+    """
+    Args:
+        search (Callable): (nprobe, limit) -> 점수 내림차순 검색 결과
+        limit (int): 반환할 결과 수
+        policy (AdaptiveSearchPolicy): 단계 / 멈춤 조건
+
+    Returns:
+        AdaptiveSearchResult: 상위 limit 개 결과와 사용한 검색 노력
+    """
+    previous_ids = None
+    for round_index, nprobe in enumerate(policy.levels, start=1):
+        # 경계 점수 차를 보기 위해 하나 더 가져옴
+        results = await search(nprobe, limit + 1)
+
+        reason = "max" if round_index == len(policy.levels) else policy.stop_reason(results, limit, previous_ids)
+        if reason is not None:
+            return AdaptiveSearchResult(results[:limit], nprobe, round_index, reason)
+        previous_ids = [hit["id"] for hit in results[:limit]]
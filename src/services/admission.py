@@ -0,0 +1,166 @@
+import asyncio
+import time
+from contextlib import asynccontextmanager
+from typing import Any, Callable, Dict, Optional
+from services.deadline import deadline_scope
+from services.scheduler import BULK, priority_scope
+
+
+class AdmissionRejected(Exception):
+    """요청 수락 거부 (429: 대기열 가득 참, 503: 대기 시간 초과)"""
+
+    def __init__(self, message: str, status_code: int):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+# ---- endpoint 별 동시 실행 제한 + 제한된 대기열 ---- #
+class EndpointLimiter:
+    def __init__(self,
+                 name: str,
+                 concurrency: int,
+                 queue: int = 0,
+                 queue_timeout: Optional[float] = None,
+                 timeout: Optional[float] = None
+                 ):
+        self.name = name
+        self.concurrency = concurrency
+        self.max_queue = queue                # 실행 슬롯을 기다릴 수 있는 최대 요청 수
+        self.queue_timeout = queue_timeout    # 슬롯 대기 최대 시간 (초)
+        self.timeout = timeout                # 요청 전체 deadline (초, 대기 시간 포함)
+        self.running = 0
+        self.waiting = 0
+        self._semaphore = asyncio.Semaphore(concurrency)
+
+
+    async def acquire(self):
+        """ 실행 슬롯을 잡음 (대기열이 가득 차면 429, queue_timeout 안에 못 잡으면 503). release() 로 반납 """
+        if self._semaphore.locked() and self.waiting >= self.max_queue:
+            raise AdmissionRejected(f"Too many requests for {self.name}", status_code=429)
+
+        self.waiting += 1
+        try:
+            await asyncio.wait_for(self._semaphore.acquire(), timeout=self.queue_timeout)
+        except asyncio.TimeoutError:
+            raise AdmissionRejected(f"Timed out waiting for {self.name}", status_code=503)
+        finally:
+            self.waiting -= 1
+
+        self.running += 1
+
+
+    def release(self):
+        self.running -= 1
+        self._semaphore.release()
+
+
+    @asynccontextmanager
+    async def slot(self):
+        # deadline 은 대기열에 들어온 시점부터 계산
+        with deadline_scope(self.timeout):
+            await self.acquire()
+            try:
+                yield
+            finally:
+                self.release()
+
+
+    def status(self) -> Dict[str, Any]:
+        return {
+            "running": self.running,
+            "waiting": self.waiting,
+            "concurrency": self.concurrency,
+            "queue": self.max_queue,
+        }
+
+
+# 대량 처리 endpoint 는 기본적으로 bulk (나머지는 interactive)
+DEFAULT_ENDPOINT_PRIORITIES = {
+    "llm_generate_batch": BULK,
+    "documents_batch": BULK,
+    "documents_stream": BULK,
+    "maintenance_reembed": BULK,
+}
+
+
+# ---- admission control ---- #
+class AdmissionController:
+    """
+    endpoint 이름별 EndpointLimiter 관리. 설정이 없는 endpoint 는 제한하지 않는다.
+    slot 안에서는 endpoint 의 우선순위 class 가 임베딩 / 생성 scheduler 까지 전달된다
+    (요청 헤더로 이미 정해졌으면 그 값을 유지).
+
+    limits 예시:
+        {"rag_query": {"concurrency": 8, "queue": 32, "queue_timeout": 5, "timeout": 60}}
+    """
+
+    def __init__(self, 
+                 limits: Optional[Dict[str, Dict[str, Any]]] = None,
+                 priorities: Optional[Dict[str, str]] = None
+                 ):
+        self.limiters = {
+            name: EndpointLimiter(name, **config)
+            for name, config in (limits or {}).items()
+        }
+        self.priorities = {**DEFAULT_ENDPOINT_PRIORITIES, **(priorities or {})}
+
+
+    @asynccontextmanager
+    async def slot(self, name: str):
+        with priority_scope(self.priorities.get(name), override=False):
+            limiter = self.limiters.get(name)
+            if limiter is None:
+                yield
+                return
+
+            async with limiter.slot():
+                yield
+
+
+    async def acquire(self, name: str) -> Callable[[], None]:
+        """
+        slot() 과 같지만 deadline 없이 실행 슬롯만 잡고 반납 함수를 돌려줌.
+        endpoint 가 반환된 뒤에도 이어지는 streaming 응답에서, 응답이 끝날 때 반납하기 위해 사용.
+        반납 함수는 여러 번 불려도 한 번만 반납한다
+        """
+        limiter = self.limiters.get(name)
+        if limiter is None:
+            return lambda: None
+
+        await limiter.acquire()
+        released = False
+
+        def release():
+            nonlocal released
+            if not released:
+                released = True
+                limiter.release()
+
+        return release
+
+
+    def status(self) -> Dict[str, Dict[str, Any]]:
+        return {name: limiter.status() for name, limiter in self.limiters.items()}
+
+
+# ---- token bucket 요청률 제한 (tenant 별 quota) ---- #
+class TokenBucket:
+    def __init__(self,
+                 rate: float,
+                 burst: Optional[float] = None
+                 ):
+        self.rate = rate                          # 초당 요청 수
+        self.burst = burst or max(rate, 1.0)      # 순간 최대 요청 수
+        self._tokens = self.burst
+        self._updated = time.monotonic()
+
+
+    def try_acquire(self, tokens: float = 1.0) -> bool:
+        now = time.monotonic()
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+        if self._tokens < tokens:
+            return False
+        self._tokens -= tokens
+        return True
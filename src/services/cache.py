@@ -0,0 +1,66 @@
+import time
+from collections import OrderedDict
+from typing import Any, Hashable, List, Optional
+
+
+# ---- 크기 제한 + TTL LRU 캐시 ---- #
+class LRUCache:
+    def __init__(self,
+                 maxsize: int,
+                 ttl: Optional[float] = None
+                 ):
+        self.maxsize = maxsize
+        self.ttl = ttl                  # 초, None 이면 만료 없음
+        self.hits = 0
+        self.misses = 0
+        self._items = OrderedDict()     # key -> (저장 시각, value)
+
+
+    def get(self,
+            key: Hashable,
+            default: Any = None
+            ) -> Any:
+        item = self._items.get(key)
+        if item is None or (self.ttl is not None and time.monotonic() - item[0] > self.ttl):
+            if item is not None:
+                del self._items[key]
+            self.misses += 1
+            return default
+
+        self._items.move_to_end(key)
+        self.hits += 1
+        return item[1]
+
+
+    def put(self,
+            key: Hashable,
+            value: Any
+            ):
+        if self.maxsize <= 0:
+            return
+
+        self._items[key] = (time.monotonic(), value)
+        self._items.move_to_end(key)
+        while len(self._items) > self.maxsize:
+            self._items.popitem(last=False)
+
+
+    def invalidate(self, key: Hashable):
+        self._items.pop(key, None)
+
+
+    def values(self) -> List[Any]:
+        """ 만료되지 않은 값 (LRU 순서 / hit 통계는 바꾸지 않음) """
+        now = time.monotonic()
+        return [
+            value for stored, value in self._items.values()
+            if self.ttl is None or now - stored <= self.ttl
+        ]
+
+
+    def clear(self):
+        self._items.clear()
+
+
+    def __len__(self) -> int:
+        return len(self._items)
@@ -0,0 +1,90 @@
+from typing import List, NamedTuple, Tuple
+
+
+class Chunk(NamedTuple):
+    text: str               # 원문에서 잘라낸 chunk 본문
+    input_ids: List[int]    # special token 을 포함한 모델 입력 토큰
+
+
+# ---- fast tokenizer offset 기반 문서 분할 ---- #
+class TokenChunker:
+    """
+    임베딩 모델의 fast tokenizer offset을 이용해 문서를 토큰 단위 window로 분할
+
+    문서 전체를 한 번만 토큰화한 뒤, special token을 포함해 정확히
+    max_seq_length 토큰이 되는 window를 stride 만큼 겹치도록 잘라낸다.
+    여러 문서는 한 번의 batch tokenizer 호출로 처리하며, 토큰 id를 그대로
+    돌려주므로 임베딩 시 chunk 를 다시 토큰화하지 않는다.
+    """
+
+    def __init__(self,
+                 tokenizer,
+                 max_seq_length: int,
+                 stride: int = 0
+                 ):
+        if not getattr(tokenizer, "is_fast", False):
+            raise ValueError("TokenChunker requires a fast tokenizer (offset mapping)")
+
+        self.tokenizer = tokenizer
+        # [CLS]/[SEP] 등 모델이 추가하는 special token 자리를 제외한 window 크기
+        self.window = max_seq_length - tokenizer.num_special_tokens_to_add(pair=False)
+        if self.window <= 0:
+            raise ValueError(f"max_seq_length too small: {max_seq_length}")
+        if not 0 <= stride < self.window:
+            raise ValueError(f"stride must be in [0, {self.window}): {stride}")
+
+        self.stride = stride
+        self.step = self.window - stride
+
+
+    # ---- window 경계 계산 ---- #
+    def _spans(self, num_tokens: int) -> List[Tuple[int, int]]:
+        spans = []
+        start = 0
+        while start < num_tokens:
+            end = min(start + self.window, num_tokens)
+            spans.append((start, end))
+            if end == num_tokens:
+                break
+            start += self.step
+        return spans
+
+
+    # ---- 여러 문서 일괄 분할 ---- #
+    def split_batch(self, texts: List[str]) -> List[List[Chunk]]:
+        """
+        Args:
+            texts (List[str]): 분할할 문서 목록
+
+        Returns:
+            List[List[Chunk]]: 문서별 chunk 목록 (토큰이 없는 문서는 빈 chunk 하나)
+        """
+        if not texts:
+            return []
+
+        encoded = self.tokenizer(
+            texts,
+            add_special_tokens=False,
+            return_offsets_mapping=True,
+            return_attention_mask=False,
+            return_token_type_ids=False,
+            verbose=False
+        )
+
+        results = []
+        for text, input_ids, offsets in zip(texts, encoded["input_ids"], encoded["offset_mapping"]):
+            chunks = [
+                Chunk(
+                    text=text[offsets[start][0]:offsets[end - 1][1]],
+                    input_ids=self.tokenizer.build_inputs_with_special_tokens(input_ids[start:end])
+                )
+                for start, end in self._spans(len(input_ids))
+            ]
+            # 빈 list 방지
+            results.append(chunks or [Chunk(text, self.tokenizer.build_inputs_with_special_tokens([]))])
+
+        return results
+
+
+    def split(self, text: str) -> List[Chunk]:
+        return self.split_batch([text])[0]
@@ -0,0 +1,42 @@
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Optional
+
+
+# ---- 요청 deadline (contextvar 로 embedding / Milvus / vLLM 호출까지 전달) ---- #
+# asyncio.to_thread 는 context 를 복사하므로 worker thread 에서도 같은 deadline 을 본다
+_deadline: ContextVar[Optional[float]] = ContextVar("request_deadline", default=None)
+
+
+class DeadlineExceeded(Exception):
+    """요청 deadline 초과 에러"""
+    pass
+
+
+@contextmanager
+def deadline_scope(timeout: Optional[float]):
+    """ timeout 초 뒤를 deadline 으로 설정 (바깥 deadline 이 더 이르면 그대로 유지) """
+    if timeout is None:
+        yield
+        return
+
+    deadline = time.monotonic() + timeout
+    outer = _deadline.get()
+    token = _deadline.set(deadline if outer is None else min(outer, deadline))
+    try:
+        yield
+    finally:
+        _deadline.reset(token)
+
+
+def remaining() -> Optional[float]:
+    """ 남은 시간 (초). deadline 이 없으면 None """
+    deadline = _deadline.get()
+    return None if deadline is None else deadline - time.monotonic()
+
+
+def check_deadline(stage: str):
+    left = remaining()
+    if left is not None and left <= 0:
+        raise DeadlineExceeded(f"Request deadline exceeded during {stage}")
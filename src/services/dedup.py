@@ -0,0 +1,243 @@
+import json
+import os
+import re
+import threading
+import zlib
+from typing import Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+import numpy as np
+from loguru import logger
+
+
+# ---- MinHash 서명 ---- #
+_PRIME = np.uint64(4294967291)     # 2^32 보다 작은 가장 큰 소수 (a * x 가 uint64 안에서 넘치지 않음)
+
+
+def shingles(text: str, size: int = 5) -> Set[str]:
+    """ 공백을 정리한 소문자 텍스트의 글자 n-gram (한국어는 띄어쓰기가 들쭉날쭉해 단어보다 글자 단위가 안정적) """
+    normalized = re.sub(r"\s+", " ", text.lower()).strip()
+    if len(normalized) <= size:
+        return {normalized}
+    return {normalized[i:i + size] for i in range(len(normalized) - size + 1)}
+
+
+class MinHasher:
+    def __init__(self,
+                 num_perm: int = 128,
+                 shingle_size: int = 5,
+                 seed: int = 1
+                 ):
+        self.num_perm = num_perm
+        self.shingle_size = shingle_size
+        # 서명이 파일로 저장되므로 seed 가 같으면 process 가 달라도 같은 해시 함수를 쓴다
+        rng = np.random.RandomState(seed)
+        self._a = rng.randint(1, int(_PRIME), size=num_perm, dtype=np.uint64)
+        self._b = rng.randint(0, int(_PRIME), size=num_perm, dtype=np.uint64)
+
+
+    def signature(self, text: str) -> np.ndarray:
+        """
+        Args:
+            text (str): 문서 본문
+
+        Returns:
+            np.ndarray: (num_perm,) uint32 MinHash 서명
+        """
+        hashes = np.fromiter(
+            (zlib.crc32(shingle.encode("utf-8")) for shingle in shingles(text, self.shingle_size)),
+            dtype=np.uint64
+        )
+        permuted = ((hashes[:, None] * self._a[None, :]) % _PRIME + self._b[None, :]) % _PRIME
+        return permuted.min(axis=0).astype(np.uint32)
+
+
+def estimate_similarity(a: np.ndarray, b: np.ndarray) -> float:
+    """ 두 MinHash 서명으로 추정한 shingle 집합의 Jaccard 유사도 """
+    return float(np.mean(a == b))
+
+
+def lsh_bands(num_perm: int, threshold: float) -> Tuple[int, int]:
+    """
+    후보가 될 확률이 1/2 이 되는 유사도 (1/b)^(1/r) 가 threshold 바로 아래인 (band 수, band 당 행 수).
+    threshold 근처 쌍을 놓치지 않도록 낮은 쪽으로 잡고, 오탐은 서명 비교로 거른다.
+    """
+    candidates = [
+        (num_perm // rows, rows) for rows in range(1, num_perm + 1) if num_perm % rows == 0
+    ]
+    below = [(b, r) for b, r in candidates if (1 / b) ** (1 / r) <= threshold]
+    return max(below, key=lambda band: (1 / band[0]) ** (1 / band[1])) if below else candidates[0]
+
+
+# ---- 수집 시점 near-duplicate 필터 (MinHash LSH) ---- #
+class NearDuplicateIndex:
+    """
+    이미 저장된 문서의 MinHash 서명과 LSH bucket. 추가 / 삭제는 JSON lines 로그에 append 하고
+    시작할 때 다시 읽어 복원한다 (collection 별 파일).
+
+    같은 문서를 동시에 넣는 두 요청은 둘 다 통과할 수 있다 (삽입이 끝난 문서만 색인에 추가하므로).
+    """
+
+    def __init__(self,
+                 path: Optional[str] = None,
+                 threshold: float = 0.8,
+                 num_perm: int = 128,
+                 shingle_size: int = 5,
+                 compact_ratio: float = 0.5
+                 ):
+        """
+        Args:
+            path (Optional[str]): 색인 로그 파일 경로 (None 이면 메모리에만 유지)
+            threshold (float): 중복으로 볼 추정 Jaccard 유사도
+            num_perm (int): MinHash 해시 함수 수
+            shingle_size (int): 글자 n-gram 크기
+            compact_ratio (float): 로그에서 지워진 기록 비율이 이보다 크면 열 때 다시 씀
+        """
+        self.path = path
+        self.threshold = threshold
+        self.hasher = MinHasher(num_perm, shingle_size)
+        self.bands, self.rows = lsh_bands(num_perm, threshold)
+        self.compact_ratio = compact_ratio
+        self._signatures: Dict[str, np.ndarray] = {}
+        self._buckets: Dict[Tuple[int, bytes], Set[str]] = {}
+        self._lock = threading.Lock()
+
+        if path and os.path.exists(path):
+            self._load()
+
+
+    def __len__(self) -> int:
+        return len(self._signatures)
+
+
+    def _band_keys(self, signature: np.ndarray) -> Iterable[Tuple[int, bytes]]:
+        for band in range(self.bands):
+            yield band, signature[band * self.rows:(band + 1) * self.rows].tobytes()
+
+
+    def find(self, signature: np.ndarray) -> Optional[Tuple[str, float]]:
+        """
+        Returns:
+            Optional[Tuple[str, float]]: threshold 이상으로 가장 비슷한 (문서 id, 추정 유사도), 없으면 None
+        """
+        with self._lock:
+            candidates = set()
+            for key in self._band_keys(signature):
+                candidates |= self._buckets.get(key, set())
+
+            best = None
+            for doc_id in candidates:
+                similarity = estimate_similarity(signature, self._signatures[doc_id])
+                if similarity >= self.threshold and (best is None or similarity > best[1]):
+                    best = (doc_id, similarity)
+            return best
+
+
+    def _add(self, doc_id: str, signature: np.ndarray):
+        self._remove(doc_id)
+        self._signatures[doc_id] = signature
+        for key in self._band_keys(signature):
+            self._buckets.setdefault(key, set()).add(doc_id)
+
+
+    def _remove(self, doc_id: str) -> bool:
+        signature = self._signatures.pop(doc_id, None)
+        if signature is None:
+            return False
+
+        for key in self._band_keys(signature):
+            bucket = self._buckets.get(key)
+            if bucket is not None:
+                bucket.discard(doc_id)
+                if not bucket:
+                    del self._buckets[key]
+        return True
+
+
+    def add(self,
+            doc_ids: Sequence[str],
+            signatures: Sequence[np.ndarray]
+            ):
+        with self._lock:
+            for doc_id, signature in zip(doc_ids, signatures):
+                self._add(doc_id, signature)
+            self._append([
+                {"op": "add", "id": doc_id, "sig": signature.tobytes().hex()}
+                for doc_id, signature in zip(doc_ids, signatures)
+            ])
+
+
+    def remove(self, doc_ids: Sequence[str]):
+        with self._lock:
+            removed = [doc_id for doc_id in doc_ids if self._remove(doc_id)]
+            self._append([{"op": "remove", "id": doc_id} for doc_id in removed])
+
+
+    # ---- batch 중복 제거 ---- #
+    def filter(self, texts: Sequence[str]) -> Tuple[List[int], Dict[int, Tuple[str, float]], List[np.ndarray]]:
+        """
+        저장된 문서, 그리고 같은 batch 의 앞선 문서와 near-duplicate 인 문서를 거름
+
+        Args:
+            texts (Sequence[str]): batch 문서 본문
+
+        Returns:
+            Tuple[List[int], Dict[int, Tuple[str, float]], List[np.ndarray]]:
+                (남길 문서 index, 중복 index -> (원본 문서 id 또는 "batch:<index>", 추정 유사도), 남길 문서의 서명)
+        """
+        batch = NearDuplicateIndex(
+            threshold=self.threshold, 
+            num_perm=self.hasher.num_perm, 
+            shingle_size=self.hasher.shingle_size
+        )
+        keep, duplicates, signatures = [], {}, []
+
+        for index, text in enumerate(texts):
+            signature = self.hasher.signature(text)
+            match = self.find(signature) or batch.find(signature)
+            if match is not None:
+                duplicates[index] = match
+                continue
+
+            batch._add(f"batch:{index}", signature)
+            keep.append(index)
+            signatures.append(signature)
+
+        return keep, duplicates, signatures
+
+
+    # ---- 로그 파일 ---- #
+    def _append(self, records: List[Dict[str, str]]):
+        if not self.path or not records:
+            return
+
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.writelines(json.dumps(record) + "\n" for record in records)
+
+
+    def _load(self):
+        num_records = 0
+        with open(self.path, encoding="utf-8") as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                num_records += 1
+                record = json.loads(line)
+                if record["op"] == "add":
+                    self._add(record["id"], np.frombuffer(bytes.fromhex(record["sig"]), dtype=np.uint32))
+                else:
+                    self._remove(record["id"])
+
+        logger.info(f"Loaded {len(self._signatures)} dedup signatures from {self.path}")
+        if num_records and 1 - len(self._signatures) / num_records > self.compact_ratio:
+            self._compact()
+
+
+    def _compact(self):
+        temp_path = f"{self.path}.tmp"
+        with open(temp_path, "w", encoding="utf-8") as f:
+            f.writelines(
+                json.dumps({"op": "add", "id": doc_id, "sig": signature.tobytes().hex()}) + "\n"
+                for doc_id, signature in self._signatures.items()
+            )
+        os.replace(temp_path, self.path)
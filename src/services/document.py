@@ -1,9 +1,19 @@
+import asyncio
+import functools
 import uuid
 
+import numpy as np
+
 from langchain.text_splitter import RecursiveCharacterTextSplitter
-from typing import List, Optional
+from typing import Dict, List, Optional, Tuple
 from services.embedding import EmbeddingService
-from services.milvus import MilvusService
+from services.milvus import EmbeddingMismatchError, MilvusService, SearchProjection, chunk_id
+from services.mmr import cosine_scores, mmr_select
+from services.cache import LRUCache
+from services.dedup import NearDuplicateIndex
+from services.adaptive_search import AdaptiveSearchPolicy, adaptive_search
+from services.metrics import SEARCH_NPROBE, SEARCH_ROUNDS
+from services.tracing import set_attribute, span
 from pydantic import BaseModel
 from loguru import logger
 
@@ -21,11 +31,34 @@ class DocumentBatch(BaseModel):
 
 
 class DocumentService:
-    def __init__(self):
+    def __init__(self, 
+                 embedding_service: Optional[EmbeddingService] = None,
+                 milvus_service: Optional[MilvusService] = None,
+                 query_cache: Optional[LRUCache] = None,
+                 text_cache: Optional[LRUCache] = None,
+                 deduplicator: Optional[NearDuplicateIndex] = None,
+                 chunk_service: Optional[MilvusService] = None,
+                 search_policy: Optional[AdaptiveSearchPolicy] = None
+                 ):
+        """
+        Args:
+            embedding_service (Optional[EmbeddingService]): tenant 간 공유할 임베딩 모델
+            milvus_service (Optional[MilvusService]): 사용할 collection (tenant 별)
+            query_cache (Optional[LRUCache]): 질의 텍스트 -> 임베딩 캐시
+            text_cache (Optional[LRUCache]): 문서 id -> 본문 캐시 (2단계 검색의 본문 조회용)
+            deduplicator (Optional[NearDuplicateIndex]): 저장된 문서의 MinHash 색인 (near-duplicate 는 임베딩 전에 건너뜀)
+            chunk_service (Optional[MilvusService]): chunk 단위 collection (있으면 계층 검색 사용 가능)
+            search_policy (Optional[AdaptiveSearchPolicy]): 질의별 nprobe 조절 (None 이면 고정 nprobe)
+        """
         self.id = str(uuid.uuid4())
         # self.llm_service = VLLMService()
-        self.embedding_service = EmbeddingService()
-        self.milvus_service = MilvusService()
+        self.embedding_service = embedding_service or EmbeddingService()
+        self.milvus_service = milvus_service or MilvusService()
+        self.query_cache = query_cache
+        self.text_cache = text_cache
+        self.deduplicator = deduplicator
+        self.chunk_service = chunk_service
+        self.search_policy = search_policy
         self.text_splitter = RecursiveCharacterTextSplitter(
             chunk_size=CFG.chunk_size,
             chunk_overlap=CFG.chunk_overlap,
@@ -36,16 +69,73 @@ class DocumentService:
     # ---- 문서 삽입 ---- #
     async def process_document(self, 
                                documents: List[Document]
-                               ):
-        results = []
-        
+                               ) -> Tuple[List[Dict], List[Dict]]:
+        """
+        Returns:
+            Tuple[List[Dict], List[Dict]]: (삽입한 문서, near-duplicate 로 건너뛴 문서)
+                건너뛴 문서는 index (요청 내 위치), id, duplicate_of (같다고 본 문서 id), similarity
+        """
+        results, skipped = [], []
+
+        # 이미 저장된 문서 / 같은 batch 의 앞선 문서와 거의 같은 문서는 임베딩하지 않음
+        signatures = None
+        batch = documents
+        if self.deduplicator is not None and documents:
+            with span("document.dedup", documents=len(documents)):
+                while True:
+                    keep, duplicates, signatures = await asyncio.to_thread(
+                        self.deduplicator.filter, [document.text for document in documents]
+                    )
+                    # index 는 collection 과 따로 저장되므로 (삭제 도중 실패, 외부에서 지운 문서 등)
+                    # 같다고 본 문서가 collection 에 남아 있을 때만 건너뛰고, 없는 문서의 서명은 지운 뒤 다시 거른다
+                    stored = list({
+                        match_id for match_id, _ in duplicates.values() if not match_id.startswith("batch:")
+                    })
+                    live = await self.milvus_service.fetch_texts(stored) if stored else {}
+                    gone = [doc_id for doc_id in stored if doc_id not in live]
+                    if not gone:
+                        break
+                    logger.info(f"Dropping {len(gone)} dedup signatures of documents missing from the collection")
+                    await asyncio.to_thread(self.deduplicator.remove, gone)
+            if duplicates:
+                logger.info(f"Skipped {len(duplicates)} near-duplicate documents")
+                skipped = [
+                    {"index": index, "id": documents[index].id, "duplicate_of": match_id, "similarity": similarity}
+                    for index, (match_id, similarity) in sorted(duplicates.items())
+                ]
+            documents = [documents[index] for index in keep]
+            if not documents:
+                return results, skipped
+
+        # document embedding (batch 단위로 한 번에 토큰화/임베딩)
+        embedder = self.embedding_service
+        with span("document.embed", documents=len(documents)):
+            if self.chunk_service is None:
+                embeddings = await embedder.embed_documents(
+                    [document.text for document in documents]
+                )
+            else:
+                # 평균 임베딩을 만들 때 계산한 chunk 임베딩도 그대로 받아 chunk collection 에 저장
+                embedded = await embedder.embed_documents_with_chunks(
+                    [document.text for document in documents]
+                )
+                embeddings = [embedding for embedding, _ in embedded]
+
         for document in documents:
             if not document.id:
                 document.id = str(uuid.uuid4())
-                
-            # document embedding
-            embedding = await self.embedding_service.embed_document(document.text)
-            
+
+        # 같은 batch 의 앞선 문서와 중복이면 그 문서의 (부여된) id 로
+        for duplicate in skipped:
+            if duplicate["duplicate_of"].startswith("batch:"):
+                duplicate["duplicate_of"] = batch[int(duplicate["duplicate_of"][len("batch:"):])].id
+
+        # chunk 를 먼저 넣는다 (문서 검색에 걸리지 않는 chunk 는 보이지 않으므로 중간 실패에도 안전)
+        if self.chunk_service is not None:
+            await self._insert_chunks(documents, [chunks for _, chunks in embedded])
+
+        for document, embedding in zip(documents, embeddings):
+
             entity = {
                 "id": document.id,  
                 "text": document.text,
@@ -55,27 +145,316 @@ class DocumentService:
 
             results.append(entity)
             
-        await self.milvus_service.insert_document(results)
+        with span("document.insert", documents=len(results)):
+            try:
+                await self.milvus_service.insert_document(results, embedding_model=embedder.model_name)
+            except EmbeddingMismatchError:
+                if self.embedding_service is embedder:
+                    raise
+                # 임베딩하는 사이 재임베딩이 끝나 모델이 바뀜 → 새 모델로 다시 임베딩해 한 번 더
+                embedder = self.embedding_service
+                embeddings = await embedder.embed_documents([entity["text"] for entity in results])
+                results = [{**entity, "embedding": embedding} for entity, embedding in zip(results, embeddings)]
+                await self.milvus_service.insert_document(results, embedding_model=embedder.model_name)
+        self._invalidate_texts([entity["id"] for entity in results])
+        if signatures is not None:
+            # 서명 로그 파일에 append 하므로 event loop 밖에서
+            await asyncio.to_thread(self.deduplicator.add, [entity["id"] for entity in results], signatures)
         logger.info(f"Inserted {len(results)} documents")
         
-        return results
+        return results, skipped
+
+
+    async def _insert_chunks(self, 
+                             documents: List[Document],
+                             chunks_per_doc: List[List[Tuple[str, List[float]]]]
+                             ):
+        rows = [
+            {
+                "id": chunk_id(document.id, index),
+                "text": text,
+                "embedding": embedding,
+                "metadata": {**(document.metadata or {}), "doc_id": document.id, "chunk": index}
+            }
+            for document, chunks in zip(documents, chunks_per_doc)
+            for index, (text, embedding) in enumerate(chunks)
+        ]
+        with span("document.insert_chunks", chunks=len(rows)):
+            await self.chunk_service.insert_document(rows)
+
+
+    # ---- 질의 임베딩 (캐시 사용) ---- #
+    async def embed_query(self, query: str) -> List[float]:
+        embedder = self.embedding_service
+        if self.query_cache is None:
+            return await embedder.embed_document(query)
+        
+        # 재임베딩으로 모델이 바뀐 뒤 이전 모델의 임베딩을 꺼내지 않도록 모델별 key
+        key = (embedder.model_name, query)
+        embedding = self.query_cache.get(key)
+        if embedding is None:
+            embedding = await embedder.embed_document(query)
+            self.query_cache.put(key, embedding)
+        return embedding
+
+
+    # ---- 본문 일괄 조회 (캐시 우선) ---- #
+    async def fetch_texts(self, doc_ids: List[str]) -> Dict[str, str]:
+        texts = {}
+        missing = []
+        for doc_id in doc_ids:
+            text = self.text_cache.get(doc_id) if self.text_cache is not None else None
+            if text is None:
+                missing.append(doc_id)
+            else:
+                texts[doc_id] = text
+        
+        if missing:
+            with span("document.fetch_texts", ids=len(missing), cached=len(texts)):
+                fetched = await self.milvus_service.fetch_texts(missing)
+            texts.update(fetched)
+            if self.text_cache is not None:
+                for doc_id, text in fetched.items():
+                    self.text_cache.put(doc_id, text)
+        
+        return texts
+
+
+    def _invalidate_texts(self, doc_ids: List[str]):
+        if self.text_cache is not None:
+            for doc_id in doc_ids:
+                self.text_cache.invalidate(doc_id)
 
 
     # ---- 유사한 문서 검색 ---- #
     async def search_similar_documents(self, 
                                        query: str, 
-                                       limit: int = 5
+                                       limit: int = 5,
+                                       mmr: bool = False,
+                                       fetch_k: Optional[int] = None,
+                                       lambda_mult: float = 0.5,
+                                       duplicate_threshold: Optional[float] = None,
+                                       projection: SearchProjection = SearchProjection.full,
+                                       two_phase: Optional[bool] = None,
+                                       hierarchical: Optional[bool] = None,
+                                       with_embeddings: bool = False,
+                                       query_embedding: Optional[List[float]] = None,
+                                       embedding_model: Optional[str] = None
                                        ):
+        """
+        Args:
+            query (str): 검색 질의
+            limit (int): 반환할 문서 수
+            mmr (bool): MMR 로 서로 다른 문서를 고를지 여부
+            fetch_k (Optional[int]): MMR 후보 수 (기본값: limit * CFG.mmr_fetch_factor)
+            lambda_mult (float): MMR 관련도 가중치 (1 이면 관련도만)
+            duplicate_threshold (Optional[float]): 이 cosine 유사도 이상인 중복 문서 제외
+            projection (SearchProjection): 결과에 포함할 필드 (ids / metadata / full)
+            two_phase (Optional[bool]): full 일 때 검색은 id 만 받고 최종 문서의 본문만 따로 조회
+                (기본값: CFG.search_two_phase, MMR 후보 선택 / 계층 검색 시에는 항상 2단계)
+            hierarchical (Optional[bool]): 상위 문서를 먼저 고르고 그 문서의 chunk 를 반환
+                (기본값: CFG.hierarchical_search, chunk collection 이 있을 때만)
+            with_embeddings (bool): 결과에 문서 임베딩 포함 (대화 session 의 working set 용)
+            query_embedding (Optional[List[float]]): 이미 계산한 질의 임베딩 (없으면 query 를 임베딩)
+            embedding_model (Optional[str]): query_embedding 을 만든 임베딩 모델 (기본값: 지금 모델)
+        """
+        embedder = self.embedding_service
+        search = functools.partial(
+            self._search, query, limit, mmr, fetch_k, lambda_mult, duplicate_threshold, 
+            projection, two_phase, hierarchical, with_embeddings
+        )
+        try:
+            return await search(query_embedding, embedding_model or embedder.model_name)
+        except EmbeddingMismatchError:
+            if self.embedding_service is embedder and query_embedding is None:
+                raise
+            # 질의를 임베딩하는 사이 재임베딩이 끝나 모델이 바뀜 → 지금 모델로 다시 임베딩해 한 번 더
+            return await search(None, self.embedding_service.model_name)
+
+
+    async def _search(self, 
+                      query: str, 
+                      limit: int,
+                      mmr: bool,
+                      fetch_k: Optional[int],
+                      lambda_mult: float,
+                      duplicate_threshold: Optional[float],
+                      projection: SearchProjection,
+                      two_phase: Optional[bool],
+                      hierarchical: Optional[bool],
+                      with_embeddings: bool,
+                      query_embedding: Optional[List[float]],
+                      embedding_model: str
+                      ) -> List[Dict]:
+        projection = SearchProjection(projection)
+        rerank = mmr or duplicate_threshold is not None
+        hierarchical = self.chunk_service is not None and (
+            CFG.hierarchical_search if hierarchical is None else hierarchical
+        )
+        two_phase = projection == SearchProjection.full and (
+            rerank or hierarchical or (CFG.search_two_phase if two_phase is None else two_phase)
+        )
+        # 2단계면 검색에서는 본문을 빼고 가져온다
+        search_projection = SearchProjection.metadata if two_phase else projection
+        
         # 쿼리 텍스트 임베딩
-        query_embedding = await self.embedding_service.embed_document(query)
+        if query_embedding is None:
+            with span("document.embed_query"):
+                query_embedding = await self.embed_query(query)
         
-        # Milvus에서 유사한 문서 검색
-        results = await self.milvus_service.search_documents(
-            query_embedding=query_embedding,
-            limit=limit
-        )
+        if not rerank:
+            # Milvus에서 유사한 문서 검색
+            if hierarchical:
+                documents = await self._search_chunks(query_embedding, limit, with_embeddings, search_projection)
+            else:
+                with span("document.milvus_search", limit=limit, projection=search_projection.value):
+                    documents = await self._ann_search(
+                        query_embedding=query_embedding,
+                        limit=limit,
+                        with_embeddings=with_embeddings,
+                        projection=search_projection,
+                        embedding_model=embedding_model
+                    )
+        
+        else:
+            # 후보를 넉넉히 가져와 임베딩으로 다양성 선택
+            fetch_limit = max(fetch_k or limit * CFG.mmr_fetch_factor, limit)
+            if hierarchical:
+                candidates = await self._search_chunks(query_embedding, fetch_limit, True, search_projection)
+            else:
+                with span("document.milvus_search", limit=fetch_limit, with_embeddings=True):
+                    candidates = await self._ann_search(
+                        query_embedding=query_embedding,
+                        limit=fetch_limit,
+                        with_embeddings=True,
+                        projection=search_projection,
+                        embedding_model=embedding_model
+                    )
+            with span("document.mmr", candidates=len(candidates), k=limit):
+                selected = mmr_select(
+                    query_embedding=query_embedding,
+                    candidate_embeddings=[
+                        candidate["embedding"] if with_embeddings else candidate.pop("embedding") 
+                        for candidate in candidates
+                    ],
+                    k=limit,
+                    lambda_mult=lambda_mult if mmr else 1.0,
+                    duplicate_threshold=duplicate_threshold
+                )
+            documents = [candidates[idx] for idx in selected]
+        
+        if two_phase:
+            # 살아남은 문서의 본문만 한 번에 조회 (그 사이 삭제된 문서는 제외)
+            ids = [document["id"] for document in documents]
+            if hierarchical:
+                with span("document.fetch_texts", ids=len(ids), level="chunk"):
+                    texts = await self.chunk_service.fetch_texts(ids)
+            else:
+                texts = await self.fetch_texts(ids)
+            documents = [
+                {**document, "text": texts[document["id"]]} 
+                for document in documents if document["id"] in texts
+            ]
+        
+        return documents
+
+
+    # ---- 문서 collection ANN 검색 (적응형 nprobe) ---- #
+    async def _ann_search(self, 
+                          query_embedding: List[float],
+                          limit: int,
+                          with_embeddings: bool = False,
+                          projection: SearchProjection = SearchProjection.full,
+                          embedding_model: Optional[str] = None
+                          ) -> List[Dict]:
+        if self.search_policy is None:
+            return await self.milvus_service.search_documents(
+                query_embedding=query_embedding,
+                limit=limit,
+                with_embeddings=with_embeddings,
+                projection=projection,
+                embedding_model=embedding_model
+            )
         
-        return results
+        async def search(nprobe: int, search_limit: int) -> List[Dict]:
+            return await self.milvus_service.search_documents(
+                query_embedding=query_embedding,
+                limit=search_limit,
+                with_embeddings=with_embeddings,
+                projection=projection,
+                nprobe=nprobe,
+                embedding_model=embedding_model
+            )
+        
+        result = await adaptive_search(search, limit, self.search_policy)
+        SEARCH_NPROBE.observe(result.nprobe)
+        SEARCH_ROUNDS.labels(rounds=str(result.rounds), reason=result.reason).inc()
+        set_attribute("nprobe", result.nprobe)
+        set_attribute("search_rounds", result.rounds)
+        return result.documents
+
+
+    # ---- 계층 검색 (문서 → chunk) ---- #
+    async def _search_chunks(self, 
+                             query_embedding: List[float],
+                             limit: int,
+                             with_embeddings: bool,
+                             projection: SearchProjection
+                             ) -> List[Dict]:
+        """
+        문서 collection (chunk 평균 임베딩) 에서 상위 CFG.hierarchical_top_docs 개 문서를 고르고
+        그 문서의 chunk 만 점수를 계산. 비용이 전체 chunk 수가 아니라 고른 문서 수에 비례한다.
+
+        CFG.hierarchical_chunk_search
+            - "exact": 고른 문서의 chunk 임베딩을 모두 가져와 numpy 로 정확한 cosine 계산
+              (문서당 최대 CFG.hierarchical_max_chunks_per_doc 개로 한 문서가 결과를 독차지하지 않게 함)
+            - "filtered": chunk collection 에서 doc_id filter 를 건 ANN 검색
+        """
+        num_docs = max(CFG.hierarchical_top_docs, limit)
+        with span("document.milvus_search", limit=num_docs, level="document"):
+            parents = await self._ann_search(
+                query_embedding=query_embedding,
+                limit=num_docs,
+                projection=SearchProjection.ids
+            )
+        doc_ids = [parent["id"] for parent in parents]
+        if not doc_ids:
+            return []
+
+        if CFG.hierarchical_chunk_search == "filtered":
+            with span("document.chunk_search", documents=len(doc_ids), mode="filtered"):
+                return await self.chunk_service.search_documents(
+                    query_embedding=query_embedding,
+                    limit=limit,
+                    with_embeddings=with_embeddings,
+                    projection=projection,
+                    expr=self.chunk_service.parent_expr(doc_ids)
+                )
+
+        with span("document.chunk_search", documents=len(doc_ids), mode="exact") as current:
+            rows = await self.chunk_service.fetch_chunks(doc_ids, ["embedding", "metadata"])
+            if current:
+                current.set_attribute("chunks", len(rows))
+            scores = cosine_scores(query_embedding, [row["embedding"] for row in rows])
+
+            chunks = []
+            per_doc: Dict[str, int] = {}
+            for index in np.argsort(-scores):
+                row = rows[index]
+                doc_id = row["metadata"].get("doc_id")
+                if per_doc.get(doc_id, 0) >= CFG.hierarchical_max_chunks_per_doc:
+                    continue
+                per_doc[doc_id] = per_doc.get(doc_id, 0) + 1
+
+                chunk = {"id": row["id"], "score": float(scores[index])}
+                if projection != SearchProjection.ids:
+                    chunk["metadata"] = row["metadata"]
+                if with_embeddings:
+                    chunk["embedding"] = row["embedding"]
+                chunks.append(chunk)
+                if len(chunks) == limit:
+                    break
+            return chunks
 
 
     # ---- 문서 삭제 ---- #
@@ -84,6 +463,11 @@ class DocumentService:
                                ) -> bool:
         try:
             await self.milvus_service.delete_documents(doc_ids)
+            if self.chunk_service is not None:
+                await self.chunk_service.delete_chunks(doc_ids)
+            self._invalidate_texts(doc_ids)
+            if self.deduplicator is not None:
+                await asyncio.to_thread(self.deduplicator.remove, doc_ids)
             return True
         
         except Exception as e:
@@ -99,14 +483,46 @@ class DocumentService:
                               ) -> bool:
         
         try:
-            new_embedding = await self.embedding_service.embed_document(new_text)
+            embedder = self.embedding_service
+            if self.chunk_service is None:
+                new_embedding = await embedder.embed_document(new_text)
+            else:
+                [(new_embedding, chunks)] = await embedder.embed_documents_with_chunks([new_text])
             
-            return await self.milvus_service.update_document(
-                doc_id=doc_id, 
-                text=new_text, 
-                embedding=new_embedding, 
-                metadata=new_metadata
-            )
+            try:
+                updated = await self.milvus_service.update_document(
+                    doc_id=doc_id, 
+                    text=new_text, 
+                    embedding=new_embedding, 
+                    metadata=new_metadata,
+                    embedding_model=embedder.model_name
+                )
+            except EmbeddingMismatchError:
+                if self.embedding_service is embedder:
+                    raise
+                # 임베딩하는 사이 재임베딩이 끝나 모델이 바뀜 → 새 모델로 다시 임베딩해 한 번 더
+                embedder = self.embedding_service
+                updated = await self.milvus_service.update_document(
+                    doc_id=doc_id, 
+                    text=new_text, 
+                    embedding=await embedder.embed_document(new_text), 
+                    metadata=new_metadata,
+                    embedding_model=embedder.model_name
+                )
+            self._invalidate_texts([doc_id])
+            
+            # 문서가 바뀐 뒤에만 chunk 를 교체 (문서 수정이 실패하면 새 chunk 가 고아로 남음)
+            if updated and self.chunk_service is not None:
+                await self.chunk_service.delete_chunks([doc_id])
+                await self._insert_chunks(
+                    [Document(id=doc_id, text=new_text, metadata=new_metadata or {})], 
+                    [chunks]
+                )
+            # 수정된 본문은 중복 검사 없이 서명만 갱신
+            if updated and self.deduplicator is not None:
+                signature = await asyncio.to_thread(self.deduplicator.hasher.signature, new_text)
+                await asyncio.to_thread(self.deduplicator.add, [doc_id], [signature])
+            return updated
         
         except Exception as e:
             logger.error(f"문서 업데이트 중 오류 발생: {e}")
@@ -1,80 +1,176 @@
+import asyncio
 import torch
 from sentence_transformers import SentenceTransformer
-from typing import List
+from typing import Any, Callable, List, Optional, Tuple
 from loguru import logger
+from services.chunker import TokenChunker
+from services.deadline import check_deadline
+from services.scheduler import BULK, PriorityScheduler, current_priority
+from services.tracing import span
 from utils.config import CFG
 
 
 # ---- 문서 임베딩 생성 서비스 ---- #
 class EmbeddingService:
-    def __init__(self):
-        self.model = SentenceTransformer(CFG.embedding_model)
+    def __init__(self, model_name: Optional[str] = None):
+        """
+        Args:
+            model_name (Optional[str]): sentence-transformers 모델 (기본값: CFG.embedding_model)
+        """
+        self.model_name = model_name or CFG.embedding_model
+        self.model = SentenceTransformer(self.model_name)
+        self.dimension = self.model.get_sentence_embedding_dimension()
         self.device = "cuda" if torch.cuda.is_available() else "cpu"
         self.model.to(self.device)
-        self.max_seq_length = CFG.max_seq_length
+        # 모델 position 한도를 넘는 window는 잘려나가므로 둘 중 작은 값을 사용
+        self.max_seq_length = min(CFG.max_seq_length, self.model.max_seq_length or CFG.max_seq_length)
+        self.model.max_seq_length = self.max_seq_length
+        self.chunker = TokenChunker(
+            tokenizer=self.model.tokenizer,
+            max_seq_length=self.max_seq_length,
+            stride=CFG.chunk_stride
+        )
+        # 모델 실행은 한 번에 하나 (질의 임베딩 같은 interactive 요청 먼저)
+        self.scheduler = PriorityScheduler("embedding", CFG.bulk_starvation_seconds)
         
-    def _split_text(self, text: str) -> List[str]:
-        words = text.split()
-        chunks = []
-        current_chunk = []
-        current_length = 0
         
-        for word in words:
-            word_length = len(word)
-            if current_length + len(word) + 1 > self.max_seq_length:
-                if current_chunk:
-                    chunks.append(' '.join(current_chunk))
-                    
-                current_chunk = [word]
-                current_length = word_length
-            else:
-                current_chunk.append(word)
-                current_length += word_length + 1
+    # ---- 토큰 id 로 직접 임베딩 (chunk 재토큰화 없음) ---- #
+    def _encode_input_ids(self, 
+                          input_ids: List[List[int]], 
+                          batch_size: int
+                          ) -> torch.Tensor:
+        embeddings = []
+        for start in range(0, len(input_ids), batch_size):
+            check_deadline("embedding")
+            features = self.model.tokenizer.pad(
+                {"input_ids": input_ids[start:start + batch_size]},
+                return_tensors="pt"
+            )
+            features = {key: value.to(self.device) for key, value in features.items()}
+            
+            with torch.no_grad():
+                embeddings.append(self.model(features)["sentence_embedding"])
                 
-        if current_chunk:
-            chunks.append(" ".join(current_chunk))
+        return torch.cat(embeddings)
+        
+        
+    async def embed_documents(self, 
+                              documents: List[str], 
+                              batch_size: int = 32
+                              ) -> List[List[float]]:
+        return await self._schedule(self.encode_documents, documents, batch_size)
+
+
+    def encode_documents(self, 
+                         documents: List[str], 
+                         batch_size: int = 32
+                         ) -> List[List[float]]:
+        """
+        여러 문서를 토큰 window로 분할해 한 번에 임베딩하고 문서별 평균 임베딩 반환
+        (동기 버전, 재임베딩처럼 thread 에서 돌릴 때 사용)
+        
+        Args:
+            documents (List[str]): 문서 본문 목록
+            batch_size (int): 모델 forward 당 chunk 수
             
-        return chunks if chunks else [text]    # 빈 list 방지
+        Returns:
+            List[List[float]]: 문서별 임베딩
+        """
+        return [
+            document_embedding 
+            for document_embedding, _ in self._encode(documents, batch_size, with_chunks=False)
+        ]
+
+
+    async def embed_documents_with_chunks(self, 
+                                          documents: List[str], 
+                                          batch_size: int = 32
+                                          ) -> List[Tuple[List[float], List[Tuple[str, List[float]]]]]:
+        return await self._schedule(self.encode_documents_with_chunks, documents, batch_size)
+
+
+    # ---- 우선순위 scheduler 를 거쳐 thread 에서 임베딩 ---- #
+    async def _schedule(self, 
+                        encode: Callable[[List[str], int], List[Any]],
+                        documents: List[str], 
+                        batch_size: int
+                        ) -> List[Any]:
+        # bulk 문서는 CFG.embedding_bulk_slice_size 개씩 나눠, 조각 사이에 질의 임베딩이 먼저 실행되게 함
+        priority = current_priority()
+        slice_size = (
+            CFG.embedding_bulk_slice_size 
+            if priority == BULK and CFG.embedding_bulk_slice_size else len(documents)
+        )
         
+        results = []
+        for start in range(0, len(documents), max(slice_size, 1)):
+            async with self.scheduler.slot(priority):
+                results.extend(await asyncio.to_thread(encode, documents[start:start + slice_size], batch_size))
+        return results
+
+
+    def encode_documents_with_chunks(self, 
+                                     documents: List[str], 
+                                     batch_size: int = 32
+                                     ) -> List[Tuple[List[float], List[Tuple[str, List[float]]]]]:
+        """
+        문서별 평균 임베딩과 그 계산에 쓴 chunk 임베딩을 함께 반환 (계층 검색용 chunk collection)
         
-    async def embed_document(self, document: str) -> List[float]:
+        Args:
+            documents (List[str]): 문서 본문 목록
+            batch_size (int): 모델 forward 당 chunk 수
+            
+        Returns:
+            List[Tuple[List[float], List[Tuple[str, List[float]]]]]: 문서별 (평균 임베딩, [(chunk 본문, chunk 임베딩)])
+        """
+        return self._encode(documents, batch_size, with_chunks=True)
+
+
+    def _encode(self, 
+                documents: List[str], 
+                batch_size: int,
+                with_chunks: bool
+                ) -> List[Tuple[List[float], List[Tuple[str, List[float]]]]]:
         try:
-            logger.info(f"device: {self.device}")
-            logger.info(f"document: {document}")
+            if not documents:
+                return []
+            
+            with span("embedding.tokenize", documents=len(documents)) as current:
+                chunks_per_doc = self.chunker.split_batch(documents)
+                input_ids = [chunk.input_ids for doc_chunks in chunks_per_doc for chunk in doc_chunks]
+                if current:
+                    current.set_attribute("chunks", len(input_ids))
+            logger.info(f"split {len(documents)} documents into {len(input_ids)} chunks (device: {self.device})")
             
-            chunks = self._split_text(document)
-            logger.info(f"split into {len(chunks)} chunks")
+            # 모든 chunk를 한 번에 임베딩
+            with span("embedding.encode", chunks=len(input_ids), device=self.device):
+                embeddings = self._encode_input_ids(input_ids, batch_size)
             
-            # 각 chunk 임베딩
-            embeddings = []
-            for chunk in chunks:
-                embedding = self.model.encode(
-                    chunk, 
-                    device=self.device,
-                    convert_to_tensor=True,
-                    show_progress_bar=False
+            results = []
+            offset = 0
+            for doc_chunks in chunks_per_doc:
+                doc_embeddings = embeddings[offset:offset + len(doc_chunks)]
+                chunks = (
+                    list(zip([chunk.text for chunk in doc_chunks], doc_embeddings.cpu().tolist())) 
+                    if with_chunks else []
                 )
-                embeddings.append(embedding)
+                results.append((torch.mean(doc_embeddings, dim=0).cpu().tolist(), chunks))
+                offset += len(doc_chunks)
                 
-            if embeddings:
-                mean_embedding = torch.mean(torch.stack(embeddings), dim=0)
-                return mean_embedding.cpu().tolist()
-       
-            return []  
-          
-            # # 모든 chunk가 비어있는 경우 원본 문서 임베딩
-            # embedding = self.model.encode(document, device=self.device)
-            # return embedding.tolist()
+            return results
         
         except Exception as e:
             logger.error(f"Embedding error: {str(e)}")
             raise e
         
+        
+    async def embed_document(self, document: str) -> List[float]:
+        embeddings = await self.embed_documents([document])
+        return embeddings[0]
+        
 
 
 if __name__ == "__main__":
-    import asyncio
-    
     async def test_embedding():
         embedding_service = EmbeddingService()
         test_text = "안녕하세요, 반갑습니다."
@@ -0,0 +1,164 @@
+import json
+import zlib
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional, Tuple
+
+
+class NDJSONLineTooLong(Exception):
+    """NDJSON 한 줄이 최대 길이를 넘은 에러"""
+    pass
+
+
+# ---- NDJSON 스트림 파싱 (gzip 선택) ---- #
+async def iter_ndjson(chunks: AsyncIterator[bytes],
+                      gzip: bool = False,
+                      max_line_bytes: int = 1 << 20,
+                      decompress_chunk_bytes: int = 1 << 16
+                      ) -> AsyncIterator[Tuple[int, Any]]:
+    """
+    요청 본문 chunk 를 받는 대로 줄 단위로 파싱. 메모리에는 미완성 한 줄만 남는다.
+
+    Args:
+        chunks (AsyncIterator[bytes]): 요청 본문 chunk
+        gzip (bool): gzip 압축 여부
+        max_line_bytes (int): 한 줄 최대 크기
+        decompress_chunk_bytes (int): 한 번에 풀 최대 크기 (압축 폭탄 방지)
+
+    Yields:
+        Tuple[int, Any]: (줄 번호, 파싱된 객체 또는 파싱 에러)
+    """
+    decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS) if gzip else None
+    buffer = b""
+    line_no = 0
+
+    def split_lines(data: bytes):
+        nonlocal buffer, line_no
+        buffer += data
+        *lines, buffer = buffer.split(b"\n")
+        if len(buffer) > max_line_bytes:
+            raise NDJSONLineTooLong(f"Line {line_no + len(lines) + 1} exceeds {max_line_bytes} bytes")
+
+        for line in lines:
+            line_no += 1
+            if line.strip():
+                yield line_no, _parse_line(line)
+
+    async for chunk in chunks:
+        if decompressor is None:
+            for item in split_lines(chunk):
+                yield item
+            continue
+
+        data = chunk
+        while data:
+            for item in split_lines(decompressor.decompress(data, decompress_chunk_bytes)):
+                yield item
+            data = decompressor.unconsumed_tail
+
+    if decompressor is not None:
+        for item in split_lines(decompressor.flush()):
+            yield item
+
+    if buffer.strip():
+        line_no += 1
+        yield line_no, _parse_line(buffer)
+
+
+def _parse_line(line: bytes) -> Any:
+    try:
+        return json.loads(line)
+    except ValueError as e:
+        return e
+
+
+# ---- 일정 크기 batch 로 나눠 처리하며 진행 상황 반환 ---- #
+async def ingest_stream(records: AsyncIterator[Tuple[int, Any]],
+                        parse: Callable[[Dict], Any],
+                        process_batch: Callable[[List[Any]], Awaitable[Tuple[int, List[Dict[str, Any]]]]],
+                        batch_size: int = 64,
+                        max_reported_errors: int = 20
+                        ) -> AsyncIterator[Dict[str, Any]]:
+    """
+    Args:
+        records (AsyncIterator[Tuple[int, Any]]): iter_ndjson 결과
+        parse (Callable): dict -> 문서 객체 (검증 실패 시 예외)
+        process_batch (Callable): 문서 batch 를 임베딩/삽입하고 (삽입한 수, 건너뛴 중복 문서) 반환
+            (건너뛴 문서의 index 는 batch 안 위치 → 응답에서는 줄 번호로 바꾼다)
+        batch_size (int): batch 크기 (메모리 사용량 상한)
+        max_reported_errors (int): 응답에 포함할 에러 줄 수
+
+    Yields:
+        Dict[str, Any]: batch 마다 진행 상황 (이번 batch 에서 건너뛴 중복 문서 포함), 마지막에 요약
+    """
+    batch: List[Any] = []
+    batch_lines: List[int] = []
+    inserted = 0
+    duplicates = 0
+    num_batches = 0
+    errors: List[Dict[str, Any]] = []
+    num_errors = 0
+
+    def record_error(line_no: Optional[int], error: Exception):
+        nonlocal num_errors
+        num_errors += 1
+        if len(errors) < max_reported_errors:
+            errors.append({"line": line_no, "error": str(error)})
+
+    async def flush():
+        nonlocal batch, batch_lines, inserted, duplicates, num_batches
+        documents, lines = batch, batch_lines
+        batch, batch_lines = [], []
+        count, skipped = await process_batch(documents)
+        inserted += count
+        duplicates += len(skipped)
+        num_batches += 1
+        return {
+            "status": "progress", 
+            "batch": num_batches, 
+            "inserted": inserted, 
+            "duplicates": duplicates,
+            "errors": num_errors,
+            "skipped": [
+                {"line": lines[entry["index"]], **{k: v for k, v in entry.items() if k != "index"}} 
+                for entry in skipped
+            ]
+        }
+
+    try:
+        async for line_no, record in records:
+            if isinstance(record, Exception):
+                record_error(line_no, record)
+                continue
+
+            try:
+                batch.append(parse(record))
+            except Exception as e:
+                record_error(line_no, e)
+                continue
+            batch_lines.append(line_no)
+
+            if len(batch) >= batch_size:
+                yield await flush()
+
+        if batch:
+            yield await flush()
+
+    except Exception as e:
+        # 이미 삽입한 batch 는 유지되므로 어디까지 처리됐는지 알려준다
+        yield {
+            "status": "error", 
+            "detail": str(e), 
+            "inserted": inserted, 
+            "duplicates": duplicates, 
+            "errors": num_errors, 
+            "error_lines": errors
+        }
+        return
+
+    yield {
+        "status": "success", 
+        "inserted": inserted, 
+        "duplicates": duplicates, 
+        "batches": num_batches, 
+        "errors": num_errors, 
+        "error_lines": errors
+    }
@@ -0,0 +1,218 @@
+import asyncio
+import time
+from typing import Any, Callable, Dict, List, Optional
+from loguru import logger
+from services.embedding import EmbeddingService
+from services.milvus import MilvusService, build_index_params, build_schema, derive_nlist
+from services.scheduler import BULK, priority_scope
+from utils.config import CFG
+
+
+# ---- 백그라운드 index 유지보수 (flush / compaction / IVF 재구축) ---- #
+class IndexMaintenance:
+    """
+    주기적으로 collection 을 점검해
+    - flush_interval 마다 flush (growing segment 를 sealed segment 로)
+    - 삭제된 행 비율이 compaction_ratio 이상이면 compaction (tombstone 정리)
+    - 살아있는 행 수가 마지막 index 구축 시점의 growth_factor 배를 넘으면 nlist 를 다시 계산해 재구축
+
+    Milvus 호출은 모두 thread 에서 실행하고, 재구축은 collection 별 별도 task 로 돌려
+    검색/삽입 요청을 막지 않는다 (재구축은 새 collection + alias 전환, MilvusService.rebuild 참고).
+    """
+
+    def __init__(self,
+                 services: Callable[[], List[MilvusService]],
+                 interval: float = CFG.maintenance_interval,
+                 flush_interval: float = CFG.maintenance_flush_interval,
+                 compaction_ratio: float = CFG.compaction_deleted_ratio,
+                 growth_factor: float = CFG.reindex_growth_factor,
+                 min_rows: int = CFG.reindex_min_rows
+                 ):
+        """
+        Args:
+            services (Callable[[], List[MilvusService]]): 점검할 collection 목록 (적재된 tenant)
+            interval (float): 점검 주기 (초)
+            flush_interval (float): flush 주기 (초)
+            compaction_ratio (float): compaction 을 시작할 삭제 행 비율
+            growth_factor (float): 재구축을 시작할 행 수 증가 배율
+            min_rows (int): 이 행 수보다 작으면 재구축하지 않음
+        """
+        self.services = services
+        self.interval = interval
+        self.flush_interval = flush_interval
+        self.compaction_ratio = compaction_ratio
+        self.growth_factor = growth_factor
+        self.min_rows = min_rows
+        self.state: Dict[str, Dict[str, Any]] = {}
+        self._rebuilds: Dict[str, asyncio.Task] = {}
+
+
+    async def run(self):
+        while True:
+            await asyncio.sleep(self.interval)
+            await self.run_once()
+
+
+    async def run_once(self):
+        for service in self.services():
+            try:
+                await self._maintain(service)
+            except Exception as e:
+                logger.error(f"Index maintenance failed for {service.collection_name}: {e}")
+                self._state(service)["last_error"] = str(e)
+
+
+    def _state(self, service: MilvusService) -> Dict[str, Any]:
+        return self.state.setdefault(service.collection_name, {
+            "last_flush": None,
+            "last_compaction": None,
+            "compaction_id": None,
+            "last_rebuild": None,
+            "rows_at_build": None,
+            "rebuilding": False,
+            "last_error": None,
+        })
+
+
+    async def _maintain(self, service: MilvusService):
+        state = self._state(service)
+        if state["rebuilding"]:
+            return
+
+        # ---- 1. flush ---- #
+        now = time.time()
+        if state["last_flush"] is None or now - state["last_flush"] >= self.flush_interval:
+            await asyncio.to_thread(service.flush)
+            state["last_flush"] = now
+
+        stats = await asyncio.to_thread(service.stats)
+        state.update(stats)
+
+        # ---- 2. 삭제 비율이 높으면 compaction ---- #
+        if stats["deleted_ratio"] >= self.compaction_ratio and not await self._compacting(service, state):
+            state["compaction_id"] = await asyncio.to_thread(service.compact)
+            state["last_compaction"] = now
+            logger.info(
+                f"Compacting {service.collection_name} "
+                f"(deleted ratio {stats['deleted_ratio']:.2f}, id {state['compaction_id']})"
+            )
+
+        # ---- 3. 데이터가 늘어 nlist 가 작아졌으면 재구축 ---- #
+        # 재구축 기록이 없으면 현재 nlist 를 만든 행 수 (nlist = 4 * sqrt(N)) 로 역산
+        rows_at_build = state["rows_at_build"]
+        if rows_at_build is None and stats["nlist"]:
+            rows_at_build = (stats["nlist"] / 4) ** 2
+
+        live_rows = stats["live_rows"]
+        # 위의 await 사이에 재임베딩이 시작됐을 수 있으므로 다시 확인 (확인과 시작 사이에는 await 없음)
+        if (
+            not state["rebuilding"]
+            and rows_at_build
+            and live_rows >= self.min_rows
+            and live_rows > rows_at_build * self.growth_factor
+        ):
+            self._start_rebuild(service, live_rows)
+
+
+    async def _compacting(self,
+                          service: MilvusService,
+                          state: Dict[str, Any]
+                          ) -> bool:
+        if state["compaction_id"] is None:
+            return False
+        compaction = await asyncio.to_thread(service.collection.get_compaction_state)
+        return compaction.state.name != "Completed"
+
+
+    def _start_rebuild(self,
+                       service: MilvusService,
+                       live_rows: int,
+                       on_swap: Optional[Callable[[], None]] = None,
+                       **rebuild_kwargs: Any
+                       ):
+        state = self._state(service)
+        nlist = derive_nlist(live_rows)
+        state["rebuilding"] = True
+        logger.info(f"Rebuilding index of {service.collection_name}: {live_rows} rows, nlist {nlist}")
+
+        async def rebuild():
+            try:
+                # 복사 중 변환 (재임베딩) 은 thread 에서 이 loop 로 넘어와 실행되고 contextvar 가 따라가므로
+                # 임베딩 scheduler 에서 bulk 로 처리된다 (재구축 중 들어온 쓰기 요청은 그 요청의 우선순위)
+                with priority_scope(BULK):
+                    await asyncio.to_thread(
+                        service.rebuild, 
+                        build_index_params(nlist), 
+                        loop=asyncio.get_running_loop(),
+                        **rebuild_kwargs
+                    )
+                # tenant 캐시는 event loop 에서 정리
+                if on_swap is not None:
+                    on_swap()
+                state["rows_at_build"] = live_rows
+                state["last_rebuild"] = time.time()
+                state["last_error"] = None
+            except Exception as e:
+                logger.error(f"Index rebuild failed for {service.collection_name}: {e}")
+                state["last_error"] = str(e)
+            finally:
+                state["rebuilding"] = False
+                self._rebuilds.pop(service.collection_name, None)
+
+        self._rebuilds[service.collection_name] = asyncio.create_task(rebuild())
+
+
+    # ---- 새 임베딩 모델로 재임베딩 (shadow collection + alias 전환) ---- #
+    async def reembed(self,
+                      service: MilvusService,
+                      embedding_service: EmbeddingService,
+                      on_swap: Optional[Callable[[], None]] = None,
+                      batch_size: int = CFG.reembed_batch_size,
+                      switch_embedder: Optional[Callable[[], None]] = None
+                      ):
+        """
+        저장된 문서 본문을 batch 단위로 읽어 새 모델로 임베딩해 새 collection 에 쓰고 alias 를 전환.
+        전환 전까지 검색은 기존 collection / 기존 모델로 계속된다.
+
+        Args:
+            service (MilvusService): 재임베딩할 collection
+            embedding_service (EmbeddingService): 새 임베딩 모델
+            on_swap (Optional[Callable]): alias 전환 뒤 event loop 에서 호출 (캐시 정리)
+            batch_size (int): 한 번에 읽고 임베딩할 문서 수
+            switch_embedder (Optional[Callable]): alias 전환과 같은 lock 안에서 호출 (질의 / 쓰기 임베딩 모델 교체).
+                전환과 교체 사이에 이전 모델로 임베딩한 질의 / 행이 새 collection 에 닿지 않게 한다
+        """
+        state = self._state(service)
+        if state["rebuilding"]:
+            raise RuntimeError(f"{service.collection_name} is already being rebuilt")
+        # 첫 await 전에 표시 → 동시 재임베딩 요청 / maintenance loop 가 같이 재구축을 시작하지 않는다
+        state["rebuilding"] = True
+
+        async def transform(rows: List[Dict]) -> List[Dict]:
+            embeddings = await embedding_service.embed_documents([row["text"] for row in rows])
+            return [{**row, "embedding": embedding} for row, embedding in zip(rows, embeddings)]
+
+        try:
+            stats = await asyncio.to_thread(service.stats)
+        except Exception:
+            state["rebuilding"] = False
+            raise
+        
+        state["target_embedding_model"] = embedding_service.model_name
+        self._start_rebuild(
+            service,
+            stats["live_rows"],
+            batch_size=batch_size,
+            transform=transform,
+            schema=build_schema(embedding_service.dimension, embedding_service.model_name),
+            on_alias_swap=switch_embedder,
+            on_swap=on_swap
+        )
+
+
+    def rebuilding(self, collection_name: str) -> bool:
+        return self.state.get(collection_name, {}).get("rebuilding", False)
+
+
+    def status(self) -> Dict[str, Dict[str, Any]]:
+        return {name: dict(state) for name, state in self.state.items()}
@@ -0,0 +1,60 @@
+from prometheus_client import Counter, Histogram
+
+
+# ---- vLLM prefill / prefix cache ---- #
+PREFILL_TOKENS = Counter(
+    "rag_vllm_prefill_tokens_total",
+    "Prompt tokens prefilled by vLLM, split by prefix cache hit",
+    ["source"]    # cached | computed
+)
+
+TIME_TO_FIRST_TOKEN = Histogram(
+    "rag_vllm_time_to_first_token_seconds",
+    "Time from request arrival to the first generated token",
+    buckets=(0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+)
+
+# ---- speculative decoding ---- #
+SPEC_DRAFT_TOKENS = Counter(
+    "rag_vllm_spec_draft_tokens_total",
+    "Draft tokens proposed by speculative decoding (estimated from decode steps)"
+)
+
+SPEC_ACCEPTED_TOKENS = Counter(
+    "rag_vllm_spec_accepted_tokens_total",
+    "Draft tokens accepted by the target model"
+)
+
+TOKENS_PER_STEP = Histogram(
+    "rag_vllm_tokens_per_decode_step",
+    "Generated tokens per decode step per sequence (1.0 without speculation)",
+    buckets=(1.0, 1.25, 1.5, 2.0, 2.5, 3.0, 4.0, 5.0, 6.0, 8.0)
+)
+
+# ---- 적응형 검색 노력 ---- #
+SEARCH_NPROBE = Histogram(
+    "rag_search_nprobe",
+    "IVF nprobe used for the final search of each query",
+    buckets=(1, 2, 4, 8, 16, 32, 64, 128, 256, 512, 1024)
+)
+
+SEARCH_ROUNDS = Counter(
+    "rag_search_rounds_total",
+    "Adaptive searches by number of escalation rounds and stop reason",
+    ["rounds", "reason"]    # reason: score | margin | stable | max
+)
+
+# ---- 우선순위 class 별 대기 시간 ---- #
+QUEUE_WAIT = Histogram(
+    "rag_scheduler_queue_wait_seconds",
+    "Time spent waiting for the generation engine / embedding model, by priority class",
+    ["scheduler", "priority"],    # scheduler: generation | embedding
+    buckets=(0.001, 0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+)
+
+# ---- 대화 session 후속 질문의 문서 출처 ---- #
+SESSION_RETRIEVAL = Counter(
+    "rag_session_retrieval_total",
+    "Session follow-up turns by where their documents came from",
+    ["source"]    # source: working_set | search
+)
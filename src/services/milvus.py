@@ -1,17 +1,117 @@
-from pymilvus import Collection, MilvusClient, FieldSchema, DataType, CollectionSchema, connections
-from typing import List, Dict
+import asyncio
+import json
+import math
+import threading
+import time
+import uuid
+from enum import Enum
+from pymilvus import Collection, MilvusClient, FieldSchema, DataType, CollectionSchema, connections, utility
+from typing import Any, Awaitable, Callable, List, Dict, Iterator, Optional, Set
 from loguru import logger
+from services.deadline import DeadlineExceeded, check_deadline, remaining
 from utils.config import CFG
 
 
+# ---- IVF index 파라미터 ---- #
+def derive_nlist(num_rows: int) -> int:
+    """ IVF nlist 권장값 4 * sqrt(N) (Milvus 허용 범위 1 ~ 65536) """
+    return int(min(max(4 * math.sqrt(max(num_rows, 1)), 1), 65536))
+
+
+def build_index_params(nlist: int) -> Dict[str, Any]:
+    return {
+        "index_type": "IVF_FLAT",
+        "params": {"nlist": nlist},
+        "metric_type": "COSINE"
+    }
+
+
+# ---- 계층 검색용 chunk collection (chunk 의 metadata.doc_id 가 문서 id) ---- #
+PARENT_FIELD = "doc_id"
+PARENT_INDEX_PARAMS = {"index_type": "INVERTED"}
+
+
+def chunk_id(doc_id: str, index: int) -> str:
+    return f"{doc_id}#{index}"
+
+
+# ---- collection schema (임베딩 모델 / 차원을 description 에 기록) ---- #
+def build_schema(dimension: int, 
+                 embedding_model: str,
+                 parent_field: bool = False
+                 ) -> CollectionSchema:
+    fields = [
+        FieldSchema(name="id", dtype=DataType.VARCHAR, max_length=100, is_primary=True),
+        FieldSchema(name="text", dtype=DataType.VARCHAR, max_length=65535),
+        FieldSchema(name="embedding", dtype=DataType.FLOAT_VECTOR, dim=dimension),
+        FieldSchema(name="metadata", dtype=DataType.JSON)
+    ]
+    if parent_field:
+        # chunk collection: 문서 id 를 index 된 scalar 로 (JSON metadata filter 는 전체 scan)
+        fields.append(FieldSchema(name=PARENT_FIELD, dtype=DataType.VARCHAR, max_length=100))
+    description = json.dumps({
+        "description": "RAG collection",
+        "embedding_model": embedding_model,
+        "dimension": dimension,
+    })
+    return CollectionSchema(fields=fields, description=description)
+
+
+# ---- 검색 결과에 포함할 필드 ---- #
+class SearchProjection(str, Enum):
+    ids = "ids"              # id + score
+    metadata = "metadata"    # id + score + metadata
+    full = "full"            # id + score + metadata + text
+
+
+PROJECTION_FIELDS = {
+    SearchProjection.ids: [],
+    SearchProjection.metadata: ["metadata"],
+    SearchProjection.full: ["text", "metadata"],
+}
+
+
+class EmbeddingMismatchError(Exception):
+    """collection 에 기록된 임베딩 모델 / 차원과 현재 모델이 다른 에러"""
+    pass
+
+
+class _ShadowChanged(Exception):
+    """쓰기 행을 변환하는 사이 재구축이 시작 / 교체된 경우 (변환부터 다시)"""
+    pass
+
+
 class MilvusService:
-    def __init__(self):
-        self.client = MilvusClient(uri=CFG.milvus_uri)
-        self.collection_name = CFG.milvus_collection
-        self.dimension = CFG.milvus_dimension
+    def __init__(self, 
+                 collection_name: Optional[str] = None,
+                 client: Optional[MilvusClient] = None,
+                 embedding_model: Optional[str] = None,
+                 dimension: Optional[int] = None,
+                 parent_field: bool = False
+                 ):
+        """
+        Args:
+            collection_name (Optional[str]): collection 이름 (기본값: CFG.milvus_collection)
+            client (Optional[MilvusClient]): 이미 연결된 client 공유 (tenant 별 collection 용)
+            embedding_model (Optional[str]): 새 collection 에 기록할 임베딩 모델 (기본값: CFG.embedding_model)
+            dimension (Optional[int]): 새 collection 의 임베딩 차원 (기본값: CFG.milvus_dimension)
+            parent_field (bool): chunk collection 여부 (metadata.doc_id 를 index 된 doc_id field 에도 저장)
+        """
+        self.collection_name = collection_name or CFG.milvus_collection
+        self.embedding_model = embedding_model or CFG.embedding_model
+        self.dimension = dimension or CFG.milvus_dimension
+        self.parent_field = parent_field
         self.database = CFG.milvus_db
-        self.connect()
+        self.client = client or MilvusClient(uri=CFG.milvus_uri)
+        if client is None:
+            self.connect()
         self.init_collection()
+        
+        # 재구축 중에는 새 collection 에도 같이 쓰고, 복사 중 바뀐 id 는 복사하지 않는다
+        self._shadow: Optional[Collection] = None
+        self._shadow_transform: Optional[Callable[[List[Dict]], Awaitable[List[Dict]]]] = None
+        self._shadow_touched: Set[str] = set()
+        self._shadow_lock = threading.Lock()
 
 
     # ---- Milvus 연결 ---- #
@@ -39,92 +139,276 @@ class MilvusService:
         if not self.client.has_collection(self.collection_name):
             logger.info(f"Creating collection: {self.collection_name}")
             
-            # schema 정의
-            fields = [
-                FieldSchema(name="id", dtype=DataType.VARCHAR, max_length=100, is_primary=True),
-                FieldSchema(name="text", dtype=DataType.VARCHAR, max_length=65535),
-                FieldSchema(name="embedding", dtype=DataType.FLOAT_VECTOR, dim=self.dimension),
-                FieldSchema(name="metadata", dtype=DataType.JSON)
-            ]
-            
             # schema 생성
-            schema = CollectionSchema(fields=fields, description="RAG collection")
+            schema = build_schema(self.dimension, self.embedding_model, parent_field=self.parent_field)
             self.collection = Collection(name=self.collection_name, schema=schema)
             
-            # index 생성
-            index_params = {
-                "index_type": "IVF_FLAT",
-                "params": {"nlist": CFG.milvus_dimension},
-                "metric_type": "COSINE"
-            }
-            
             # index 생성
             self.collection.create_index(
                 field_name="embedding",
-                index_params=index_params
+                index_params=build_index_params(CFG.milvus_dimension)
             )
+            if self.parent_field:
+                self.collection.create_index(field_name=PARENT_FIELD, index_params=PARENT_INDEX_PARAMS)
         
         else:
             self.collection = Collection(name=self.collection_name)
+            # 쓰기 / 검색 임베딩을 확인할 기준은 collection 에 기록된 모델
+            info = self.embedding_info()
+            self.embedding_model = info["embedding_model"] or self.embedding_model
+            self.dimension = info["dimension"]
+            
+            if self.parent_field and not any(field.name == PARENT_FIELD for field in self.collection.schema.fields):
+                logger.warning(
+                    f"{self.collection_name} has no {PARENT_FIELD} field; chunk lookups fall back to "
+                    f"scanning metadata (drop the collection and ingest again to index them)"
+                )
+                self.parent_field = False
+
+
+    # ---- 문서 id 로 chunk 를 고르는 filter ---- #
+    def parent_expr(self, doc_ids: List[str]) -> str:
+        values = json.dumps(doc_ids, ensure_ascii=False)
+        if self.parent_field:
+            return f"{PARENT_FIELD} in {values}"
+        return f'metadata["doc_id"] in {values}'
+
+
+    def _rows(self, rows: List[Dict]) -> List[Dict]:
+        # chunk collection 은 metadata.doc_id 를 scalar field 로도 저장
+        if not self.parent_field:
+            return rows
+        return [{**row, PARENT_FIELD: row["metadata"]["doc_id"]} for row in rows]
+
+
+    # ---- collection 에 기록된 임베딩 모델 / 차원 ---- #
+    def embedding_info(self) -> Dict[str, Any]:
+        """
+        Returns:
+            Dict[str, Any]: embedding_model (기록 전 collection 은 None), dimension (schema 기준)
+        """
+        try:
+            recorded = json.loads(self.collection.description)
+        except (TypeError, ValueError):
+            recorded = {}
+        
+        dimension = next(
+            field.params.get("dim") for field in self.collection.schema.fields 
+            if field.name == "embedding"
+        )
+        return {
+            "embedding_model": recorded.get("embedding_model"),
+            "dimension": int(dimension),
+        }
+
+
+    def check_embedding(self, 
+                        embedding_model: str, 
+                        dimension: int
+                        ):
+        info = self.embedding_info()
+        if info["dimension"] != dimension:
+            raise EmbeddingMismatchError(
+                f"{self.collection_name} has {info['dimension']}-dim embeddings, "
+                f"but {embedding_model} produces {dimension}-dim embeddings"
+            )
+        
+        if info["embedding_model"] is None:
+            logger.warning(f"{self.collection_name} has no recorded embedding model, assuming {embedding_model}")
+        elif info["embedding_model"] != embedding_model:
+            raise EmbeddingMismatchError(
+                f"{self.collection_name} was embedded with {info['embedding_model']}, not {embedding_model}"
+            )
+
+
+    # ---- collection 메모리 적재 / 해제 ---- #
+    def load(self):
+        self.collection.load()
+        logger.info(f"Loaded collection: {self.collection_name}")
+
+
+    def release(self):
+        self.collection.release()
+        logger.info(f"Released collection: {self.collection_name}")
 
 
     # ---- Milvus 삽입 ---- #
     async def insert_document(self,
-                              documents: List[Dict]
+                              documents: List[Dict],
+                              embedding_model: Optional[str] = None
                               ):
+        """
+        Args:
+            documents (List[Dict]): 삽입할 행 (id / text / embedding / metadata)
+            embedding_model (Optional[str]): embedding 을 만든 모델 (collection 모델과 다르면 EmbeddingMismatchError)
+        """
         try:
-            entities = [
-                [document["id"] for document in documents],
-                [document["text"] for document in documents],
-                [document["embedding"] for document in documents],
-                [document["metadata"] for document in documents]
-            ]
-        
-            self.collection.insert(entities)
+            await self._upsert(documents, embedding_model)
             return True
         
+        except EmbeddingMismatchError:
+            raise
+        
         except Exception as e:
             raise Exception(f"Error inserting document into Milvus: {e}")
 
 
+    async def _upsert(self, 
+                      documents: List[Dict],
+                      embedding_model: Optional[str] = None,
+                      delete_expr: Optional[str] = None
+                      ):
+        ids = [document["id"] for document in documents]
+        while True:
+            # 재구축 중 변환 (재임베딩) 은 쓰기 전에 await 로 (event loop 를 막지 않고 임베딩 scheduler 를 거침)
+            with self._shadow_lock:
+                transform = self._shadow_transform if self._shadow is not None else None
+            shadow_rows = await transform(documents) if transform is not None else None
+            
+            try:
+                # rebuild thread 가 lock 을 잡고 있을 수 있으므로 쓰기는 thread 에서
+                await asyncio.to_thread(
+                    self._write, 
+                    ids=ids, 
+                    rows=documents, 
+                    shadow_rows=shadow_rows, 
+                    delete_expr=delete_expr,
+                    transform=transform,
+                    embedding_model=embedding_model
+                )
+                return
+            except _ShadowChanged:
+                # 변환하는 사이 재구축이 시작됨 → 새 변환으로 다시
+                continue
+
+
     # ---- Milvus 검색 ---- #
     async def search_documents(self, 
                                query_embedding: List[float], 
-                               limit: int = 5
+                               limit: int = 5,
+                               with_embeddings: bool = False,
+                               projection: SearchProjection = SearchProjection.full,
+                               expr: Optional[str] = None,
+                               nprobe: int = 10,
+                               embedding_model: Optional[str] = None
                                ):
+        """
+        Args:
+            query_embedding (List[float]): 질의 임베딩
+            limit (int): 반환할 문서 수
+            with_embeddings (bool): 문서 임베딩 포함 여부 (MMR 용)
+            projection (SearchProjection): 가져올 필드 (id / score 는 항상 포함)
+            expr (Optional[str]): 검색 대상을 제한할 scalar filter (예: parent_expr)
+            nprobe (int): 탐색할 IVF cluster 수 (클수록 정확하고 느림)
+            embedding_model (Optional[str]): query_embedding 을 만든 모델 (collection 모델과 다르면 EmbeddingMismatchError)
+        """
+        if embedding_model is not None and embedding_model != self.embedding_model:
+            raise EmbeddingMismatchError(
+                f"{self.collection_name} is embedded with {self.embedding_model}, query with {embedding_model}"
+            )
+        
         try:
             search_params = {
                 "metric_type": "COSINE",
-                "params": {"nprobe": 10},
+                "params": {"nprobe": nprobe},
             }
             
+            # 필요한 필드만 요청해 gRPC 전송량 / 역직렬화를 줄인다 (text 는 최대 65535자)
+            output_fields = list(PROJECTION_FIELDS[SearchProjection(projection)])
+            if with_embeddings:
+                output_fields.append("embedding")
+            
+            check_deadline("milvus search")
             results = self.collection.search(
                 data=[query_embedding],
                 anns_field="embedding",
                 param=search_params,
                 limit=limit,
-                output_fields=["id", "text", "metadata"]
+                expr=expr,
+                output_fields=output_fields,
+                timeout=remaining()
             )
             
-            return [{
-                "id": hit.id,
-                "text": hit.text,
-                "metadata": hit.metadata,
-                "score": hit.score
-            } for hit in results[0]]
+            documents = []
+            for hit in results[0]:
+                document = {"id": hit.id, "score": hit.score}
+                for field in output_fields:
+                    document[field] = hit.entity.get(field)
+                documents.append(document)
+            
+            return documents
+        
+        except DeadlineExceeded:
+            raise
             
         except Exception as e:
+            # timeout 으로 끊긴 검색은 deadline 초과로 전달
+            check_deadline("milvus search")
             raise Exception(f"Error searching documents in Milvus: {e}")
         
         
+    # ---- id 로 본문 일괄 조회 ---- #
+    async def fetch_texts(self, doc_ids: List[str]) -> Dict[str, str]:
+        if not doc_ids:
+            return {}
+        
+        try:
+            check_deadline("milvus fetch")
+            rows = self.collection.query(
+                expr=f"id in {json.dumps(doc_ids, ensure_ascii=False)}",
+                output_fields=["id", "text"],
+                timeout=remaining()
+            )
+            return {row["id"]: row["text"] for row in rows}
+        
+        except DeadlineExceeded:
+            raise
+        
+        except Exception as e:
+            check_deadline("milvus fetch")
+            raise Exception(f"Error fetching documents from Milvus: {e}")
+
+
+    # ---- 문서 id 로 chunk 일괄 조회 (계층 검색의 정확 점수 계산용) ---- #
+    async def fetch_chunks(self, 
+                           doc_ids: List[str],
+                           output_fields: List[str]
+                           ) -> List[Dict]:
+        if not doc_ids:
+            return []
+        
+        try:
+            check_deadline("milvus fetch")
+            return self.collection.query(
+                expr=self.parent_expr(doc_ids),
+                output_fields=["id", *output_fields],
+                timeout=remaining()
+            )
+        
+        except DeadlineExceeded:
+            raise
+        
+        except Exception as e:
+            check_deadline("milvus fetch")
+            raise Exception(f"Error fetching chunks from Milvus: {e}")
+
+
+    async def delete_chunks(self, doc_ids: List[str]) -> bool:
+        # chunk id 를 먼저 조회해 id 로 삭제 (재구축 중 복사에서 제외할 id 를 알아야 함)
+        rows = await self.fetch_chunks(doc_ids, [])
+        if not rows:
+            return True
+        return await self.delete_documents([row["id"] for row in rows])
+
+
     # ---- Milvus 삭제 ---- #
     async def delete_documents(self, 
                                doc_ids: List[str]
                                ) -> bool:
         try:
-            expr = f'id in ["{"","".join(doc_ids)}"]'
+            expr = f"id in {json.dumps(doc_ids, ensure_ascii=False)}"
             logger.info(f"Deleting documents with expression: {expr}")
-            self.collection.delete(expr)
+            await asyncio.to_thread(self._write, ids=doc_ids, delete_expr=expr)
             logger.info(f"Deleted documents with IDs: {doc_ids}")
             return True
         
@@ -137,13 +421,10 @@ class MilvusService:
                               doc_id: str, 
                               text: str, 
                               embedding: List[float], 
-                              metadata: dict = None
+                              metadata: dict = None,
+                              embedding_model: Optional[str] = None
                               ) -> bool:
         try:
-            # 기존 문서 삭제
-            await self.delete_documents([doc_id])
-
-            # 새 문서 삽입
             document = {
                 "id": doc_id,
                 "text": text,
@@ -151,10 +432,233 @@ class MilvusService:
                 "metadata": metadata or {}
             }
             
-            await self.insert_document([document])
+            # 기존 문서 삭제와 새 문서 삽입을 한 번에 (임베딩 모델이 맞지 않으면 기존 문서도 지우지 않음)
+            expr = f"id in {json.dumps([doc_id], ensure_ascii=False)}"
+            await self._upsert([document], embedding_model, delete_expr=expr)
             logger.info(f"문서 ID {doc_id} 업데이트 완료")
             return True
         
         except Exception as e:
             logger.error(f"문서 업데이트 중 오류 발생: {e}")
             raise e
+
+
+    # ---- Milvus 전체 문서 순회 (batch 단위) ---- #
+    def iterate_documents(self, 
+                          batch_size: int = 1000,
+                          output_fields: Optional[List[str]] = None
+                          ) -> Iterator[List[Dict]]:
+        iterator = self.collection.query_iterator(
+            batch_size=batch_size,
+            output_fields=output_fields or ["id", "text", "embedding", "metadata"]
+        )
+        
+        try:
+            while True:
+                rows = iterator.next()
+                if not rows:
+                    break
+                yield rows
+        
+        finally:
+            iterator.close()
+
+
+    # ---- collection 상태 (maintenance 용) ---- #
+    def stats(self) -> Dict[str, Any]:
+        """
+        Returns:
+            Dict[str, Any]: rows (tombstone 포함 저장 행 수), live_rows, deleted_ratio, nlist
+        """
+        rows = self.collection.num_entities
+        live_rows = self.collection.query(expr="", output_fields=["count(*)"])[0]["count(*)"]
+        
+        nlist = None
+        for index in self.collection.indexes:
+            if index.field_name == "embedding":
+                nlist = index.params.get("params", {}).get("nlist")
+        
+        return {
+            "rows": rows,
+            "live_rows": live_rows,
+            "deleted_ratio": 1.0 - live_rows / rows if rows else 0.0,
+            "nlist": int(nlist) if nlist is not None else None,
+        }
+
+
+    def flush(self):
+        self.collection.flush()
+
+
+    def compact(self) -> int:
+        self.collection.compact()
+        return self.collection.compaction_id
+
+
+    # ---- 쓰기 (재구축 중에는 새 collection 에도 반영) ---- #
+    def _write(self, 
+               ids: List[str],
+               rows: Optional[List[Dict]] = None,
+               shadow_rows: Optional[List[Dict]] = None,
+               delete_expr: Optional[str] = None,
+               transform: Optional[Callable[[List[Dict]], Awaitable[List[Dict]]]] = None,
+               embedding_model: Optional[str] = None
+               ):
+        # alias 전환도 이 lock 안에서 일어나므로, 기존 / 새 collection 중 한쪽에만 쓰이는 일이 없다
+        with self._shadow_lock:
+            if rows is not None and self._shadow is not None and self._shadow_transform is not transform:
+                # shadow_rows 는 지금 재구축의 변환 결과여야 한다 (원본 행을 새 schema 에 쓰지 않음)
+                raise _ShadowChanged()
+            if rows is not None and shadow_rows is not None and self._shadow is None:
+                # 변환을 기다리는 사이 alias 가 전환됨 → self.collection 이 이미 새 collection
+                rows = shadow_rows
+            elif rows is not None and embedding_model is not None and embedding_model != self.embedding_model:
+                # 임베딩하는 사이 재임베딩이 끝나 모델이 바뀜 → 이전 모델의 벡터는 새 collection 에 쓰지 않는다
+                raise EmbeddingMismatchError(
+                    f"{self.collection_name} is embedded with {self.embedding_model}, rows with {embedding_model}"
+                )
+            
+            # 수정은 삭제 후 삽입
+            if delete_expr is not None:
+                self.collection.delete(delete_expr)
+            if rows is not None:
+                self.collection.insert(self._rows(rows))
+            
+            if self._shadow is None:
+                return
+            if delete_expr is not None:
+                self._shadow.delete(delete_expr)
+            if rows is not None:
+                self._shadow.upsert(self._rows(shadow_rows if shadow_rows is not None else rows))
+            self._shadow_touched.update(ids)
+
+
+    # ---- 새 collection 에 재구축 후 alias 전환 (서비스 중단 없음) ---- #
+    def rebuild(self, 
+                index_params: Dict[str, Any],
+                batch_size: int = 1000,
+                transform: Optional[Callable[[List[Dict]], Awaitable[List[Dict]]]] = None,
+                schema: Optional[CollectionSchema] = None,
+                loop: Optional[asyncio.AbstractEventLoop] = None,
+                on_alias_swap: Optional[Callable[[], None]] = None
+                ) -> str:
+        """
+        새 collection 을 만들어 전체 문서를 복사하고 index 를 만든 뒤 collection_name alias 를 새 collection 으로 전환
+
+        복사하는 동안 들어온 삽입/삭제는 두 collection 모두에 반영하고, 이미 반영된 id 는
+        복사에서 건너뛰어 오래된 값으로 덮어쓰지 않는다. alias 전환 전까지 검색은 기존 collection 을 사용한다.
+        이중 쓰기는 이 프로세스의 쓰기에만 적용되므로 collection 에 쓰는 프로세스가 하나일 때만 호출한다.
+
+        Args:
+            index_params (Dict[str, Any]): 새 index 파라미터
+            batch_size (int): 복사 batch 크기
+            transform (Optional[Callable]): 복사 / 재구축 중 쓰기 행의 비동기 변환 (예: 재임베딩)
+            schema (Optional[CollectionSchema]): 새 collection schema (기본값: 기존 schema)
+            loop (Optional[asyncio.AbstractEventLoop]): transform 을 실행할 event loop
+                (rebuild 는 thread 에서 돌고, 변환은 loop 의 임베딩 scheduler 를 거친다)
+            on_alias_swap (Optional[Callable]): alias 전환과 같은 lock 안에서 이 thread 에서 호출
+                (질의 / 쓰기 임베딩 모델 교체처럼 짧은 속성 교체만)
+
+        Returns:
+            str: 새 collection 이름
+        """
+        if transform is not None and loop is None:
+            raise ValueError("rebuild with transform requires the event loop")
+        
+        with self._shadow_lock:
+            if self._shadow is not None:
+                raise RuntimeError(f"{self.collection_name} is already being rebuilt")
+        
+        shadow_name = f"{self.collection_name}__{int(time.time())}_{uuid.uuid4().hex[:8]}"
+        shadow = Collection(name=shadow_name, schema=schema or self.collection.schema)
+        shadow.create_index(field_name="embedding", index_params=index_params)
+        if self.parent_field:
+            shadow.create_index(field_name=PARENT_FIELD, index_params=PARENT_INDEX_PARAMS)
+        logger.info(f"Rebuilding {self.collection_name} into {shadow_name} ({index_params})")
+        
+        with self._shadow_lock:
+            if self._shadow is not None:
+                utility.drop_collection(shadow_name)
+                raise RuntimeError(f"{self.collection_name} is already being rebuilt")
+            self._shadow = shadow
+            self._shadow_transform = transform
+            self._shadow_touched = set()
+        
+        try:
+            copied = 0
+            for rows in self.iterate_documents(batch_size=batch_size):
+                # 변환(재임베딩 등)은 lock 밖에서 → 쓰기 요청을 오래 막지 않는다
+                if transform is not None:
+                    rows = asyncio.run_coroutine_threadsafe(transform(rows), loop).result()
+                
+                with self._shadow_lock:
+                    rows = [row for row in rows if row["id"] not in self._shadow_touched]
+                    if rows:
+                        shadow.upsert(self._rows(rows))
+                copied += len(rows)
+            
+            shadow.flush()
+            utility.wait_for_index_building_complete(shadow_name)
+            # 적재는 오래 걸리므로 lock 밖에서 (그동안의 쓰기는 계속 두 collection 에 반영된다)
+            if utility.load_state(self.collection_name).name == "Loaded":
+                shadow.load()
+            
+            with self._shadow_lock:
+                previous = self._swap_alias(shadow)
+                self._shadow = None
+                self._shadow_transform = None
+                if on_alias_swap is not None:
+                    on_alias_swap()
+
+        except Exception:
+            with self._shadow_lock:
+                self._shadow = None
+                self._shadow_transform = None
+            utility.drop_collection(shadow_name)
+            raise
+
+        # 전환 후에는 새 collection 이 서비스 중이므로 이전 collection 정리에 실패해도 되돌리지 않는다
+        try:
+            utility.drop_collection(previous)
+        except Exception as e:
+            logger.warning(f"Failed to drop previous collection {previous}: {e}")
+
+        logger.info(f"Rebuilt {self.collection_name} -> {shadow_name} ({copied} rows copied)")
+        return shadow_name
+
+
+    def _swap_alias(self, shadow: Collection) -> str:
+        """
+        collection_name alias 를 shadow 로 전환 (shadow_lock 안에서 호출, 적재는 호출 전에 끝낸다)
+
+        Returns:
+            str: 이전 collection 이름 (전환이 끝난 뒤 호출 측에서 삭제)
+        """
+        alias = self.collection_name
+        try:
+            previous = self.client.describe_alias(alias=alias)["collection_name"]
+        except Exception:
+            previous = None
+        
+        if previous is not None:
+            # alias 전환은 원자적이라 다른 client 도 바로 새 collection 을 본다
+            self.client.alter_alias(collection_name=shadow.name, alias=alias)
+        else:
+            # alias 도입 전 collection: alias 는 같은 이름의 collection 과 공존할 수 없으므로
+            # 기존 collection 은 지우지 않고 이름만 바꾼 뒤 alias 를 만든다 (다른 client 는 그 사이 잠깐 실패할 수 있음).
+            # alias 생성에 실패하면 이름을 되돌려 서비스 중인 데이터를 보존한다
+            previous = f"{shadow.name}_previous"
+            utility.rename_collection(alias, previous)
+            try:
+                self.client.create_alias(collection_name=shadow.name, alias=alias)
+            except Exception:
+                utility.rename_collection(previous, alias)
+                self.collection = Collection(name=alias)
+                raise
+
+        self.collection = Collection(name=alias)
+
+        info = self.embedding_info()
+        self.embedding_model = info["embedding_model"] or self.embedding_model
+        self.dimension = info["dimension"]
+        return previous
@@ -0,0 +1,73 @@
+from typing import List, Optional, Sequence
+
+import numpy as np
+
+
+# ---- 질의와 후보 임베딩의 cosine 유사도 (Milvus COSINE metric 과 같은 값) ---- #
+def cosine_scores(query_embedding: Sequence[float],
+                  candidate_embeddings: Sequence[Sequence[float]]
+                  ) -> np.ndarray:
+    candidates = np.asarray(candidate_embeddings, dtype=np.float32)
+    if candidates.size == 0:
+        return np.zeros(0, dtype=np.float32)
+
+    query = np.asarray(query_embedding, dtype=np.float32)
+    candidates = candidates / (np.linalg.norm(candidates, axis=1, keepdims=True) + 1e-12)
+    return candidates @ (query / (np.linalg.norm(query) + 1e-12))
+
+
+# ---- MMR (Maximal Marginal Relevance) 기반 다양성 선택 ---- #
+def mmr_select(query_embedding: Sequence[float],
+               candidate_embeddings: Sequence[Sequence[float]],
+               k: int,
+               lambda_mult: float = 0.5,
+               duplicate_threshold: Optional[float] = None
+               ) -> List[int]:
+    """
+    질문과의 관련도와 이미 고른 문서와의 유사도를 함께 고려해 k 개 후보를 선택
+
+    score = lambda_mult * sim(query, doc) - (1 - lambda_mult) * max(sim(doc, selected))
+
+    Args:
+        query_embedding (Sequence[float]): 질문 임베딩
+        candidate_embeddings (Sequence[Sequence[float]]): 후보 문서 임베딩 (검색 순위 순)
+        k (int): 선택할 문서 수
+        lambda_mult (float): 1 이면 관련도만, 0 이면 다양성만 고려
+        duplicate_threshold (Optional[float]): 이미 고른 문서와 cosine 유사도가 이 값 이상이면 제외
+
+    Returns:
+        List[int]: 선택된 후보 index (선택 순서)
+    """
+    candidates = np.asarray(candidate_embeddings, dtype=np.float32)
+    if k <= 0 or candidates.size == 0:
+        return []
+
+    query = np.asarray(query_embedding, dtype=np.float32)
+    candidates = candidates / (np.linalg.norm(candidates, axis=1, keepdims=True) + 1e-12)
+    query = query / (np.linalg.norm(query) + 1e-12)
+
+    relevance = candidates @ query
+    similarity = candidates @ candidates.T
+
+    num_candidates = len(candidates)
+    max_similarity = np.full(num_candidates, -np.inf, dtype=np.float32)
+    available = np.ones(num_candidates, dtype=bool)
+    selected = []
+
+    while len(selected) < min(k, num_candidates):
+        redundancy = np.where(np.isfinite(max_similarity), max_similarity, 0.0)
+        scores = lambda_mult * relevance - (1.0 - lambda_mult) * redundancy
+        scores[~available] = -np.inf
+
+        best = int(np.argmax(scores))
+        if not np.isfinite(scores[best]):
+            break
+
+        selected.append(best)
+        available[best] = False
+        max_similarity = np.maximum(max_similarity, similarity[best])
+
+        if duplicate_threshold is not None:
+            available &= max_similarity < duplicate_threshold
+
+    return selected
@@ -0,0 +1,53 @@
+from collections import OrderedDict
+from typing import List, Optional
+
+
+# ---- vLLM prefix cache 적중 추정 ---- #
+class PrefixCacheTracker:
+    """
+    vLLM automatic prefix caching 과 같은 방식(block 단위 chained hash)으로
+    이미 prefill 된 prompt block 을 기억해 cached / computed 토큰 수를 추정
+
+    엔진이 요청별 cached 토큰 수를 돌려주지 않는 vLLM 버전에서 metrics 용으로 사용한다.
+    """
+
+    def __init__(self,
+                 block_size: int = 16,
+                 num_blocks: Optional[int] = None
+                 ):
+        self.block_size = block_size
+        self.num_blocks = num_blocks
+        self._blocks = OrderedDict()    # block hash -> None (LRU)
+
+
+    def observe(self, token_ids: List[int]) -> int:
+        """
+        prompt 를 기록하고 캐시에서 재사용됐을 prefix 토큰 수를 반환
+
+        Args:
+            token_ids (List[int]): prompt 토큰
+
+        Returns:
+            int: cached prefix 토큰 수 (block_size 배수)
+        """
+        cached_tokens = 0
+        prefix_hit = True
+        parent = None
+
+        for start in range(0, len(token_ids) - self.block_size + 1, self.block_size):
+            block_hash = hash((parent, tuple(token_ids[start:start + self.block_size])))
+            parent = block_hash
+
+            if prefix_hit and block_hash in self._blocks:
+                cached_tokens += self.block_size
+                self._blocks.move_to_end(block_hash)
+                continue
+
+            prefix_hit = False
+            self._blocks[block_hash] = None
+
+        if self.num_blocks is not None:
+            while len(self._blocks) > self.num_blocks:
+                self._blocks.popitem(last=False)
+
+        return cached_tokens
@@ -0,0 +1,62 @@
+import cProfile
+import io
+import os
+import pstats
+import threading
+from contextlib import contextmanager
+from typing import Optional
+
+
+# 한 process 에서 cProfile 은 동시에 하나만 켤 수 있다
+_profiling = threading.Lock()
+
+
+# ---- 요청 단위 cProfile ---- #
+class RequestProfile:
+    def __init__(self):
+        self.profile = cProfile.Profile()
+        self.path: Optional[str] = None
+        self.summary: str = ""
+
+
+@contextmanager
+def profile_request(output_dir: str,
+                    name: str,
+                    top_n: int = 30
+                    ):
+    """
+    블록 실행 동안 cProfile 을 켜고 <output_dir>/<name>.prof 와 누적 시간 상위 함수 요약을 남김
+
+    cProfile 은 켠 thread 만 기록한다. 요청이 event loop thread 에서 하는 일
+    (임베딩, Milvus 호출, 프롬프트 생성, 토큰화) 은 잡히지만 asyncio.to_thread 로 도는
+    vLLM step 은 빠지므로 그 구간은 trace span 시간을 본다. 같은 loop 의 다른 요청도
+    섞여 기록되므로 부하가 적을 때 한 요청씩 사용한다.
+
+    Args:
+        output_dir (str): .prof 파일 저장 경로
+        name (str): 파일 이름 (보통 trace id)
+        top_n (int): 요약에 남길 함수 수
+
+    Returns:
+        RequestProfile: 다른 요청이 이미 profiling 중이면 None
+    """
+    if not _profiling.acquire(blocking=False):
+        yield None
+        return
+
+    result = RequestProfile()
+    # 응답 헤더에 먼저 실을 수 있도록 경로는 시작할 때 정함 (파일은 끝날 때 기록)
+    result.path = os.path.join(output_dir, f"{name}.prof")
+    result.profile.enable()
+    try:
+        yield result
+    finally:
+        result.profile.disable()
+        _profiling.release()
+
+        os.makedirs(output_dir, exist_ok=True)
+        result.profile.dump_stats(result.path)
+
+        stream = io.StringIO()
+        pstats.Stats(result.profile, stream=stream).sort_stats("cumulative").print_stats(top_n)
+        result.summary = stream.getvalue()
@@ -0,0 +1,110 @@
+import httpx
+from typing import List, Optional, Union
+from loguru import logger
+from transformers import AutoTokenizer
+from services.deadline import DeadlineExceeded, check_deadline, remaining
+from services.scheduler import current_priority
+from services.vllm import GenerationParams, ModelError
+from utils.config import CFG
+
+
+# ---- generation router 를 통한 원격 생성 ---- #
+class RemoteLLMService:
+    """
+    VLLMService 와 같은 인터페이스로 generation router 에 요청을 전달
+
+    API / 검색 tier 는 이 클래스를 사용해 vLLM 엔진을 직접 올리지 않는다.
+    """
+
+    def __init__(self,
+                 base_url: str = CFG.generation_router_url,
+                 timeout: float = CFG.router_request_timeout
+                 ):
+        self.base_url = base_url.rstrip("/")
+        self.client = httpx.AsyncClient(base_url=self.base_url, timeout=timeout)
+        self._tokenizer = None    # worker 와 같은 모델의 tokenizer (프롬프트 길이 계산용, 처음 쓸 때 로드)
+
+
+    def scheduler_status(self) -> Optional[dict]:
+        # 생성 scheduler 는 각 worker 에 있다 (worker /health 참고)
+        return None
+
+
+    # ---- 호출 측 (대화 session 등) 이 프롬프트를 한도에 맞추기 위한 토큰 수 / 한도 ---- #
+    def count_tokens(self, texts: List[str]) -> List[int]:
+        if self._tokenizer is None:
+            self._tokenizer = AutoTokenizer.from_pretrained(CFG.vllm_model_name)
+        return [
+            len(token_ids) for token_ids in self._tokenizer(
+                texts, 
+                add_special_tokens=False, 
+                return_attention_mask=False, 
+                verbose=False
+            )["input_ids"]
+        ]
+
+
+    def prompt_token_budget(self, params: Optional[GenerationParams] = None) -> int:
+        # worker 의 VLLMService._prompt_token_limit 과 같은 계산
+        max_tokens = min((params.max_tokens if params else None) or CFG.max_tokens, CFG.max_tokens)
+        return max(1, CFG.max_input_tokens - max_tokens)
+
+
+    @staticmethod
+    def _dump(params: Optional[GenerationParams]) -> Optional[dict]:
+        return params.dict(exclude_none=True) if params else None
+
+
+    async def _post(self, 
+                    path: str, 
+                    payload: dict
+                    ):
+        try:
+            # 요청 deadline 이 있으면 남은 시간만큼만 기다린다
+            check_deadline("generation")
+            timeout = remaining()
+            if timeout is not None:
+                payload = {**payload, "timeout": timeout}    # worker 에서도 같은 deadline 으로 중단
+            # worker 의 생성 scheduler 도 같은 우선순위 class 로 처리
+            payload = {**payload, "priority": current_priority()}
+            response = await self.client.post(
+                path, 
+                json=payload, 
+                timeout=httpx.USE_CLIENT_DEFAULT if timeout is None else timeout
+            )
+            response.raise_for_status()
+            return response.json()["results"]
+        
+        except DeadlineExceeded:
+            raise
+        
+        except httpx.TimeoutException as e:
+            if remaining() is not None:
+                raise DeadlineExceeded(f"Request deadline exceeded during generation: {e}")
+            raise ModelError(f"Generation router timed out: {e}")
+        
+        except Exception as e:
+            logger.error(f"Remote generate error ({self.base_url}{path}): {e}")
+            raise ModelError(f"Failed to generate text via router: {e}")
+
+
+    # ---- 모델 호출 ---- #
+    async def _call(self,
+                    prompt: str,
+                    params: Optional[GenerationParams] = None
+                    ) -> Union[str, List[str]]:
+        return await self._post("/generate", {"prompt": prompt, "params": self._dump(params)})
+
+
+    # ---- 배치 호출 ---- #
+    async def agenerate(self, 
+                        prompts: List[str],
+                        params: Optional[Union[GenerationParams, List[Optional[GenerationParams]]]] = None
+                        ) -> List[Union[str, List[str]]]:
+        if not isinstance(params, list):
+            params = [params] * len(prompts)
+        
+        return await self._post(
+            "/generate_batch", 
+            {"prompts": prompts, "params": [self._dump(p) for p in params]}
+        )
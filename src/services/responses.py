@@ -0,0 +1,203 @@
+"""
+API 응답 모델과 빠른 직렬화 / 압축
+
+FastAPI 기본 경로 (jsonable_encoder 로 모든 값을 Python 에서 한 번 훑은 뒤 json.dumps) 대신
+검색 / RAG / 생성 응답은 이미 JSON 호환인 dict 를 orjson 으로 바로 bytes 로 만든다.
+response_model 은 OpenAPI 문서용이고, endpoint 가 Response 를 직접 반환하므로 검증 단계를 거치지 않는다.
+
+    - Accept: application/msgpack (또는 application/x-msgpack) → msgpack, 벡터는 float32 little-endian bytes
+      (클라이언트: numpy.frombuffer(hit["embedding"], "<f4"))
+    - Accept-Encoding: br / gzip → 일정 크기 이상일 때 압축 (brotli 가 없으면 gzip 만)
+
+orjson / msgpack / brotli 는 선택 의존성으로, 없으면 각각 json / JSON 응답 / gzip 으로 대체한다.
+"""
+import gzip
+import json
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+
+JSON_MEDIA_TYPE = "application/json"
+MSGPACK_MEDIA_TYPES = ("application/msgpack", "application/x-msgpack")
+VECTOR_FIELDS = ("embedding",)
+
+
+# ---- 응답 모델 (OpenAPI 문서용) ---- #
+class SearchHit(BaseModel):
+    id: str
+    score: float
+    text: Optional[str] = None
+    metadata: Optional[dict] = None
+    embedding: Optional[List[float]] = None    # with_embeddings=true 일 때만 (msgpack 에서는 float32 bytes)
+
+
+class SearchResponse(BaseModel):
+    status: str
+    results: List[SearchHit]
+
+
+class RAGResult(BaseModel):
+    answer: str
+    context: List[str]
+    metadata: Dict[str, Any]
+
+
+class RAGResponse(BaseModel):
+    status: str
+    results: RAGResult
+
+
+class GenerateResponse(BaseModel):
+    status: str
+    results: Any    # 프롬프트별 답변 (n > 1 이면 답변 목록)
+
+
+# ---- 직렬화 ---- #
+def _default(value: Any) -> Any:
+    # orjson / json 이 모르는 타입만 여기로 옴 (전체를 훑지 않음)
+    if isinstance(value, BaseModel):
+        return value.dict()
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    if isinstance(value, np.generic):
+        return value.item()
+    raise TypeError(f"Type is not JSON serializable: {type(value).__name__}")
+
+
+def dumps_json(content: Any) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(content, default=_default, option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS)
+    return json.dumps(content, default=_default, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def _msgpack_default(value: Any) -> Any:
+    if isinstance(value, np.ndarray):
+        return value.astype("<f4", copy=False).tobytes()
+    return _default(value)
+
+
+def dumps_msgpack(content: Any) -> bytes:
+    return msgpack.packb(content, default=_msgpack_default, use_bin_type=True)
+
+
+def pack_vectors(documents: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    검색 결과의 벡터 필드 (list of float) 를 float32 배열로 변환.
+    JSON 은 orjson 이 배열을 통째로 쓰고, msgpack 은 bytes 한 덩어리로 보내 float 마다 Python 객체를 거치지 않는다.
+    """
+    packed = []
+    for document in documents:
+        vectors = {
+            field: np.asarray(document[field], dtype=np.float32)
+            for field in VECTOR_FIELDS if document.get(field) is not None
+        }
+        packed.append({**document, **vectors} if vectors else document)
+    return packed
+
+
+# ---- content negotiation ---- #
+def _accepted(header: Optional[str]) -> Dict[str, float]:
+    """ "a;q=0.5, b" → {"a": 0.5, "b": 1.0} (q=0 은 거부) """
+    accepted = {}
+    for item in (header or "").split(","):
+        name, *params = [part.strip() for part in item.split(";")]
+        if not name:
+            continue
+        quality = 1.0
+        for param in params:
+            key, _, value = param.partition("=")
+            if key.strip() == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        accepted[name.lower()] = quality
+    return accepted
+
+
+def choose_media_type(accept: Optional[str]) -> str:
+    """ msgpack 을 명시적으로 원하는 클라이언트만 msgpack, 나머지는 JSON """
+    if msgpack is None:
+        return JSON_MEDIA_TYPE
+    accepted = _accepted(accept)
+    for media_type in MSGPACK_MEDIA_TYPES:
+        quality = accepted.get(media_type, 0.0)
+        if quality > 0.0 and quality >= accepted.get(JSON_MEDIA_TYPE, 0.0):
+            return media_type
+    return JSON_MEDIA_TYPE
+
+
+def choose_encoding(accept_encoding: Optional[str]) -> Optional[str]:
+    """ br > gzip 순서로 지원하는 압축 선택 (없으면 None) """
+    accepted = _accepted(accept_encoding)
+    wildcard = accepted.get("*", 0.0)
+    for encoding in (("br",) if brotli is not None else ()) + ("gzip",):
+        if accepted.get(encoding, wildcard) > 0.0:
+            return encoding
+    return None
+
+
+def compress(body: bytes,
+             encoding: str,
+             gzip_level: int = 5,
+             brotli_quality: int = 4
+             ) -> bytes:
+    # 응답 지연이 우선이므로 압축률보다 속도 위주의 기본 level
+    if encoding == "br":
+        return brotli.compress(body, quality=brotli_quality)
+    return gzip.compress(body, compresslevel=gzip_level)
+
+
+def encode_body(content: Any,
+                accept: Optional[str] = None,
+                accept_encoding: Optional[str] = None,
+                compress_min_bytes: Optional[int] = 1024,
+                gzip_level: int = 5,
+                brotli_quality: int = 4
+                ) -> Tuple[bytes, str, Dict[str, str]]:
+    """
+    Args:
+        content (Any): JSON 호환 dict (numpy 배열 / pydantic 모델 포함 가능)
+        accept (Optional[str]): 요청 Accept 헤더
+        accept_encoding (Optional[str]): 요청 Accept-Encoding 헤더
+        compress_min_bytes (Optional[int]): 이 크기 이상일 때만 압축 (None 이면 압축 안 함)
+        gzip_level (int): gzip 압축 level
+        brotli_quality (int): brotli 압축 quality
+
+    Returns:
+        Tuple[bytes, str, Dict[str, str]]: 본문, media type, 추가 헤더
+    """
+    media_type = choose_media_type(accept)
+    body = dumps_json(content) if media_type == JSON_MEDIA_TYPE else dumps_msgpack(content)
+
+    # 같은 URL 이라도 헤더에 따라 본문이 다르므로 중간 캐시가 섞지 않게 함
+    headers = {"Vary": "Accept, Accept-Encoding" if msgpack is not None else "Accept-Encoding"}
+    encoding = choose_encoding(accept_encoding)
+    if encoding is not None and compress_min_bytes is not None and len(body) >= compress_min_bytes:
+        body = compress(body, encoding, gzip_level, brotli_quality)
+        headers["Content-Encoding"] = encoding
+    return body, media_type, headers
+
+
+# ---- 기본 응답 class (작은 endpoint 도 json.dumps 대신 orjson 으로 렌더링) ---- #
+class FastJSONResponse(JSONResponse):
+    def render(self, content: Any) -> bytes:
+        return dumps_json(content)
@@ -0,0 +1,152 @@
+import asyncio
+import time
+from collections import deque
+from contextlib import asynccontextmanager, contextmanager
+from contextvars import ContextVar
+from typing import Any, Deque, Dict, Optional, Tuple
+
+from services.deadline import DeadlineExceeded, remaining
+from services.metrics import QUEUE_WAIT
+
+
+# ---- 요청 우선순위 class (contextvar 로 임베딩 / 생성 scheduler 까지 전달) ---- #
+INTERACTIVE = "interactive"
+BULK = "bulk"
+PRIORITY_CLASSES = (INTERACTIVE, BULK)    # 앞쪽이 먼저 실행
+
+_priority: ContextVar[Optional[str]] = ContextVar("request_priority", default=None)
+
+
+def parse_priority(value: Optional[str]) -> Optional[str]:
+    """ 헤더 / payload 값 검증. 알 수 없는 값은 None (endpoint 기본값 사용) """
+    if value is None:
+        return None
+    value = value.strip().lower()
+    return value if value in PRIORITY_CLASSES else None
+
+
+@contextmanager
+def priority_scope(priority: Optional[str], override: bool = True):
+    """
+    Args:
+        priority (Optional[str]): 설정할 class (None 이면 그대로)
+        override (bool): False 면 이미 정해진 class (요청 헤더 등) 를 유지
+    """
+    if priority is None or (not override and _priority.get() is not None):
+        yield
+        return
+
+    token = _priority.set(priority)
+    try:
+        yield
+    finally:
+        _priority.reset(token)
+
+
+def current_priority() -> str:
+    return _priority.get() or INTERACTIVE
+
+
+# ---- 단일 실행 자원 (엔진 / 임베딩 모델) 의 우선순위 scheduler ---- #
+class PriorityScheduler:
+    """
+    asyncio.Lock 처럼 한 번에 하나만 실행하지만, 대기 중인 요청은 FIFO 가 아니라
+    class 순서 (interactive → bulk) 로 깨운다. bulk 는 interactive 가 없을 때 남는 시간을 쓰고,
+    starvation_seconds 이상 기다린 bulk 요청은 interactive 보다 먼저 실행해 계속 진행되게 한다.
+    """
+
+    def __init__(self,
+                 name: str,
+                 starvation_seconds: Optional[float] = None
+                 ):
+        """
+        Args:
+            name (str): metrics label (generation / embedding)
+            starvation_seconds (Optional[float]): 하위 class 최대 대기 시간 (None 이면 보장 안 함)
+        """
+        self.name = name
+        self.starvation_seconds = starvation_seconds
+        self.running: Optional[str] = None
+        self._waiters: Dict[str, Deque[Tuple[float, asyncio.Future]]] = {
+            priority: deque() for priority in PRIORITY_CLASSES
+        }
+
+
+    def _next_waiter(self) -> Optional[Tuple[str, asyncio.Future]]:
+        now = time.monotonic()
+        if self.starvation_seconds is not None:
+            # 가장 오래 기다린 하위 class 요청이 한도를 넘었으면 먼저
+            for priority in PRIORITY_CLASSES[1:]:
+                waiters = self._waiters[priority]
+                if waiters and now - waiters[0][0] >= self.starvation_seconds:
+                    return priority, waiters.popleft()[1]
+
+        for priority in PRIORITY_CLASSES:
+            if self._waiters[priority]:
+                return priority, self._waiters[priority].popleft()[1]
+        return None
+
+
+    async def _acquire(self, priority: str):
+        if self.running is None and not any(self._waiters.values()):
+            self.running = priority
+            return
+
+        future = asyncio.get_running_loop().create_future()
+        entry = (time.monotonic(), future)
+        self._waiters[priority].append(entry)
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                # 깨운 직후 취소됨 → 받은 차례를 다음 요청에 넘김
+                self._release()
+            elif entry in self._waiters[priority]:
+                self._waiters[priority].remove(entry)
+            raise
+
+
+    def _release(self):
+        while True:
+            waiter = self._next_waiter()
+            if waiter is None:
+                self.running = None
+                return
+
+            priority, future = waiter
+            if not future.done():
+                self.running = priority
+                future.set_result(None)
+                return
+
+
+    async def acquire(self, priority: Optional[str] = None):
+        """ priority 를 주지 않으면 현재 요청의 class. 요청 deadline 안에 차례가 오지 않으면 DeadlineExceeded """
+        priority = priority or current_priority()
+        start = time.monotonic()
+        try:
+            # 취소되면 _acquire 가 대기열에서 빠지거나 받은 차례를 넘김 (deadline 이 없으면 그냥 기다림)
+            await asyncio.wait_for(self._acquire(priority), timeout=remaining())
+        except asyncio.TimeoutError:
+            raise DeadlineExceeded(f"Request deadline exceeded while waiting for the {self.name} queue")
+        QUEUE_WAIT.labels(scheduler=self.name, priority=priority).observe(time.monotonic() - start)
+
+
+    def release(self):
+        self._release()
+
+
+    @asynccontextmanager
+    async def slot(self, priority: Optional[str] = None):
+        await self.acquire(priority)
+        try:
+            yield
+        finally:
+            self.release()
+
+
+    def status(self) -> Dict[str, Any]:
+        return {
+            "running": self.running,
+            "waiting": {priority: len(waiters) for priority, waiters in self._waiters.items()},
+        }
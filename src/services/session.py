@@ -0,0 +1,170 @@
+import asyncio
+import re
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Set
+
+import numpy as np
+
+from services.cache import LRUCache
+from services.mmr import cosine_scores
+
+
+# 클라이언트가 정하는 session id (로그 / 메모리 key 로만 사용)
+SESSION_ID_PATTERN = re.compile(r"^[A-Za-z0-9_\-]{1,128}$")
+
+
+class InvalidSessionError(ValueError):
+    """잘못된 session id / session 요청 에러"""
+    pass
+
+
+# ---- 대화 session: 이전 턴의 검색 문서와 append-only 프롬프트 ---- #
+class Session:
+    def __init__(self, session_id: str):
+        self.session_id = session_id
+        self.documents: Dict[str, Dict[str, Any]] = {}    # 프롬프트에 들어간 순서의 working set (id -> text / embedding / metadata)
+        self.history: List[Dict[str, Any]] = []           # 프롬프트에 남아 있는 턴 (text / tokens / documents)
+        self.next_index = 1                                # 다음 문서 번호 (턴 사이에 이어짐)
+        self.turns = 0
+        self.epoch = 0                                     # reset 마다 증가 → 진행 중이던 턴은 기록하지 않음
+        self.stale: Set[str] = set()                       # 턴 진행 중 수정 / 삭제된 문서 id
+        self.embedding_model: Optional[str] = None         # working set 임베딩의 모델 (재임베딩 후에는 다시 쌓음)
+        self.lock = asyncio.Lock()                         # 같은 session 의 턴은 차례로 처리
+
+
+    @property
+    def transcript(self) -> str:
+        """ 지금까지의 턴 (문서 + 질문 + 답변). 다음 턴 프롬프트의 prefix """
+        return "".join(turn["text"] for turn in self.history)
+
+
+    @property
+    def tokens(self) -> int:
+        return sum(turn["tokens"] for turn in self.history)
+
+
+    def match(self,
+              query_embedding: Sequence[float],
+              limit: int,
+              min_score: float
+              ) -> Optional[List[Dict[str, Any]]]:
+        """
+        후속 질문이 working set 문서로 답할 수 있는지 확인
+
+        Args:
+            query_embedding (Sequence[float]): 질의 임베딩
+            limit (int): 반환할 문서 수
+            min_score (float): 가장 가까운 문서의 cosine 유사도가 이보다 낮으면 새로 검색
+
+        Returns:
+            Optional[List[Dict[str, Any]]]: 점수 순 working set 문서, 새로 검색해야 하면 None
+        """
+        if not self.documents:
+            return None
+
+        ids = list(self.documents)
+        scores = cosine_scores(query_embedding, [self.documents[doc_id]["embedding"] for doc_id in ids])
+        if float(scores.max()) < min_score:
+            return None
+
+        return [
+            {**self.documents[ids[index]], "id": ids[index], "score": float(scores[index])}
+            for index in np.argsort(-scores)[:limit]
+        ]
+
+
+    def missing(self, documents: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """ working set 에 없는 문서 (이번 턴 프롬프트에 덧붙일 문서) """
+        return [document for document in documents if document["id"] not in self.documents]
+
+
+    def add_turn(self,
+                 text: str,
+                 tokens: int,
+                 documents: List[Dict[str, Any]]
+                 ):
+        """
+        끝난 턴을 기록
+
+        Args:
+            text (str): 이번 턴에 프롬프트에 덧붙인 문서 + 질문 + 답변
+            tokens (int): text 의 토큰 수
+            documents (List[Dict[str, Any]]): 이번 턴에 새로 들어간 문서 (working set 에 추가)
+        """
+        for document in documents:
+            self.documents[document["id"]] = {
+                "text": document["text"],
+                "embedding": document["embedding"],
+                "metadata": document.get("metadata"),
+            }
+        self.history.append({"text": text, "tokens": tokens, "documents": [document["id"] for document in documents]})
+        self.next_index += len(documents)
+        self.turns += 1
+
+
+    def drop_oldest_turn(self):
+        """ 토큰 한도를 넘으면 가장 오래된 턴을 통째로 버림 (그 턴에 들어간 문서도 working set 에서 제외) """
+        turn = self.history.pop(0)
+        for doc_id in turn["documents"]:
+            self.documents.pop(doc_id, None)
+
+
+    def reset(self):
+        """ working set 문서가 바뀌면 처음부터 다시 쌓음 """
+        self.documents.clear()
+        self.history.clear()
+        self.next_index = 1
+        self.epoch += 1
+
+
+# ---- session 저장소 (개수 제한 LRU + TTL) ---- #
+class SessionStore:
+    def __init__(self,
+                 maxsize: int,
+                 ttl: Optional[float] = None
+                 ):
+        self._sessions = LRUCache(maxsize, ttl)
+
+
+    def get_or_create(self, session_id: str) -> Session:
+        if not SESSION_ID_PATTERN.match(session_id):
+            raise InvalidSessionError(f"Invalid session id: {session_id!r}")
+
+        session = self._sessions.get(session_id)
+        if session is None:
+            session = Session(session_id)
+        # 다시 넣어 TTL 을 마지막 턴부터 센다 (get 은 저장 시각을 갱신하지 않음)
+        self._sessions.put(session_id, session)
+        return session
+
+
+    def delete(self, session_id: str) -> bool:
+        found = self._sessions.get(session_id) is not None
+        self._sessions.invalidate(session_id)
+        return found
+
+
+    def invalidate_documents(self, doc_ids: Iterable[str]) -> int:
+        """
+        문서가 수정 / 삭제되면 그 문서를 프롬프트에 담은 session 을 reset
+        (턴 진행 중인 session 은 끝날 때 이번 턴 문서와 비교하도록 id 를 남김)
+
+        Returns:
+            int: reset 된 session 수
+        """
+        doc_ids = set(doc_ids)
+        reset = 0
+        for session in self._sessions.values():
+            if doc_ids & session.documents.keys():
+                session.reset()
+                reset += 1
+            if session.lock.locked():
+                session.stale.update(doc_ids)
+        return reset
+
+
+    def clear(self):
+        self._sessions.clear()
+
+
+    def __len__(self) -> int:
+        return len(self._sessions)
@@ -0,0 +1,170 @@
+import json
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+import numpy as np
+import pyarrow as pa
+
+
+# ---- 색인된 corpus snapshot (Arrow IPC, float16 벡터) ---- #
+SNAPSHOT_FORMAT_VERSION = "1"
+
+
+def snapshot_schema(dimension: int,
+                    metadata: Optional[Dict[str, str]] = None
+                    ) -> pa.Schema:
+    return pa.schema(
+        [
+            pa.field("id", pa.string()),
+            pa.field("text", pa.large_string()),
+            pa.field("metadata", pa.string()),    # JSON 문자열 (문서마다 key 가 다름)
+            pa.field("embedding", pa.list_(pa.float16(), dimension)),
+        ],
+        metadata={"format_version": SNAPSHOT_FORMAT_VERSION, "dimension": str(dimension), **(metadata or {})}
+    )
+
+
+def _to_record_batch(rows: List[Dict[str, Any]], schema: pa.Schema) -> pa.RecordBatch:
+    dimension = int(schema.metadata[b"dimension"])
+    embeddings = np.asarray([row["embedding"] for row in rows], dtype=np.float16).reshape(-1, dimension)
+
+    return pa.record_batch(
+        [
+            pa.array([row["id"] for row in rows], pa.string()),
+            pa.array([row["text"] for row in rows], pa.large_string()),
+            pa.array([json.dumps(row.get("metadata") or {}, ensure_ascii=False) for row in rows], pa.string()),
+            pa.FixedSizeListArray.from_arrays(pa.array(embeddings.ravel(), pa.float16()), dimension),
+        ],
+        schema=schema
+    )
+
+
+def write_snapshot(path: str,
+                   batches: Iterable[List[Dict[str, Any]]],
+                   dimension: int,
+                   metadata: Optional[Dict[str, str]] = None
+                   ) -> int:
+    """
+    문서 batch 를 Arrow IPC 파일로 기록
+
+    Args:
+        path (str): 저장 경로
+        batches (Iterable[List[Dict[str, Any]]]): {"id", "text", "metadata", "embedding"} 문서 batch
+        dimension (int): 임베딩 차원
+        metadata (Optional[Dict[str, str]]): 파일에 함께 저장할 정보 (임베딩 모델 등)
+
+    Returns:
+        int: 기록한 문서 수
+    """
+    schema = snapshot_schema(dimension, metadata)
+    count = 0
+
+    with pa.OSFile(path, "wb") as sink, pa.ipc.new_file(sink, schema) as writer:
+        for rows in batches:
+            if rows:
+                writer.write_batch(_to_record_batch(rows, schema))
+                count += len(rows)
+
+    return count
+
+
+def read_snapshot_metadata(path: str) -> Dict[str, str]:
+    with pa.memory_map(path, "r") as source:
+        schema = pa.ipc.open_file(source).schema
+    return {key.decode(): value.decode() for key, value in schema.metadata.items()}
+
+
+def read_snapshot(path: str) -> Iterator[List[Dict[str, Any]]]:
+    """ snapshot 을 record batch 단위의 문서 목록으로 읽음 (float32 임베딩) """
+    with pa.memory_map(path, "r") as source:
+        reader = pa.ipc.open_file(source)
+        for index in range(reader.num_record_batches):
+            batch = reader.get_batch(index)
+            dimension = batch.schema.field("embedding").type.list_size
+            embeddings = (
+                batch.column("embedding").flatten().to_numpy(zero_copy_only=False)
+                .reshape(-1, dimension).astype(np.float32)
+            )
+
+            yield [
+                {
+                    "id": doc_id,
+                    "text": text,
+                    "metadata": json.loads(metadata),
+                    "embedding": embedding.tolist(),
+                }
+                for doc_id, text, metadata, embedding in zip(
+                    batch.column("id").to_pylist(),
+                    batch.column("text").to_pylist(),
+                    batch.column("metadata").to_pylist(),
+                    embeddings
+                )
+            ]
+
+
+# ---- memory-map 된 snapshot 위에서 로컬 검색 ---- #
+class SnapshotIndex:
+    """
+    snapshot 파일을 memory-map 해 Milvus 없이 cosine 검색 (exact, block 단위 계산)
+
+    벡터는 파일의 float16 버퍼를 그대로 참조하므로 corpus 크기만큼 메모리를 새로 잡지 않는다.
+    """
+
+    def __init__(self,
+                 path: str,
+                 block_size: int = 65536
+                 ):
+        self._source = pa.memory_map(path, "r")
+        self.table = pa.ipc.open_file(self._source).read_all()
+        self.dimension = self.table.schema.field("embedding").type.list_size
+        self.block_size = block_size
+
+        embedding_column = self.table.column("embedding")
+        self._blocks = [
+            chunk.flatten().to_numpy(zero_copy_only=True).reshape(-1, self.dimension)
+            for chunk in embedding_column.chunks
+        ]
+        # norm 도 block 단위로 계산해 float32 사본이 한꺼번에 생기지 않도록 한다
+        self._norms = [
+            np.concatenate([
+                np.linalg.norm(block[start:start + block_size].astype(np.float32), axis=1)
+                for start in range(0, len(block), block_size)
+            ] or [np.zeros(0, dtype=np.float32)]) + 1e-12
+            for block in self._blocks
+        ]
+
+
+    def __len__(self) -> int:
+        return self.table.num_rows
+
+
+    def search(self,
+               query_embedding: List[float],
+               limit: int = 5
+               ) -> List[Dict[str, Any]]:
+        query = np.asarray(query_embedding, dtype=np.float32)
+        query = query / (np.linalg.norm(query) + 1e-12)
+
+        scores = []
+        for block, norms in zip(self._blocks, self._norms):
+            for start in range(0, len(block), self.block_size):
+                rows = block[start:start + self.block_size].astype(np.float32)
+                scores.append(rows @ query / norms[start:start + self.block_size])
+
+        if not scores:
+            return []
+
+        scores = np.concatenate(scores)
+        limit = min(limit, len(scores))
+        top = np.argpartition(-scores, limit - 1)[:limit]
+        top = top[np.argsort(-scores[top])]
+
+        return [{
+            "id": self.table.column("id")[int(row)].as_py(),
+            "text": self.table.column("text")[int(row)].as_py(),
+            "metadata": json.loads(self.table.column("metadata")[int(row)].as_py()),
+            "score": float(scores[row])
+        } for row in top]
+
+
+    def close(self):
+        self._source.close()
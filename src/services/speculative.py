@@ -0,0 +1,120 @@
+from typing import Callable, List, NamedTuple, Optional, Sequence, Tuple
+
+
+# ---- prompt lookup (n-gram) speculative decoding ---- #
+class NgramProposer:
+    """
+    지금까지의 토큰(프롬프트 + 생성)에서 마지막 n-gram 이 앞에서 나온 위치를 찾아
+    그 뒤에 이어진 토큰을 draft 로 제안. 검색 문서를 그대로 옮겨 쓰는 답변에서 적중률이 높다.
+
+    vLLM 의 "[ngram]" speculative model 과 같은 prompt lookup 방식의 CPU 참조 구현 (테스트 / 적중률 추정용)
+    """
+
+    def __init__(self,
+                 num_speculative_tokens: int = 5,
+                 max_ngram: int = 4,
+                 min_ngram: int = 1
+                 ):
+        if not 1 <= min_ngram <= max_ngram:
+            raise ValueError(f"Invalid n-gram range: {min_ngram}..{max_ngram}")
+        self.num_speculative_tokens = num_speculative_tokens
+        self.max_ngram = max_ngram
+        self.min_ngram = min_ngram
+
+
+    def propose(self, token_ids: Sequence[int]) -> List[int]:
+        """
+        Args:
+            token_ids (Sequence[int]): 프롬프트 + 지금까지 생성한 토큰
+
+        Returns:
+            List[int]: 최대 num_speculative_tokens 개의 draft 토큰 (일치가 없으면 빈 list)
+        """
+        length = len(token_ids)
+        for n in range(min(self.max_ngram, length - 1), self.min_ngram - 1, -1):
+            suffix = list(token_ids[length - n:])
+
+            # 가장 최근 일치를 우선 (답변이 방금 옮겨 쓰던 문서 위치를 이어감)
+            for start in range(length - n - 1, -1, -1):
+                if list(token_ids[start:start + n]) == suffix:
+                    follow = token_ids[start + n:start + n + self.num_speculative_tokens]
+                    if follow:
+                        return list(follow)
+        return []
+
+
+class SpeculativeResult(NamedTuple):
+    token_ids: List[int]
+    steps: int          # target 모델 forward 횟수
+    proposed: int       # 제안한 draft 토큰 수
+    accepted: int       # 채택된 draft 토큰 수
+
+    @property
+    def acceptance_rate(self) -> float:
+        return self.accepted / self.proposed if self.proposed else 0.0
+
+
+def speculative_greedy_decode(verify: Callable[[List[int], List[int]], List[int]],
+                              prompt_ids: Sequence[int],
+                              max_tokens: int,
+                              proposer: NgramProposer,
+                              eos_token_id: Optional[int] = None
+                              ) -> SpeculativeResult:
+    """
+    greedy 검증 방식 speculative decoding. 출력은 draft 없이 한 토큰씩 greedy 생성한 결과와 같다.
+
+    Args:
+        verify (Callable): (현재 토큰, draft) -> target 모델의 greedy 토큰 len(draft) + 1 개
+            (한 번의 forward 로 draft 의 각 위치와 그 다음 위치를 검증)
+        prompt_ids (Sequence[int]): 프롬프트 토큰
+        max_tokens (int): 최대 생성 토큰 수
+        proposer (NgramProposer): draft 제안기
+        eos_token_id (Optional[int]): 종료 토큰
+
+    Returns:
+        SpeculativeResult: 생성 토큰과 forward / 제안 / 채택 수
+    """
+    tokens = list(prompt_ids)
+    generated: List[int] = []
+    steps = proposed = accepted = 0
+
+    while len(generated) < max_tokens:
+        draft = proposer.propose(tokens)[:max_tokens - len(generated) - 1]
+        target = verify(tokens, draft)
+        steps += 1
+        proposed += len(draft)
+
+        # draft 와 target 이 처음 달라지는 위치까지 채택하고, 그 위치의 target 토큰을 덧붙인다
+        num_accepted = 0
+        while num_accepted < len(draft) and draft[num_accepted] == target[num_accepted]:
+            num_accepted += 1
+        accepted += num_accepted
+
+        new_tokens = target[:num_accepted + 1]
+        if eos_token_id is not None and eos_token_id in new_tokens:
+            new_tokens = new_tokens[:new_tokens.index(eos_token_id) + 1]
+
+        tokens.extend(new_tokens)
+        generated.extend(new_tokens)
+        if eos_token_id is not None and generated[-1] == eos_token_id:
+            break
+
+    return SpeculativeResult(generated[:max_tokens], steps, proposed, accepted)
+
+
+# ---- 엔진 출력으로 draft 채택 수 추정 ---- #
+def estimate_acceptance(num_output_tokens: int,
+                        num_decode_steps: int,
+                        num_speculative_tokens: int
+                        ) -> Tuple[int, int]:
+    """
+    speculative decoding 의 decode step 은 채택된 draft + 1 개 토큰을 내므로
+    (출력 토큰 - prefill 이 낸 1 개 - decode step 수) 가 채택된 draft 토큰 수.
+    n-gram 일치가 없어 제안하지 않은 step 도 num_speculative_tokens 개로 세므로 채택률은 하한값이다.
+
+    Returns:
+        Tuple[int, int]: (제안한 draft 토큰 수, 채택된 draft 토큰 수)
+    """
+    proposed = num_decode_steps * num_speculative_tokens
+    accepted = min(max(num_output_tokens - 1 - num_decode_steps, 0), proposed)
+    return proposed, accepted
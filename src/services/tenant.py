@@ -0,0 +1,380 @@
+import asyncio
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from typing import Any, Callable, Dict, List, Optional
+from loguru import logger
+from chains.rag_chain import RAGChain
+from services.adaptive_search import AdaptiveSearchPolicy
+from services.admission import AdmissionRejected, TokenBucket
+from services.cache import LRUCache
+from services.dedup import NearDuplicateIndex
+from services.document import DocumentService
+from services.embedding import EmbeddingService
+from services.milvus import MilvusService
+from services.session import SessionStore
+from utils.config import CFG
+
+
+DEFAULT_TENANT = "default"
+# Milvus collection 이름에 그대로 붙이므로 영문/숫자/_ 만 허용
+# ("__" 는 파생 collection 이름 <collection>__chunks, <collection>__<timestamp> 에 쓰므로 제외)
+TENANT_ID_PATTERN = re.compile(r"^(?!.*__)[A-Za-z0-9_]{1,64}$")
+
+
+class InvalidTenantError(ValueError):
+    """잘못된 tenant id 에러"""
+    pass
+
+
+class UnknownTenantError(InvalidTenantError):
+    """CFG.allowed_tenants 에 없는 tenant id 에러"""
+    pass
+
+
+class Tenant:
+    def __init__(self,
+                 tenant_id: str,
+                 document_service: DocumentService,
+                 rag_chain: RAGChain
+                 ):
+        self.tenant_id = tenant_id
+        self.document_service = document_service
+        self.rag_chain = rag_chain
+        self.loaded = False
+        self.load_lock = asyncio.Lock()
+        self.in_flight = 0
+        self.last_used = time.monotonic()
+
+
+    @property
+    def milvus_service(self) -> MilvusService:
+        return self.document_service.milvus_service
+
+
+    @property
+    def milvus_services(self) -> List[MilvusService]:
+        """ 문서 collection 과 (계층 검색 시) chunk collection """
+        chunk_service = self.document_service.chunk_service
+        return [self.milvus_service] + ([chunk_service] if chunk_service is not None else [])
+
+
+    # ---- 문서가 바뀌면 이전 답변 캐시 무효화 ---- #
+    def invalidate_answers(self, doc_ids: Optional[List[str]] = None):
+        """ 문서가 바뀌면 answer cache 를 비우고, 수정 / 삭제된 문서 (doc_ids) 를 담은 대화 session 은 reset """
+        if self.rag_chain.answer_cache is not None:
+            self.rag_chain.answer_cache.clear()
+        if doc_ids and self.rag_chain.session_store is not None:
+            self.rag_chain.session_store.invalidate_documents(doc_ids)
+
+
+    # ---- idle tenant 메모리 반환 ---- #
+    def clear_caches(self):
+        self.invalidate_answers()
+        for cache in (self.document_service.query_cache, self.document_service.text_cache):
+            if cache is not None:
+                cache.clear()
+        if self.rag_chain.session_store is not None:
+            self.rag_chain.session_store.clear()
+
+
+    def status(self) -> Dict[str, Any]:
+        query_cache = self.document_service.query_cache
+        text_cache = self.document_service.text_cache
+        answer_cache = self.rag_chain.answer_cache
+        deduplicator = self.document_service.deduplicator
+        session_store = self.rag_chain.session_store
+        return {
+            "collection": self.milvus_service.collection_name,
+            "loaded": self.loaded,
+            "in_flight": self.in_flight,
+            "idle_seconds": round(time.monotonic() - self.last_used, 1),
+            "query_cache": len(query_cache) if query_cache is not None else 0,
+            "text_cache": len(text_cache) if text_cache is not None else 0,
+            "answer_cache": len(answer_cache) if answer_cache is not None else 0,
+            "dedup_signatures": len(deduplicator) if deduplicator is not None else 0,
+            "sessions": len(session_store) if session_store is not None else 0,
+        }
+
+
+# ---- tenant 별 collection / 캐시 / quota 관리 ---- #
+class TenantRegistry:
+    """
+    tenant 마다 전용 Milvus collection (<CFG.milvus_collection>_<tenant_id>) 을 사용해
+    작은 tenant 의 검색이 큰 tenant 의 index 크기에 영향을 받지 않도록 한다.
+
+    - collection 은 처음 요청될 때 load 하고, 적재된 tenant 가 max_loaded 를 넘거나
+      idle_seconds 동안 요청이 없으면 release 해서 Milvus 메모리를 돌려준다
+    - 임베딩 모델 / LLM 은 모든 tenant 가 공유하고, 질의 임베딩 / 답변 캐시와 요청률 제한은 tenant 별
+    - 질의 임베딩 모델은 collection 에 기록된 모델을 따른다 (재임베딩 후 재시작한 replica 도 새 모델 사용)
+    - tenant id 가 없는 요청은 기존 CFG.milvus_collection 을 쓰는 default tenant 로 처리 (release 하지 않음)
+    - 등록된 tenant 가 max_tenants 를 넘으면 사용 중이 아닌 가장 오래된 tenant 를 registry 에서 제거하고,
+      CFG.allowed_tenants 가 있으면 그 밖의 id 는 collection 을 만들지 않고 거절
+    - 재구축 / 재임베딩 중인 collection 의 tenant 는 release / 제거하지 않는다 (busy)
+    - 요청률 제한 / tenant 수 제한은 프로세스별 상태 → replica 를 N 개 두면 실제 허용량도 N 배
+    """
+
+    def __init__(self,
+                 embedding_service: EmbeddingService,
+                 llm_service,
+                 max_loaded: int = CFG.max_loaded_tenants,
+                 idle_seconds: Optional[float] = CFG.tenant_idle_seconds,
+                 max_tenants: int = CFG.max_tenants,
+                 allowed_tenants: Optional[List[str]] = CFG.allowed_tenants,
+                 busy: Optional[Callable[[str], bool]] = None
+                 ):
+        self.embedding_service = embedding_service
+        self.llm_service = llm_service
+        self._embedders: Dict[str, EmbeddingService] = {embedding_service.model_name: embedding_service}
+        self._embedders_lock = threading.Lock()
+        self.max_loaded = max_loaded
+        self.idle_seconds = idle_seconds
+        self.max_tenants = max_tenants
+        self.allowed_tenants = set(allowed_tenants) if allowed_tenants is not None else None
+        self._tenants: "OrderedDict[str, Tenant]" = OrderedDict()    # LRU 순서
+        self._creating: Dict[str, asyncio.Future] = {}              # tenant 별 생성 작업 (같은 tenant 요청만 기다림)
+        self._rate_limiters = LRUCache(max_tenants)
+        self.busy = busy                                            # collection 이름 → 재구축 중 여부
+
+
+    def normalize(self, tenant_id: Optional[str]) -> str:
+        if not tenant_id:
+            return DEFAULT_TENANT
+        if not TENANT_ID_PATTERN.match(tenant_id):
+            raise InvalidTenantError(f"Invalid tenant id: {tenant_id!r}")
+        if self.allowed_tenants is not None and tenant_id not in self.allowed_tenants:
+            raise UnknownTenantError(f"Unknown tenant id: {tenant_id!r}")
+        return tenant_id
+
+
+    @staticmethod
+    def collection_name(tenant_id: str) -> str:
+        if tenant_id == DEFAULT_TENANT:
+            return CFG.milvus_collection
+        return f"{CFG.milvus_collection}_{tenant_id}"
+
+
+    # ---- 임베딩 모델 registry (모델 이름별로 한 번만 적재) ---- #
+    def embedder(self, model_name: str) -> EmbeddingService:
+        with self._embedders_lock:
+            if model_name not in self._embedders:
+                logger.info(f"Loading embedding model: {model_name}")
+                self._embedders[model_name] = EmbeddingService(model_name)
+            return self._embedders[model_name]
+
+
+    def _create(self, tenant_id: str) -> Tenant:
+        shared = next(iter(self._tenants.values()), None)
+        milvus_service = MilvusService(
+            collection_name=self.collection_name(tenant_id),
+            client=shared.milvus_service.client if shared else None,
+            embedding_model=self.embedding_service.model_name,
+            dimension=self.embedding_service.dimension
+        )
+        
+        # collection 에 기록된 모델로 질의를 임베딩하고, 차원이 맞지 않으면 바로 실패
+        recorded_model = milvus_service.embedding_info()["embedding_model"]
+        if recorded_model and recorded_model != self.embedding_service.model_name:
+            logger.warning(
+                f"{milvus_service.collection_name} was embedded with {recorded_model}, "
+                f"not CFG.embedding_model ({self.embedding_service.model_name}); using {recorded_model}"
+            )
+        embedding_service = self.embedder(recorded_model or self.embedding_service.model_name)
+        milvus_service.check_embedding(embedding_service.model_name, embedding_service.dimension)
+        
+        # 계층 검색: 문서 collection (chunk 평균) 옆에 같은 모델의 chunk collection
+        chunk_service = None
+        if CFG.hierarchical_enabled:
+            chunk_service = MilvusService(
+                collection_name=f"{milvus_service.collection_name}__chunks",
+                client=milvus_service.client,
+                embedding_model=embedding_service.model_name,
+                dimension=embedding_service.dimension,
+                parent_field=True
+            )
+            chunk_service.check_embedding(embedding_service.model_name, embedding_service.dimension)
+        
+        document_service = DocumentService(
+            embedding_service=embedding_service,
+            milvus_service=milvus_service,
+            query_cache=LRUCache(CFG.query_cache_size, ttl=CFG.query_cache_ttl),
+            text_cache=LRUCache(CFG.text_cache_size),
+            deduplicator=self._deduplicator(milvus_service.collection_name) if CFG.dedup_enabled else None,
+            chunk_service=chunk_service,
+            search_policy=AdaptiveSearchPolicy(
+                levels=CFG.adaptive_search_levels,
+                min_score=CFG.adaptive_search_min_score,
+                min_margin=CFG.adaptive_search_min_margin
+            ) if CFG.adaptive_search_enabled else None
+        )
+        rag_chain = RAGChain(
+            llm_service=self.llm_service,
+            document_service=document_service,
+            answer_cache=LRUCache(CFG.answer_cache_size, ttl=CFG.answer_cache_ttl),
+            session_store=SessionStore(CFG.session_max_sessions, ttl=CFG.session_ttl)
+        )
+        logger.info(f"Registered tenant {tenant_id} ({milvus_service.collection_name})")
+        return Tenant(tenant_id, document_service, rag_chain)
+
+
+    @staticmethod
+    def _deduplicator(collection_name: str) -> NearDuplicateIndex:
+        # 서명 로그는 collection 이름 (rebuild 후에도 유지되는 alias) 별로 저장
+        return NearDuplicateIndex(
+            os.path.join(CFG.dedup_index_dir, f"{collection_name}.jsonl"),
+            threshold=CFG.dedup_threshold,
+            num_perm=CFG.dedup_num_perm,
+            shingle_size=CFG.dedup_shingle_size
+        )
+
+
+    # ---- 요청률 제한 (collection 을 쓰지 않는 생성 요청에도 적용, 프로세스별) ---- #
+    def check_rate_limit(self, tenant_id: Optional[str]):
+        if not CFG.tenant_rate_limit:
+            return
+        
+        tenant_id = self.normalize(tenant_id)
+        limiter = self._rate_limiters.get(tenant_id)
+        if limiter is None:
+            limiter = TokenBucket(CFG.tenant_rate_limit, CFG.tenant_rate_burst)
+            self._rate_limiters.put(tenant_id, limiter)
+        
+        if not limiter.try_acquire():
+            raise AdmissionRejected(f"Rate limit exceeded for tenant {tenant_id}", status_code=429)
+
+
+    # ---- tenant 생성 (같은 tenant 의 동시 요청은 하나의 생성 작업을 기다림) ---- #
+    async def _get_or_create(self, tenant_id: str) -> Tenant:
+        future = self._creating.get(tenant_id)
+        if future is None:
+            future = asyncio.ensure_future(self._register(tenant_id))
+            self._creating[tenant_id] = future
+
+            def done(task: asyncio.Future):
+                self._creating.pop(tenant_id, None)
+                if not task.cancelled():
+                    task.exception()    # 기다리던 요청이 모두 취소돼도 경고를 남기지 않도록 확인 처리
+            future.add_done_callback(done)
+
+        # 요청이 취소돼도 생성은 끝까지 진행 (다른 요청이 기다리고 있을 수 있음)
+        return await asyncio.shield(future)
+
+
+    async def _register(self, tenant_id: str) -> Tenant:
+        # 모델 적재 / collection 생성은 thread 에서 실행 → 다른 tenant 요청은 막지 않는다
+        while len(self._tenants) >= self.max_tenants:
+            if not await self._evict_one():
+                raise AdmissionRejected(f"Too many active tenants ({self.max_tenants})", status_code=503)
+
+        tenant = await asyncio.to_thread(self._create, tenant_id)
+        self._tenants[tenant_id] = tenant
+        return tenant
+
+
+    async def _evict_one(self) -> bool:
+        """ 사용 중이 아닌 가장 오래된 tenant 를 registry 에서 제거 (default 제외) """
+        for tenant in list(self._tenants.values()):
+            if tenant.tenant_id == DEFAULT_TENANT or tenant.in_flight > 0 or self._busy(tenant):
+                continue
+            if tenant.loaded and not await self._release(tenant):
+                continue
+            # release 를 기다리는 동안 새 요청이 들어왔을 수 있음
+            if tenant.in_flight > 0 or self._tenants.get(tenant.tenant_id) is not tenant:
+                continue
+
+            del self._tenants[tenant.tenant_id]
+            self._rate_limiters.invalidate(tenant.tenant_id)
+            tenant.clear_caches()
+            logger.info(f"Evicted tenant {tenant.tenant_id} from registry")
+            return True
+        return False
+
+
+    # ---- tenant 사용 (collection lazy load + 사용 중 release 방지) ---- #
+    @asynccontextmanager
+    async def use(self, tenant_id: Optional[str]):
+        tenant_id = self.normalize(tenant_id)
+        self.check_rate_limit(tenant_id)
+
+        tenant = self._tenants.get(tenant_id)
+        # 생성 작업을 기다리는 사이 registry 에서 밀려났으면 다시 등록
+        while tenant is None or self._tenants.get(tenant_id) is not tenant:
+            tenant = await self._get_or_create(tenant_id)
+        self._tenants.move_to_end(tenant_id)
+
+        tenant.in_flight += 1
+        tenant.last_used = time.monotonic()
+        try:
+            # 적재는 tenant 별 lock 으로만 직렬화 → cold tenant 적재가 다른 tenant 를 막지 않는다
+            if not tenant.loaded:
+                async with tenant.load_lock:
+                    if not tenant.loaded:
+                        for milvus_service in tenant.milvus_services:
+                            await asyncio.to_thread(milvus_service.load)
+                        tenant.loaded = True
+                await self._evict_over_capacity()
+
+            yield tenant
+
+        finally:
+            tenant.in_flight -= 1
+            tenant.last_used = time.monotonic()
+
+
+    def _busy(self, tenant: Tenant) -> bool:
+        # 재구축 task 는 이 Tenant 의 MilvusService (shadow 이중 쓰기 상태) 를 잡고 있으므로
+        # release 하거나 registry 에서 빼서 새 Tenant 를 만들면 전환 전 쓰기가 shadow 에 반영되지 않는다
+        if self.busy is None:
+            return False
+        return any(self.busy(milvus_service.collection_name) for milvus_service in tenant.milvus_services)
+
+
+    async def _release(self, tenant: Tenant) -> bool:
+        # in_flight 는 load_lock 밖에서 먼저 증가하므로, lock 안에서 0 이면 사용 중인 요청이 없다
+        async with tenant.load_lock:
+            if not tenant.loaded or tenant.in_flight > 0 or self._busy(tenant):
+                return False
+            tenant.loaded = False
+            for milvus_service in tenant.milvus_services:
+                await asyncio.to_thread(milvus_service.release)
+            return True
+
+
+    async def _evict_over_capacity(self):
+        # 가장 오래 쓰이지 않은 tenant 부터 release (default 제외)
+        loaded = [t for t in self._tenants.values() if t.loaded and t.tenant_id != DEFAULT_TENANT]
+        for tenant in loaded[:max(0, len(loaded) - self.max_loaded)]:
+            await self._release(tenant)
+
+
+    # ---- 오래 쓰이지 않은 tenant collection release ---- #
+    async def release_idle(self) -> List[str]:
+        if not self.idle_seconds:
+            return []
+
+        released = []
+        now = time.monotonic()
+        for tenant in list(self._tenants.values()):
+            if (
+                tenant.tenant_id != DEFAULT_TENANT
+                and now - tenant.last_used > self.idle_seconds
+                and await self._release(tenant)
+            ):
+                tenant.clear_caches()
+                released.append(tenant.tenant_id)
+
+        if released:
+            logger.info(f"Released idle tenants: {released}")
+        return released
+
+
+    # ---- 현재 적재된 tenant (maintenance 대상) ---- #
+    def loaded(self) -> List[Tenant]:
+        return [tenant for tenant in self._tenants.values() if tenant.loaded]
+
+
+    def status(self) -> Dict[str, Dict[str, Any]]:
+        return {tenant_id: tenant.status() for tenant_id, tenant in self._tenants.items()}
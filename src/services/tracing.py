@@ -0,0 +1,186 @@
+import json
+import os
+import secrets
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, List, Optional
+
+
+# ---- 요청 tracing (OpenTelemetry OTLP/JSON 호환 출력) ---- #
+# 현재 span 은 contextvar 로 전달되므로 asyncio task / asyncio.to_thread 안에서도 부모를 찾는다
+# trace 가 시작되지 않은 요청에서는 span() 이 아무것도 기록하지 않는다 (opt-in)
+_current_span: ContextVar[Optional["Span"]] = ContextVar("current_span", default=None)
+
+SERVICE_NAME = "rag-system"
+
+
+class Span:
+    def __init__(self,
+                 name: str,
+                 trace: "Trace",
+                 parent: Optional["Span"] = None,
+                 attributes: Optional[Dict[str, Any]] = None
+                 ):
+        self.name = name
+        self.trace = trace
+        self.span_id = secrets.token_hex(8)
+        self.parent_id = parent.span_id if parent else None
+        self.attributes = dict(attributes or {})
+        self.start_ns = time.time_ns()
+        self.end_ns: Optional[int] = None
+        self.error: Optional[str] = None
+
+
+    @property
+    def duration_ms(self) -> float:
+        return ((self.end_ns or time.time_ns()) - self.start_ns) / 1e6
+
+
+    def set_attribute(self,
+                      key: str,
+                      value: Any
+                      ):
+        self.attributes[key] = value
+
+
+    def to_otlp(self) -> Dict[str, Any]:
+        span = {
+            "traceId": self.trace.trace_id,
+            "spanId": self.span_id,
+            "name": self.name,
+            "kind": 1,    # SPAN_KIND_INTERNAL
+            "startTimeUnixNano": str(self.start_ns),
+            "endTimeUnixNano": str(self.end_ns or self.start_ns),
+            "attributes": [_otlp_attribute(key, value) for key, value in self.attributes.items()],
+            "status": {"code": 2, "message": self.error} if self.error else {"code": 1},
+        }
+        if self.parent_id:
+            span["parentSpanId"] = self.parent_id
+        return span
+
+
+class Trace:
+    def __init__(self, trace_id: Optional[str] = None):
+        self.trace_id = trace_id or secrets.token_hex(16)
+        self.spans: List[Span] = []
+
+
+    def breakdown(self) -> Dict[str, float]:
+        """ span 이름별 누적 시간 (ms) """
+        totals: Dict[str, float] = {}
+        for span in self.spans:
+            totals[span.name] = totals.get(span.name, 0.0) + span.duration_ms
+        return totals
+
+
+    def to_otlp(self) -> Dict[str, Any]:
+        return {
+            "resourceSpans": [{
+                "resource": {"attributes": [_otlp_attribute("service.name", SERVICE_NAME)]},
+                "scopeSpans": [{
+                    "scope": {"name": SERVICE_NAME},
+                    "spans": [span.to_otlp() for span in self.spans],
+                }],
+            }]
+        }
+
+
+def _otlp_attribute(key: str,
+                    value: Any
+                    ) -> Dict[str, Any]:
+    if isinstance(value, bool):
+        typed = {"boolValue": value}
+    elif isinstance(value, int):
+        typed = {"intValue": str(value)}
+    elif isinstance(value, float):
+        typed = {"doubleValue": value}
+    else:
+        typed = {"stringValue": str(value)}
+    return {"key": key, "value": typed}
+
+
+# ---- exporter ---- #
+class JsonlSpanExporter:
+    """ trace 하나를 OTLP/JSON 한 줄로 파일에 추가 (collector 의 file exporter 와 같은 형식) """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+
+
+    def export(self, trace: Trace):
+        line = json.dumps(trace.to_otlp(), ensure_ascii=False)
+        with self._lock, open(self.path, "a", encoding="utf-8") as f:
+            f.write(line + "\n")
+
+
+class InMemorySpanExporter:
+    def __init__(self):
+        self.traces: List[Trace] = []
+
+
+    def export(self, trace: Trace):
+        self.traces.append(trace)
+
+
+# ---- span API ---- #
+@contextmanager
+def start_trace(name: str,
+                exporter: Optional[Any] = None,
+                trace_id: Optional[str] = None,
+                **attributes: Any
+                ):
+    """ root span 을 열고, 끝나면 trace 전체를 exporter 로 내보냄 (exporter 가 없으면 기록만) """
+    trace = Trace(trace_id)
+    try:
+        with _open_span(name, trace, None, attributes) as root:
+            yield root
+    finally:
+        if exporter is not None:
+            exporter.export(trace)
+
+
+@contextmanager
+def span(name: str, **attributes: Any):
+    """ 현재 trace 안에 하위 span 기록. trace 가 없으면 None 을 돌려주고 아무것도 하지 않는다 """
+    parent = _current_span.get()
+    if parent is None:
+        yield None
+        return
+
+    with _open_span(name, parent.trace, parent, attributes) as child:
+        yield child
+
+
+def current_span() -> Optional[Span]:
+    return _current_span.get()
+
+
+def set_attribute(key: str,
+                  value: Any
+                  ):
+    current = _current_span.get()
+    if current is not None:
+        current.set_attribute(key, value)
+
+
+@contextmanager
+def _open_span(name: str,
+               trace: Trace,
+               parent: Optional[Span],
+               attributes: Dict[str, Any]
+               ):
+    current = Span(name, trace, parent, attributes)
+    trace.spans.append(current)
+    token = _current_span.set(current)
+    try:
+        yield current
+    except BaseException as e:
+        current.error = f"{type(e).__name__}: {e}"
+        raise
+    finally:
+        current.end_ns = time.time_ns()
+        _current_span.reset(token)
@@ -1,10 +1,24 @@
-from vllm import LLM as VLLM, SamplingParams
+import asyncio
+from packaging.version import Version
+from vllm import LLM as VLLM, SamplingParams, __version__ as VLLM_VERSION
 from langchain.llms.base import LLM
-from typing import Any, List, Optional
+from typing import Any, List, Optional, Tuple, Union
 from pydantic import BaseModel, Field, PrivateAttr
 from utils.config import CFG
 from loguru import logger
 from transformers import AutoTokenizer
+from services.metrics import (
+    PREFILL_TOKENS, 
+    SPEC_ACCEPTED_TOKENS, 
+    SPEC_DRAFT_TOKENS, 
+    TIME_TO_FIRST_TOKEN, 
+    TOKENS_PER_STEP
+)
+from services.speculative import estimate_acceptance
+from services.prefix_cache import PrefixCacheTracker
+from services.deadline import DeadlineExceeded, check_deadline, remaining
+from services.tracing import span
+from services.scheduler import BULK, PriorityScheduler, current_priority
 import torch.distributed as dist
 
 
@@ -17,6 +31,29 @@ class ModelError(Exception):
     pass
 
 
+# 엔진 옵션 -> (켜는 설정, 필요한 vLLM 버전). 고정된 vLLM 이 낮으면 옵션을 켠 채로 기동하지 않는다
+ENGINE_OPTION_VERSIONS = {
+    "enable_prefix_caching": ("CFG.enable_prefix_caching", "0.4.0"),
+    "speculative_model": ("CFG.speculative_mode", "0.4.2"),
+}
+
+
+# ---- 요청별 생성 파라미터 ---- #
+class GenerationParams(BaseModel):
+    """ 지정하지 않은 값은 CFG 기본값을 사용 """
+    max_tokens: Optional[int] = Field(default=None, ge=1)
+    temperature: Optional[float] = Field(default=None, ge=0.0)
+    top_p: Optional[float] = Field(default=None, gt=0.0, le=1.0)
+    top_k: Optional[int] = None
+    stop: Optional[List[str]] = None
+    n: int = Field(default=1, ge=1)
+
+
+class GenerationRequest(BaseModel):
+    prompt: str
+    params: Optional[GenerationParams] = None
+
+
 # ---- vLLM 서비스 ---- #
 class VLLMService(LLM, BaseModel):
     _instance = None
@@ -30,8 +67,10 @@ class VLLMService(LLM, BaseModel):
     max_tokens: int = Field(default=CFG.max_tokens)
     
     _vllm_engine: VLLM = PrivateAttr()
-    _sampling_params: SamplingParams = PrivateAttr()
+    _stop_token_ids: List[int] = PrivateAttr()
     _tokenizer: AutoTokenizer = PrivateAttr()
+    _prefix_tracker: PrefixCacheTracker = PrivateAttr()
+    _scheduler: PriorityScheduler = PrivateAttr()
     
     def __new__(cls):
         if not cls._instance:
@@ -51,19 +90,19 @@ class VLLMService(LLM, BaseModel):
                 self._tokenizer = AutoTokenizer.from_pretrained(
                     CFG.vllm_model_name,
                 )
-                # 생성 파라미터 설정
-                self._sampling_params = SamplingParams(
-                    max_tokens=CFG.max_tokens,
-                    temperature=CFG.temperature,
-                    top_p=CFG.top_p,
-                    top_k=CFG.top_k
-                )
-                
+                # 종료 토큰 (vocab 에 없는 토큰은 unk 로 변환되므로 제외)
                 terminators = [
                     self._tokenizer.eos_token_id,
-                    self._tokenizer.convert_tokens_to_ids("<|eot_id>")
+                    self._tokenizer.convert_tokens_to_ids("<|eot_id|>")
+                ]
+                self._stop_token_ids = [
+                    token_id for token_id in dict.fromkeys(terminators)
+                    if token_id is not None and token_id != self._tokenizer.unk_token_id
                 ]
                 
+                # prefix caching / speculative decoding (지원하는 vLLM 버전인지 먼저 확인)
+                engine_kwargs = self._engine_kwargs()
+                
                 # vLLM 엔진 초기화
                 self._vllm_engine = VLLM(
                     model=self.model_name,
@@ -71,16 +110,27 @@ class VLLMService(LLM, BaseModel):
                     dtype="auto",
                     tokenizer=CFG.vllm_model_name,
                     max_model_len=self.max_input_tokens,
-                    # eos_token_id=terminators,
                     tensor_parallel_size=CFG.tensor_parallel_size,
                     gpu_memory_utilization=CFG.gpu_memory_utilization,
-                    seed=CFG.seed
+                    seed=CFG.seed,
+                    **engine_kwargs
+                )
+                
+                # 엔진은 thread-safe 하지 않으므로 한 번에 하나의 실행만 허용 (interactive 요청 먼저)
+                self._scheduler = PriorityScheduler("generation", CFG.bulk_starvation_seconds)
+                
+                cache_config = self._vllm_engine.llm_engine.cache_config
+                self._prefix_tracker = PrefixCacheTracker(
+                    block_size=cache_config.block_size,
+                    num_blocks=cache_config.num_gpu_blocks
                 )
                 
                 logger.info(
                     f"vLLM engine initialized successfully: {self.model_name}, "
                     f"Max_input_tokens: {self.max_input_tokens}, "
-                    f"Max_tokens: {self.max_tokens}"
+                    f"Max_tokens: {self.max_tokens}, "
+                    f"Prefix_caching: {CFG.enable_prefix_caching}, "
+                    f"Speculative: {CFG.speculative_mode or 'off'}"
                 )
                 VLLMService._is_initialized = True
                 
@@ -89,86 +139,357 @@ class VLLMService(LLM, BaseModel):
                 raise ModelError(f"Failed to initialize vLLM engine: {e}")
 
 
-    # ---- 프롬프트 토큰 수 계산 ---- #
-    def _count_tokens(self, prompt: str) -> int:
-        return len(self._tokenizer.encode(prompt))
+    # ---- 엔진 옵션 ---- #
+    @classmethod
+    def _engine_kwargs(cls, vllm_version: str = VLLM_VERSION) -> dict:
+        engine_kwargs = {}
+        if CFG.enable_prefix_caching:
+            engine_kwargs["enable_prefix_caching"] = True
+        engine_kwargs.update(cls._speculative_engine_kwargs())
+        
+        # 낮은 버전의 엔진은 모르는 인자로 실패하므로, 어떤 설정이 어떤 버전을 필요로 하는지 알려준다
+        for option, (setting, minimum) in ENGINE_OPTION_VERSIONS.items():
+            if option in engine_kwargs and Version(vllm_version) < Version(minimum):
+                raise ValueError(
+                    f"{setting} requires vLLM >= {minimum} (installed: {vllm_version}); "
+                    f"upgrade vllm or turn the setting off"
+                )
+        return engine_kwargs
 
-    
-    # ---- 프롬프트 유효성 검사 및 전처리 ---- #
-    def _validate_and_truncate_prompt(self, 
-                                      prompt: str,
-                                      max_tokens: int
-                                      ) -> str:
-        if not prompt.strip():
-            raise ValueError("Prompt cannot be empty")
-        
-        token_limit = max_tokens or self.max_input_tokens
-        token_count = self._count_tokens(prompt)
-        
-        if token_count > token_limit:
-            logger.warning(
-                f"Truncating prompt from {token_count} to {token_limit} tokens",
-                "Truncating ... "
-            )
-            
-            tokens = self._tokenizer.encode(prompt)[:token_limit]
-            truncated_tokens = tokens[:token_limit]
-            truncated_prompt = self._tokenizer.decode(truncated_tokens)
+
+    # ---- speculative decoding 설정 ---- #
+    @staticmethod
+    def _speculative_engine_kwargs() -> dict:
+        """
+        CFG.speculative_mode
+            - "draft": CFG.speculative_model (작은 draft 모델) 이 토큰을 제안
+            - "ngram": 프롬프트(검색 문서)에서 n-gram 을 찾아 이어지는 토큰을 제안 (추가 모델 없음)
+        speculative decoding 을 지원하는 vLLM (>= 0.4.2) 이 필요하다.
+        """
+        mode = CFG.speculative_mode
+        if not mode:
+            return {}
+        
+        kwargs = {
+            "num_speculative_tokens": CFG.num_speculative_tokens,
+            "use_v2_block_manager": True,
+        }
+        if mode == "draft":
+            kwargs["speculative_model"] = CFG.speculative_model
+        elif mode == "ngram":
+            kwargs["speculative_model"] = "[ngram]"
+            kwargs["ngram_prompt_lookup_max"] = CFG.ngram_prompt_lookup_max
+            kwargs["ngram_prompt_lookup_min"] = CFG.ngram_prompt_lookup_min
+        else:
+            raise ValueError(f"Unknown speculative_mode: {mode} (expected 'draft' or 'ngram')")
+        return kwargs
+
+
+    # ---- 요청별 SamplingParams 생성 ---- #
+    def _build_sampling_params(self, 
+                               params: Optional[GenerationParams] = None
+                               ) -> SamplingParams:
+        params = params or GenerationParams()
+        
+        return SamplingParams(
+            n=params.n,
+            max_tokens=min(params.max_tokens or self.max_tokens, self.max_tokens),
+            temperature=CFG.temperature if params.temperature is None else params.temperature,
+            top_p=params.top_p or CFG.top_p,
+            top_k=CFG.top_k if params.top_k is None else params.top_k,
+            stop=params.stop,
+            stop_token_ids=self._stop_token_ids
+        )
+
+
+    # ---- 엔진 실행 (prompt 마다 별도 SamplingParams) ---- #
+    def _run_requests(self, 
+                      prompt_token_ids: List[List[int]], 
+                      sampling_params: List[SamplingParams]
+                      ) -> List[Any]:
+        # 요청마다 파라미터가 달라도 한 번의 엔진 실행에서 continuous batching 된다
+        # 이미 토큰화된 id 를 넘겨 엔진이 다시 토큰화하지 않도록 한다
+        with span(
+            "llm.decode", 
+            requests=len(prompt_token_ids), 
+            prompt_tokens=sum(map(len, prompt_token_ids))
+        ) as current:
+            outputs, steps, request_steps = self._step_requests(prompt_token_ids, sampling_params)
+            self._record_decode_steps(outputs, request_steps)
+            if current:
+                current.set_attribute("steps", steps)
+                current.set_attribute(
+                    "output_tokens", 
+                    sum(len(c.token_ids) for output in outputs for c in output.outputs)
+                )
+            return outputs
+
+
+    # ---- 요청 추가 후 모두 끝날 때까지 step (결과, 전체 step 수, 요청별 step 수) ---- #
+    def _step_requests(self, 
+                       prompt_token_ids: List[List[int]], 
+                       sampling_params: List[SamplingParams]
+                       ) -> Tuple[List[Any], int, List[int]]:
+        engine = self._vllm_engine.llm_engine
+        request_ids = []
+        finished = {}
+        steps = 0
+        # deadline 초과 / step 실패 / 중간 추가 실패 시 이미 추가한 요청을 engine 에서 빼서 다음 호출에 섞이지 않도록
+        try:
+            for token_ids, params in zip(prompt_token_ids, sampling_params):
+                request_id = str(next(self._vllm_engine.request_counter))
+                engine.add_request(
+                    request_id, 
+                    None, 
+                    params, 
+                    prompt_token_ids=token_ids
+                )
+                request_ids.append(request_id)
             
-            logger.info(f"Truncated prompt: {truncated_prompt}")
-            return truncated_prompt
+            # 매 step 마다 deadline 을 확인해, 버려진 요청이 GPU 를 계속 쓰지 않도록 중단
+            request_steps = dict.fromkeys(request_ids, 0)
+            while engine.has_unfinished_requests():
+                left = remaining()
+                if left is not None and left <= 0:
+                    raise DeadlineExceeded(f"Request deadline exceeded during generation ({len(finished)}/{len(request_ids)} finished)")
+                
+                steps += 1
+                for output in engine.step():
+                    request_steps[output.request_id] = request_steps.get(output.request_id, 0) + 1
+                    if output.finished:
+                        finished[output.request_id] = output
         
-        logger.info(f"Prompt: {prompt}")
-        return prompt
+        except BaseException:
+            engine.abort_request(request_ids)
+            raise
+        
+        return (
+            [finished[request_id] for request_id in request_ids], 
+            steps, 
+            [request_steps[request_id] for request_id in request_ids]
+        )
+
+
+    # ---- step 당 생성 토큰 수 / speculative 채택 수 기록 ---- #
+    def _record_decode_steps(self, 
+                             outputs: List[Any], 
+                             request_steps: List[int]
+                             ):
+        for output, num_steps in zip(outputs, request_steps):
+            # 첫 step 은 prefill (토큰 1 개), 나머지가 decode step
+            decode_steps = max(num_steps - 1, 0)
+            for completion in output.outputs:
+                num_tokens = len(completion.token_ids)
+                if decode_steps:
+                    TOKENS_PER_STEP.observe((num_tokens - 1) / decode_steps)
+                
+                if CFG.speculative_mode:
+                    proposed, accepted = estimate_acceptance(
+                        num_tokens, 
+                        decode_steps, 
+                        CFG.num_speculative_tokens
+                    )
+                    SPEC_DRAFT_TOKENS.inc(proposed)
+                    SPEC_ACCEPTED_TOKENS.inc(accepted)
+
+
+    async def _generate(self, 
+                        prompt_token_ids: List[List[int]], 
+                        sampling_params: List[SamplingParams]
+                        ) -> List[Any]:
+        # bulk 요청은 CFG.bulk_slice_size 개씩 나눠 실행 → 한 조각이 끝날 때마다 대기 중인 interactive 요청이 먼저 들어간다
+        priority = current_priority()
+        slice_size = CFG.bulk_slice_size if priority == BULK and CFG.bulk_slice_size else len(prompt_token_ids)
+        
+        outputs = []
+        for start in range(0, len(prompt_token_ids), max(slice_size, 1)):
+            with span("llm.queue", priority=priority):
+                # 요청 deadline 이 지나면 대기열에서 빠지고 DeadlineExceeded (엔진 차례를 기다리며 붙잡혀 있지 않음)
+                await self._scheduler.acquire(priority)
+            try:
+                check_deadline("generation queue")
+                # 생성 중에도 event loop(health check 등)가 멈추지 않도록 별도 thread 에서 실행
+                outputs.extend(await asyncio.to_thread(
+                    self._run_requests, 
+                    prompt_token_ids[start:start + slice_size], 
+                    sampling_params[start:start + slice_size]
+                ))
+            finally:
+                self._scheduler.release()
+        return outputs
+
+
+    def scheduler_status(self) -> dict:
+        return self._scheduler.status()
+
+
+    # ---- KV cache 사용률 (0~1) ---- #
+    def kv_cache_usage(self) -> float:
+        try:
+            block_manager = self._vllm_engine.llm_engine.scheduler.block_manager
+            num_gpu_blocks = self._vllm_engine.llm_engine.cache_config.num_gpu_blocks
+            return 1.0 - block_manager.get_num_free_gpu_blocks() / num_gpu_blocks
+        except Exception:
+            return 0.0
+
+
+    # ---- 결과 텍스트 추출 (n > 1 이면 list) ---- #
+    def _output_texts(self, output: Any) -> Union[str, List[str]]:
+        texts = [completion.text for completion in output.outputs]
+        return texts[0] if len(texts) == 1 else texts
+
+
+    # ---- prefill metrics 기록 ---- #
+    def _record_prefill(self, outputs: List[Any]):
+        for output in outputs:
+            prompt_tokens = len(output.prompt_token_ids)
+            
+            # 엔진이 cached 토큰 수를 알려주면 그대로, 아니면 block hash 로 추정
+            cached_tokens = getattr(output, "num_cached_tokens", None)
+            if cached_tokens is None:
+                cached_tokens = (
+                    self._prefix_tracker.observe(output.prompt_token_ids)
+                    if CFG.enable_prefix_caching else 0
+                )
+            cached_tokens = min(cached_tokens, prompt_tokens)
+            
+            PREFILL_TOKENS.labels(source="cached").inc(cached_tokens)
+            PREFILL_TOKENS.labels(source="computed").inc(prompt_tokens - cached_tokens)
+            
+            metrics = getattr(output, "metrics", None)
+            if metrics is not None and metrics.first_token_time is not None:
+                TIME_TO_FIRST_TOKEN.observe(metrics.first_token_time - metrics.arrival_time)
+
+
+    # ---- 프롬프트 일괄 토큰화 ---- #
+    def _tokenize_batch(self, prompts: List[str]) -> List[List[int]]:
+        # vLLM 과 같은 방식(special token 포함)으로 fast tokenizer 한 번에 토큰화
+        return self._tokenizer(
+            prompts,
+            return_attention_mask=False,
+            verbose=False
+        )["input_ids"]
+
+    
+    # ---- 토큰 잘라내기 (질문이 있는 뒷부분 보존) ---- #
+    def _truncate_tokens(self, 
+                         token_ids: List[int], 
+                         token_limit: int
+                         ) -> List[int]:
+        head = token_ids[:1] if token_ids and token_ids[0] == self._tokenizer.bos_token_id else []
+        return head + token_ids[len(token_ids) - (token_limit - len(head)):]
 
 
     # ---- 배치 유효성 검사 및 전처리 ---- #
-    def _validate_batch(self, prompts: List[str]) -> List[str]:
+    def _validate_batch(self, 
+                        prompts: List[str],
+                        token_limits: Optional[List[int]] = None
+                        ) -> List[Optional[List[int]]]:
+        """
+        배치 전체를 한 번에 토큰화하고 토큰 제한을 넘는 프롬프트는 뒷부분을 남기고 잘라냄
+        
+        Args:
+            prompts (List[str]): 프롬프트 목록
+            token_limits (Optional[List[int]]): 프롬프트별 최대 토큰 수 (기본값: max_input_tokens)
+            
+        Returns:
+            List[Optional[List[int]]]: 엔진에 그대로 넘길 토큰 id (빈 프롬프트는 None)
+        """
         if not prompts:
             raise ValueError("Prompts cannot be empty")
         
-        validated_prompts = []
-        for idx, prompt in enumerate(prompts):
-            try:
-                validated_prompt = self._validate_and_truncate_prompt(prompt, self.max_input_tokens)
-                validated_prompts.append(validated_prompt)
-            except Exception as e:
-                logger.error(f"Failed to validate prompt {idx}: {e}")
-                validated_prompts.append("")
+        token_limits = token_limits or [self.max_input_tokens] * len(prompts)
+        with span("llm.tokenize", prompts=len(prompts)):
+            encoded = self._tokenize_batch(prompts)
         
-        return validated_prompts
+        validated = []
+        for idx, (prompt, token_ids, token_limit) in enumerate(zip(prompts, encoded, token_limits)):
+            if not prompt.strip():
+                logger.error(f"Failed to validate prompt {idx}: Prompt cannot be empty")
+                validated.append(None)
+                continue
+            
+            if len(token_ids) > token_limit:
+                logger.warning(f"Truncating prompt {idx} from {len(token_ids)} to {token_limit} tokens")
+                token_ids = self._truncate_tokens(token_ids, token_limit)
+            
+            validated.append(token_ids)
+        
+        logger.debug(f"Validated {len(prompts)} prompts ({sum(map(len, encoded))} tokens)")
+        return validated
+
+
+    # ---- 생성 길이를 남겨둔 프롬프트 토큰 한도 ---- #
+    def _prompt_token_limit(self, sampling_params: SamplingParams) -> int:
+        return max(1, self.max_input_tokens - sampling_params.max_tokens)
+
+
+    # ---- 호출 측 (대화 session 등) 이 프롬프트를 한도에 맞추기 위한 토큰 수 / 한도 ---- #
+    def count_tokens(self, texts: List[str]) -> List[int]:
+        # 프롬프트 조각 단위로 세므로 special token 은 제외
+        return [
+            len(token_ids) for token_ids in self._tokenizer(
+                texts, 
+                add_special_tokens=False, 
+                return_attention_mask=False, 
+                verbose=False
+            )["input_ids"]
+        ]
+
+
+    def prompt_token_budget(self, params: Optional[GenerationParams] = None) -> int:
+        return self._prompt_token_limit(self._build_sampling_params(params))
 
 
     # ---- 모델 호출 ---- #
     async def _call(self,
-                    prompt: str
-                    ) -> List[str]:
+                    prompt: str,
+                    params: Optional[GenerationParams] = None
+                    ) -> Union[str, List[str]]:
         try:
-            # 토큰 수 검증
-            token_count = self._count_tokens(prompt)
-            if token_count > self.max_input_tokens:
+            if not prompt.strip():
+                raise ValueError("Prompt cannot be empty")
+            
+            # 토큰 수 검증 (토큰화는 한 번만)
+            with span("llm.tokenize", prompts=1):
+                token_ids = self._tokenize_batch([prompt])[0]
+            if len(token_ids) > self.max_input_tokens:
                 raise TokenLimitError(
-                    f"Input exceeds token limit: {token_count} > {self.max_input_tokens}"
+                    f"Input exceeds token limit: {len(token_ids)} > {self.max_input_tokens}"
                 )
             
-            # 텍스트 전처리
-            validated_prompt = self._validate_and_truncate_prompt(prompt, self.max_input_tokens)
+            # 생성 길이만큼 여유를 남기고 잘라냄
+            sampling_params = self._build_sampling_params(params)
+            token_limit = self._prompt_token_limit(sampling_params)
+            if len(token_ids) > token_limit:
+                token_ids = self._truncate_tokens(token_ids, token_limit)
             
             # 생성 요청
-            outputs = self._vllm_engine.generate(
-                prompts=[validated_prompt],
-                sampling_params=self._sampling_params
+            outputs = await self._generate(
+                prompt_token_ids=[token_ids],
+                sampling_params=[sampling_params]
             )
             
             if not outputs or not outputs[0].outputs:
                 raise ModelError("No outputs from vLLM engine")
             
-            return outputs[0].outputs[0].text
+            self._record_prefill(outputs)
+            
+            return self._output_texts(outputs[0])
         
         except TokenLimitError as e:
             logger.error(f"Token limit error: {e}")
             raise e
         
+        # 빈 프롬프트 / 잘못된 sampling 파라미터 등 요청 자체의 문제는 그대로 (worker 에서 4xx)
+        except ValueError as e:
+            logger.warning(f"Invalid generate request: {e}")
+            raise e
+        
+        except DeadlineExceeded as e:
+            logger.warning(f"VLLM generate aborted: {e}")
+            raise e
+        
         except Exception as e:
             logger.error(f"VLLM async generate error: {e}")
             raise ModelError(f"Failed to generate text: {e}")
@@ -176,24 +497,51 @@ class VLLMService(LLM, BaseModel):
     
     # ---- 배치 호출 ---- #
     async def agenerate(self, 
-                        prompts: List[str]
-                        ) -> List[str]:
+                        prompts: List[str],
+                        params: Optional[Union[GenerationParams, List[Optional[GenerationParams]]]] = None
+                        ) -> List[Union[str, List[str]]]:
+        """
+        Args:
+            prompts (List[str]): 프롬프트 목록
+            params: 모든 프롬프트 공통 파라미터 또는 프롬프트별 파라미터 목록
+            
+        Returns:
+            List[Union[str, List[str]]]: 프롬프트별 생성 결과 (n > 1 이면 list)
+        """
         try:
-            # 배치 유효성 검사
-            validated_prompts = self._validate_batch(prompts)
+            if isinstance(params, list):
+                if len(params) != len(prompts):
+                    raise ValueError(f"Got {len(params)} params for {len(prompts)} prompts")
+            else:
+                params = [params] * len(prompts)
             
-            # 생성 요청
-            outputs = self._vllm_engine.generate(
-                prompts=validated_prompts,
-                sampling_params=self._sampling_params
+            sampling_params = [self._build_sampling_params(p) for p in params]
+            
+            # 배치 유효성 검사 (한 번의 토큰화)
+            validated = self._validate_batch(
+                prompts, 
+                [self._prompt_token_limit(sp) for sp in sampling_params]
             )
+            valid_indices = [idx for idx, token_ids in enumerate(validated) if token_ids is not None]
+            
+            # 생성 요청
+            outputs = [None] * len(prompts)
+            if valid_indices:
+                generated = await self._generate(
+                    prompt_token_ids=[validated[idx] for idx in valid_indices],
+                    sampling_params=[sampling_params[idx] for idx in valid_indices]
+                )
+                self._record_prefill(generated)
+                
+                for idx, output in zip(valid_indices, generated):
+                    outputs[idx] = output
             
             # 결과 처리
             results = []
             for idx, output in enumerate(outputs):
                 try:
                     if output and output.outputs:
-                        results.append(output.outputs[0].text)
+                        results.append(self._output_texts(output))
                     else:
                         logger.warning(f"No outputs from vLLM engine for prompt {idx}")
                         results.append("")
@@ -203,6 +551,15 @@ class VLLMService(LLM, BaseModel):
 
             return results
         
+        # 파라미터 개수 / 배치 검증 / sampling 파라미터 오류는 요청의 문제 → 그대로 (worker 에서 4xx)
+        except (TokenLimitError, ValueError) as e:
+            logger.warning(f"Invalid batch generate request: {e}")
+            raise e
+        
+        except DeadlineExceeded as e:
+            logger.warning(f"VLLM batch generate aborted: {e}")
+            raise e
+        
         except Exception as e:
             logger.error(f"VLLM async generate error: {e}")
             raise ModelError(f"Failed to generate batch text: {e}")
\ No newline at end of file
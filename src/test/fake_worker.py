@@ -0,0 +1,42 @@
+import asyncio
+import os
+from typing import Any, Dict
+from fastapi import FastAPI, HTTPException
+
+
+# ---- router 테스트용 가짜 generation worker (GPU 불필요) ---- #
+# FAKE_WORKER_NAME: 응답에 포함할 이름, FAKE_WORKER_DELAY: 생성 지연(초)
+# FAKE_WORKER_FAIL: 1 이면 생성 요청에 500 반환
+NAME = os.environ.get("FAKE_WORKER_NAME", "worker")
+DELAY = float(os.environ.get("FAKE_WORKER_DELAY", "0"))
+FAIL = os.environ.get("FAKE_WORKER_FAIL") == "1"
+
+app = FastAPI()
+state = {"outstanding": 0}
+
+
+@app.get("/health")
+async def health_check():
+    return {"status": "healthy", "outstanding": state["outstanding"], "kv_cache_usage": 0.0}
+
+
+async def _fake_generate(prompt: str) -> str:
+    if FAIL:
+        raise HTTPException(status_code=500, detail="fake failure")
+    state["outstanding"] += 1
+    try:
+        await asyncio.sleep(DELAY)
+        return f"{NAME}:{prompt}"
+    finally:
+        state["outstanding"] -= 1
+
+
+@app.post("/generate")
+async def generate_text(request: Dict[str, Any]):
+    return {"status": "success", "results": await _fake_generate(request["prompt"])}
+
+
+@app.post("/generate_batch")
+async def generate_batch(request: Dict[str, Any]):
+    results = [await _fake_generate(prompt) for prompt in request["prompts"]]
+    return {"status": "success", "results": results}
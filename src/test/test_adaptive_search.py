@@ -0,0 +1,50 @@
+import asyncio
+
+from services.adaptive_search import AdaptiveSearchPolicy, adaptive_search
+
+
+def _hits(*scores):
+    return [{"id": f"doc-{i}", "score": score} for i, score in enumerate(scores)]
+
+
+def _run(responses, limit, policy):
+    calls = []
+
+    async def search(nprobe, search_limit):
+        calls.append((nprobe, search_limit))
+        return responses[nprobe][:search_limit]
+
+    return asyncio.run(adaptive_search(search, limit, policy)), calls
+
+
+def test_clear_margin_stops_at_first_level():
+    policy = AdaptiveSearchPolicy(levels=(8, 32, 128), min_margin=0.05)
+    result, calls = _run({8: _hits(0.9, 0.8, 0.6)}, limit=2, policy=policy)
+
+    assert calls == [(8, 3)]
+    assert (result.nprobe, result.rounds, result.reason) == (8, 1, "margin")
+    assert [hit["id"] for hit in result.documents] == ["doc-0", "doc-1"]
+
+
+def test_ambiguous_query_escalates_until_stable():
+    policy = AdaptiveSearchPolicy(levels=(8, 32, 128, 512), min_margin=0.05)
+    responses = {
+        8: _hits(0.70, 0.69, 0.68),
+        32: [{"id": "new", "score": 0.75}] + _hits(0.70, 0.69),
+        128: [{"id": "new", "score": 0.75}] + _hits(0.70, 0.695),
+    }
+    result, calls = _run(responses, limit=2, policy=policy)
+
+    assert [nprobe for nprobe, _ in calls] == [8, 32, 128]
+    assert result.reason == "stable"
+    assert [hit["id"] for hit in result.documents] == ["new", "doc-0"]
+
+
+def test_confident_scores_or_last_level_stop():
+    confident = AdaptiveSearchPolicy(levels=(4, 16), min_score=0.8, min_margin=None)
+    result, _ = _run({4: _hits(0.95, 0.85, 0.84)}, limit=2, policy=confident)
+    assert result.reason == "score"
+
+    # 결과가 limit 보다 적으면 확장하고, 마지막 단계에서는 그대로 멈춘다
+    result, calls = _run({4: _hits(0.5), 16: _hits(0.5)}, limit=2, policy=confident)
+    assert (result.reason, len(calls)) == ("max", 2)
@@ -0,0 +1,111 @@
+import asyncio
+import time
+
+import pytest
+from services.admission import AdmissionController, AdmissionRejected, EndpointLimiter
+from services.deadline import DeadlineExceeded, check_deadline, deadline_scope, remaining
+
+
+async def _hold(limiter: EndpointLimiter,
+                release: asyncio.Event
+                ):
+    async with limiter.slot():
+        await release.wait()
+
+
+def test_queue_full_rejects_with_429():
+    async def run():
+        limiter = EndpointLimiter("generate", concurrency=1, queue=1)
+        release = asyncio.Event()
+        tasks = [asyncio.create_task(_hold(limiter, release)) for _ in range(2)]
+        await asyncio.sleep(0)
+
+        assert limiter.status()["running"] == 1
+        assert limiter.status()["waiting"] == 1
+
+        with pytest.raises(AdmissionRejected) as exc:
+            async with limiter.slot():
+                pass
+        assert exc.value.status_code == 429
+
+        release.set()
+        await asyncio.gather(*tasks)
+        assert limiter.status()["running"] == 0
+
+    asyncio.run(run())
+
+
+def test_queue_timeout_rejects_with_503():
+    async def run():
+        limiter = EndpointLimiter("generate", concurrency=1, queue=4, queue_timeout=0.05)
+        release = asyncio.Event()
+        holder = asyncio.create_task(_hold(limiter, release))
+        await asyncio.sleep(0)
+
+        with pytest.raises(AdmissionRejected) as exc:
+            async with limiter.slot():
+                pass
+        assert exc.value.status_code == 503
+        assert limiter.status()["waiting"] == 0
+
+        release.set()
+        await holder
+
+    asyncio.run(run())
+
+
+def test_unknown_endpoint_is_unlimited():
+    async def run():
+        admission = AdmissionController({"rag_query": {"concurrency": 1}})
+        async with admission.slot("documents_search"):
+            async with admission.slot("documents_search"):
+                pass
+
+    asyncio.run(run())
+
+
+def test_deadline_scope_keeps_earlier_outer_deadline():
+    assert remaining() is None
+
+    with deadline_scope(0.5):
+        with deadline_scope(10):
+            assert remaining() <= 0.5
+        with deadline_scope(None):
+            assert remaining() <= 0.5
+
+    assert remaining() is None
+
+
+def test_deadline_propagates_to_worker_thread():
+    def blocking_stage():
+        time.sleep(0.05)
+        check_deadline("generation")
+
+    async def run():
+        admission = AdmissionController({"llm_generate": {"concurrency": 1, "timeout": 0.01}})
+        async with admission.slot("llm_generate"):
+            await asyncio.to_thread(blocking_stage)
+
+    with pytest.raises(DeadlineExceeded):
+        asyncio.run(run())
+
+
+def test_acquired_slot_is_released_once():
+    async def run():
+        admission = AdmissionController({"documents_stream": {"concurrency": 1, "queue": 0}})
+        limiter = admission.limiters["documents_stream"]
+
+        release = await admission.acquire("documents_stream")
+        assert limiter.status()["running"] == 1
+        with pytest.raises(AdmissionRejected):
+            await admission.acquire("documents_stream")
+
+        release()
+        release()
+        assert limiter.status()["running"] == 0
+
+        await limiter.acquire()
+        assert limiter.status()["running"] == 1
+        limiter.release()
+
+    asyncio.run(run())
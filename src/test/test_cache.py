@@ -0,0 +1,70 @@
+import time
+
+from services.admission import TokenBucket
+from services.cache import LRUCache
+
+
+def test_lru_evicts_least_recently_used():
+    cache = LRUCache(maxsize=2)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    assert cache.get("a") == 1
+
+    cache.put("c", 3)
+
+    assert cache.get("b") is None
+    assert cache.get("a") == 1 and cache.get("c") == 3
+    assert (cache.hits, cache.misses) == (3, 1)
+
+
+def test_ttl_expires_entries():
+    cache = LRUCache(maxsize=4, ttl=0.01)
+    cache.put(("question", 3), {"answer": "x"})
+    time.sleep(0.02)
+
+    assert cache.get(("question", 3)) is None
+    assert len(cache) == 0
+
+
+def test_disabled_cache_stores_nothing():
+    cache = LRUCache(maxsize=0)
+    cache.put("a", 1)
+    assert cache.get("a") is None
+
+
+def test_token_bucket_allows_burst_then_refills():
+    bucket = TokenBucket(rate=100, burst=2)
+
+    assert bucket.try_acquire() and bucket.try_acquire()
+    assert not bucket.try_acquire()
+
+    time.sleep(0.02)
+    assert bucket.try_acquire()
+
+
+def test_invalidate_removes_single_entry():
+    cache = LRUCache(maxsize=4)
+    cache.put("doc-1", "old text")
+    cache.put("doc-2", "other text")
+
+    cache.invalidate("doc-1")
+    cache.invalidate("missing")
+
+    assert cache.get("doc-1") is None
+    assert cache.get("doc-2") == "other text"
+
+
+def test_lru_values_skip_expired_without_touching_order():
+    cache = LRUCache(maxsize=3)
+    for key, value in (("a", 1), ("b", 2), ("c", 3)):
+        cache.put(key, value)
+    assert cache.values() == [1, 2, 3]
+
+    cache.put("d", 4)
+    assert cache.get("a") is None    # values() 가 LRU 순서를 바꾸지 않음
+
+    expiring = LRUCache(maxsize=2, ttl=0.05)
+    expiring.put("a", 1)
+    time.sleep(0.06)
+    expiring.put("b", 2)
+    assert expiring.values() == [2]
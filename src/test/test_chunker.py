@@ -0,0 +1,73 @@
+import re
+
+import pytest
+
+from services.chunker import TokenChunker
+
+
+CLS, SEP = 101, 102
+
+
+class WhitespaceFastTokenizer:
+    """ 공백 단위 토큰 + [CLS] / [SEP] 를 붙이는 fast tokenizer 흉내 (offset mapping 제공) """
+
+    is_fast = True
+
+    def num_special_tokens_to_add(self, pair: bool = False) -> int:
+        return 2
+
+
+    def build_inputs_with_special_tokens(self, input_ids):
+        return [CLS] + list(input_ids) + [SEP]
+
+
+    def __call__(self, texts, **kwargs):
+        input_ids, offsets = [], []
+        for text in texts:
+            matches = list(re.finditer(r"\S+", text))
+            input_ids.append([1000 + index for index in range(len(matches))])
+            offsets.append([match.span() for match in matches])
+        return {"input_ids": input_ids, "offset_mapping": offsets}
+
+
+def _words(n: int) -> str:
+    return " ".join(f"w{i}" for i in range(n))
+
+
+def test_windows_fill_model_length_with_stride_overlap():
+    chunker = TokenChunker(WhitespaceFastTokenizer(), max_seq_length=6, stride=1)    # window 4, step 3
+    chunks = chunker.split(_words(10))
+
+    assert [chunk.text for chunk in chunks] == ["w0 w1 w2 w3", "w3 w4 w5 w6", "w6 w7 w8 w9"]
+    assert all(len(chunk.input_ids) <= 6 for chunk in chunks)
+    assert chunks[0].input_ids == [CLS, 1000, 1001, 1002, 1003, SEP]
+
+
+def test_last_window_is_truncated_not_padded():
+    chunker = TokenChunker(WhitespaceFastTokenizer(), max_seq_length=6)
+    chunks = chunker.split(_words(5))
+
+    assert [chunk.text for chunk in chunks] == ["w0 w1 w2 w3", "w4"]
+    assert chunks[1].input_ids == [CLS, 1004, SEP]
+
+
+def test_offsets_keep_original_text_between_tokens():
+    chunker = TokenChunker(WhitespaceFastTokenizer(), max_seq_length=6)
+    text = "  가나   다라\n마바  "
+    assert chunker.split(text)[0].text == "가나   다라\n마바"
+
+
+def test_short_and_empty_inputs():
+    chunker = TokenChunker(WhitespaceFastTokenizer(), max_seq_length=6)
+
+    assert [chunk.text for chunk in chunker.split("짧은 문서")] == ["짧은 문서"]
+    assert chunker.split("") == [("", [CLS, SEP])]
+    assert chunker.split_batch([]) == []
+    assert [len(chunks) for chunks in chunker.split_batch([_words(9), "", "a"])] == [3, 1, 1]
+
+
+def test_invalid_window_settings():
+    with pytest.raises(ValueError):
+        TokenChunker(WhitespaceFastTokenizer(), max_seq_length=2)
+    with pytest.raises(ValueError):
+        TokenChunker(WhitespaceFastTokenizer(), max_seq_length=6, stride=4)
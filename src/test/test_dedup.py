@@ -0,0 +1,55 @@
+import os
+
+from services.dedup import MinHasher, NearDuplicateIndex, estimate_similarity, lsh_bands
+
+
+ARTICLE = (
+    "딥러닝은 여러 층의 인공 신경망을 사용해 데이터에서 표현을 학습하는 기계 학습의 한 분야이다. "
+    "대표적인 프레임워크로는 PyTorch, TensorFlow, JAX 등이 있으며 이미지 인식과 자연어 처리에 널리 쓰인다."
+)
+
+
+def test_signature_similarity_tracks_overlap():
+    hasher = MinHasher(num_perm=128)
+    near = ARTICLE.replace("JAX 등이", "JAX 등이  ") + " 출처: 위키백과"
+    unrelated = "서울은 대한민국의 수도이며 한강을 끼고 있는 인구 천만 규모의 도시이다. 조선 시대부터 수도였다."
+
+    assert estimate_similarity(hasher.signature(ARTICLE), hasher.signature(near)) > 0.8
+    assert estimate_similarity(hasher.signature(ARTICLE), hasher.signature(unrelated)) < 0.2
+
+
+def test_lsh_bands_put_threshold_at_or_below_target():
+    bands, rows = lsh_bands(128, 0.8)
+    assert bands * rows == 128
+    assert (1 / bands) ** (1 / rows) <= 0.8
+
+
+def test_filter_skips_stored_and_in_batch_duplicates():
+    index = NearDuplicateIndex(threshold=0.8)
+    keep, duplicates, signatures = index.filter([ARTICLE])
+    index.add(["doc-1"], signatures)
+
+    keep, duplicates, signatures = index.filter([
+        ARTICLE + " ",
+        "완전히 다른 문서의 본문입니다. 벡터 데이터베이스는 근사 최근접 이웃 검색을 제공한다.",
+        "완전히 다른 문서의 본문입니다. 벡터 데이터베이스는 근사 최근접 이웃 검색을 제공한다!",
+    ])
+
+    assert keep == [1]
+    assert {position: match for position, (match, _) in duplicates.items()} == {0: "doc-1", 2: "batch:1"}
+    assert all(similarity >= index.threshold for _, similarity in duplicates.values())
+    assert len(signatures) == 1
+
+
+def test_index_log_restores_adds_and_removes(tmp_path):
+    path = os.path.join(tmp_path, "collection.jsonl")
+    index = NearDuplicateIndex(path)
+    hasher = index.hasher
+    index.add(["a", "b"], [hasher.signature(ARTICLE), hasher.signature("다른 문서 본문 텍스트")])
+    index.remove(["a", "missing"])
+
+    restored = NearDuplicateIndex(path)
+
+    assert len(restored) == 1
+    assert restored.find(hasher.signature(ARTICLE)) is None
+    assert restored.find(hasher.signature("다른 문서 본문 텍스트"))[0] == "b"
@@ -0,0 +1,56 @@
+import asyncio
+
+from services.dedup import NearDuplicateIndex
+from services.document import Document, DocumentService
+
+
+TEXT = "벡터 데이터베이스는 근사 최근접 이웃 검색을 제공한다. " * 5
+
+
+class FakeEmbedder:
+    model_name = "model"
+
+    async def embed_documents(self, texts):
+        return [[0.0] for _ in texts]
+
+
+class FakeMilvus:
+    def __init__(self):
+        self.rows = {}
+
+    async def insert_document(self, rows, embedding_model=None):
+        self.rows.update({row["id"]: row for row in rows})
+
+    async def fetch_texts(self, doc_ids):
+        return {doc_id: self.rows[doc_id]["text"] for doc_id in doc_ids if doc_id in self.rows}
+
+
+def _service():
+    service = DocumentService.__new__(DocumentService)
+    service.embedding_service = FakeEmbedder()
+    service.milvus_service = FakeMilvus()
+    service.deduplicator = NearDuplicateIndex()
+    service.chunk_service = None
+    service.text_cache = None
+    return service
+
+
+def test_duplicate_of_live_document_is_skipped():
+    service = _service()
+    asyncio.run(service.process_document([Document(id="a", text=TEXT)]))
+
+    results, skipped = asyncio.run(service.process_document([Document(id="b", text=TEXT + "!")]))
+
+    assert results == [] and skipped[0]["duplicate_of"] == "a"
+
+
+def test_signature_of_missing_document_does_not_skip():
+    service = _service()
+    asyncio.run(service.process_document([Document(id="a", text=TEXT)]))
+    # index 에는 남았지만 collection 에서는 지워진 문서
+    del service.milvus_service.rows["a"]
+
+    results, skipped = asyncio.run(service.process_document([Document(id="b", text=TEXT)]))
+
+    assert [row["id"] for row in results] == ["b"] and skipped == []
+    assert service.deduplicator.find(service.deduplicator.hasher.signature(TEXT))[0] == "b"
@@ -0,0 +1,93 @@
+import asyncio
+import gzip
+import json
+
+import pytest
+
+from services.ingest import NDJSONLineTooLong, ingest_stream, iter_ndjson
+
+
+async def _chunks(data: bytes, size: int):
+    for start in range(0, len(data), size):
+        yield data[start:start + size]
+
+
+async def _collect(iterator):
+    return [item async for item in iterator]
+
+
+def _parse(record):
+    if "text" not in record:
+        raise ValueError("text is required")
+    return record
+
+
+def test_parses_lines_split_across_gzip_chunks():
+    lines = [json.dumps({"id": str(i), "text": f"문서 {i}"}, ensure_ascii=False) for i in range(50)]
+    body = gzip.compress(("\n".join(lines) + "\n").encode())
+
+    records = asyncio.run(_collect(iter_ndjson(_chunks(body, 7), gzip=True, decompress_chunk_bytes=16)))
+
+    assert [line_no for line_no, _ in records] == list(range(1, 51))
+    assert records[-1][1] == {"id": "49", "text": "문서 49"}
+
+
+def test_line_longer_than_limit_is_rejected():
+    body = b'{"text": "' + b"x" * 100 + b'"}\n'
+
+    with pytest.raises(NDJSONLineTooLong):
+        asyncio.run(_collect(iter_ndjson(_chunks(body, 8), max_line_bytes=32)))
+
+
+def test_ingest_processes_rolling_batches_and_reports_bad_lines():
+    body = b'{"text": "a"}\n\n{"text": "b"}\nnot json\n{"id": "x"}\n{"text": "c"}\n{"text": "d"}'
+    batches = []
+
+    async def process_batch(documents):
+        batches.append(len(documents))
+        return len(documents), []
+
+    events = asyncio.run(_collect(ingest_stream(
+        iter_ndjson(_chunks(body, 5)), _parse, process_batch, batch_size=2
+    )))
+
+    assert batches == [2, 2]
+    assert [event["status"] for event in events] == ["progress", "progress", "success"]
+    assert events[-1]["inserted"] == 4
+    assert [error["line"] for error in events[-1]["error_lines"]] == [4, 5]
+
+
+def test_ingest_reports_inserted_count_when_batch_fails():
+    body = b"".join(json.dumps({"text": str(i)}).encode() + b"\n" for i in range(5))
+    calls = 0
+
+    async def process_batch(documents):
+        nonlocal calls
+        calls += 1
+        if calls == 2:
+            raise RuntimeError("milvus unavailable")
+        return len(documents), []
+
+    events = asyncio.run(_collect(ingest_stream(
+        iter_ndjson(_chunks(body, 64)), _parse, process_batch, batch_size=2
+    )))
+
+    assert events[-1]["status"] == "error"
+    assert events[-1]["inserted"] == 2
+
+
+def test_ingest_reports_skipped_duplicates_with_line_numbers():
+    body = b'{"text": "a"}\nnot json\n{"text": "a"}\n{"text": "b"}\n'
+
+    async def process_batch(documents):
+        # 두 번째 문서가 첫 문서의 중복
+        skipped = [{"index": 1, "id": None, "duplicate_of": "doc-a", "similarity": 1.0}] if len(documents) == 2 else []
+        return len(documents) - len(skipped), skipped
+
+    events = asyncio.run(_collect(ingest_stream(
+        iter_ndjson(_chunks(body, 7)), _parse, process_batch, batch_size=2
+    )))
+
+    assert events[0]["skipped"] == [{"line": 3, "id": None, "duplicate_of": "doc-a", "similarity": 1.0}]
+    assert events[0]["inserted"] == 1 and events[0]["duplicates"] == 1
+    assert events[-1]["status"] == "success" and events[-1]["duplicates"] == 1 and events[-1]["inserted"] == 2
@@ -0,0 +1,124 @@
+import asyncio
+import json
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+from loaders.base import BaseLoader
+from loaders.directory_loader import DirectoryLoader
+from loaders.jsonl_loader import JsonlLoader
+from loaders.parquet_loader import ParquetLoader
+
+
+async def _collect(iterator):
+    return [item async for item in iterator]
+
+
+class _SlowLoader(BaseLoader):
+    """ 쿼리마다 제목 목록을 지연을 두고 돌려주는 loader """
+
+    def __init__(self, titles_by_query, delay=0.05):
+        self.titles_by_query = titles_by_query
+        self.delay = delay
+        self.active = 0
+        self.max_active = 0
+
+    def _dedupe_key(self, document):
+        return document["metadata"]["title"]
+
+    async def load(self, query, language="ko", load_max_docs=None):
+        self.active += 1
+        self.max_active = max(self.max_active, self.active)
+        try:
+            for title in self.titles_by_query[query]:
+                await asyncio.sleep(self.delay)
+                yield {"text": title, "metadata": {"title": title, "query": query}}
+        finally:
+            self.active -= 1
+
+
+def test_load_batches_dedupes_and_limits_concurrency():
+    loader = _SlowLoader({
+        "딥러닝": ["a", "b", "c"],
+        "딥러닝 프레임워크": ["b", "c", "d"],
+        "머신러닝": ["e"],
+    })
+
+    batches = asyncio.run(_collect(
+        loader.load_batches(list(loader.titles_by_query), concurrency=2, batch_size=2)
+    ))
+
+    titles = [document["text"] for batch in batches for document in batch]
+    assert sorted(titles) == ["a", "b", "c", "d", "e"]
+    assert all(len(batch) <= 2 for batch in batches)
+    assert loader.max_active == 2
+
+
+def test_first_batch_is_yielded_before_loading_finishes():
+    loader = _SlowLoader({"q": ["a", "b", "c", "d"]}, delay=0.1)
+
+    async def scenario():
+        async for batch in loader.load_batches(["q"], batch_size=16):
+            return batch, loader.active
+
+    batch, active = asyncio.run(scenario())
+    assert [document["text"] for document in batch] == ["a"]
+    assert active == 1
+
+
+def test_jsonl_loader(tmp_path):
+    path = tmp_path / "docs.jsonl"
+    path.write_text(
+        "\n".join(json.dumps({"text": f"문서 {i}", "title": f"t{i}", "metadata": {"k": i}}) for i in range(5))
+        + "\nnot json\n",
+        encoding="utf-8"
+    )
+
+    documents = asyncio.run(_collect(JsonlLoader(read_size=16).load(str(path), load_max_docs=3)))
+
+    assert [document["text"] for document in documents] == ["문서 0", "문서 1", "문서 2"]
+    assert documents[1]["metadata"]["title"] == "t1"
+    assert documents[1]["metadata"]["k"] == 1
+
+
+def test_jsonl_loader_skips_malformed_records(tmp_path):
+    path = tmp_path / "docs.jsonl"
+    path.write_text(
+        "\n".join([
+            json.dumps({"title": "본문 없음"}),
+            json.dumps(["not", "an", "object"]),
+            json.dumps({"text": 3}),
+            json.dumps({"text": "메타데이터 오류", "metadata": "x"}),
+            json.dumps({"text": "정상"}),
+        ]),
+        encoding="utf-8"
+    )
+
+    documents = asyncio.run(_collect(JsonlLoader().load(str(path))))
+
+    assert [document["text"] for document in documents] == ["정상"]
+
+
+def test_directory_loader(tmp_path):
+    (tmp_path / "sub").mkdir()
+    (tmp_path / "a.txt").write_text("텍스트", encoding="utf-8")
+    (tmp_path / "sub" / "b.md").write_text("# 마크다운", encoding="utf-8")
+    (tmp_path / "c.bin").write_text("skip", encoding="utf-8")
+
+    documents = asyncio.run(_collect(DirectoryLoader().load(str(tmp_path))))
+
+    assert [(d["metadata"]["title"], d["metadata"]["format"]) for d in documents] == [
+        ("a", "text"), ("b", "markdown")
+    ]
+
+
+def test_parquet_loader(tmp_path):
+    path = tmp_path / "docs.parquet"
+    pq.write_table(
+        pa.table({"text": [f"본문 {i}" for i in range(10)], "title": [f"t{i}" for i in range(10)]}),
+        path
+    )
+
+    documents = asyncio.run(_collect(ParquetLoader(batch_size=3).load(str(path), load_max_docs=7)))
+
+    assert len(documents) == 7
+    assert documents[6]["metadata"]["title"] == "t6"
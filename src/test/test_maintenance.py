@@ -0,0 +1,400 @@
+import asyncio
+import contextvars
+import json
+import threading
+from types import SimpleNamespace
+
+import pytest
+
+import services.milvus as milvus_module
+from services.maintenance import IndexMaintenance
+from services.milvus import MilvusService, derive_nlist
+from services.scheduler import current_priority
+
+
+# ---- Milvus 없이 collection / alias 를 흉내 내는 in-memory server ---- #
+class FakeCollection:
+    def __init__(self, server, name, dimension=4, model="old-model"):
+        self.server = server
+        self.name = name
+        self.rows = {}
+        self.description = json.dumps({"embedding_model": model})
+        self.schema = SimpleNamespace(
+            fields=[SimpleNamespace(name="embedding", params={"dim": dimension})],
+            description=self.description
+        )
+        self.created_indexes = []
+
+    def insert(self, rows):
+        self.upsert(rows)
+
+    def upsert(self, rows):
+        for row in rows:
+            self.rows[row["id"]] = dict(row)
+
+    def delete(self, expr):
+        for doc_id in json.loads(expr[len("id in "):]):
+            self.rows.pop(doc_id, None)
+
+    def query_iterator(self, batch_size, output_fields):
+        rows = [dict(row) for row in self.rows.values()]
+        batches = iter([rows[i:i + batch_size] for i in range(0, len(rows), batch_size)] + [[]])
+        return SimpleNamespace(next=lambda: next(batches), close=lambda: None)
+
+    @property
+    def num_entities(self):
+        return len(self.rows)
+
+    @property
+    def indexes(self):
+        return []
+
+    def query(self, expr, output_fields, **kwargs):
+        return [{"count(*)": len(self.rows)}]
+
+    def create_index(self, field_name, index_params):
+        self.created_indexes.append(field_name)
+
+    def load(self):
+        pass
+
+    def flush(self):
+        pass
+
+
+class FakeMilvus:
+    def __init__(self):
+        self.collections = {}
+        self.aliases = {}
+        self.fail_create_alias = False
+
+    # pymilvus.Collection(name=..., schema=...)
+    def Collection(self, name, schema=None):
+        if schema is not None:
+            dimension = next(field.params["dim"] for field in schema.fields if field.name == "embedding")
+            model = json.loads(schema.description or "{}").get("embedding_model")
+            self.collections[name] = FakeCollection(self, name, dimension, model)
+        return self.collections[self.aliases.get(name, name)]
+
+    # pymilvus.utility
+    def load_state(self, name):
+        return SimpleNamespace(name="Loaded")
+
+    def wait_for_index_building_complete(self, name):
+        pass
+
+    def drop_collection(self, name):
+        self.collections.pop(name, None)
+
+    def rename_collection(self, old, new):
+        collection = self.collections.pop(old)
+        collection.name = new
+        self.collections[new] = collection
+
+    # MilvusClient
+    def has_collection(self, name):
+        return name in self.collections or name in self.aliases
+
+    def describe_alias(self, alias):
+        if alias not in self.aliases:
+            raise Exception(f"alias {alias} not found")
+        return {"collection_name": self.aliases[alias]}
+
+    def alter_alias(self, collection_name, alias):
+        self.aliases[alias] = collection_name
+
+    def create_alias(self, collection_name, alias):
+        if self.fail_create_alias or alias in self.collections:
+            raise Exception("create alias failed")
+        self.aliases[alias] = collection_name
+
+
+@pytest.fixture
+def milvus(monkeypatch):
+    server = FakeMilvus()
+    monkeypatch.setattr(milvus_module, "Collection", server.Collection)
+    monkeypatch.setattr(milvus_module, "utility", server)
+    return server
+
+
+def make_service(server, name="documents", rows=()):
+    service = MilvusService.__new__(MilvusService)
+    service.collection_name = name
+    service.embedding_model = "old-model"
+    service.dimension = 4
+    service.parent_field = False
+    service.client = server
+    service.collection = server.collections[name] = FakeCollection(server, name)
+    service._shadow = None
+    service._shadow_transform = None
+    service._shadow_touched = set()
+    service._shadow_lock = threading.Lock()
+    for doc_id in rows:
+        service.collection.rows[doc_id] = {"id": doc_id, "text": doc_id, "embedding": [0.0] * 4, "metadata": {}}
+    return service
+
+
+# ---- nlist / 재구축 시점 ---- #
+def test_derive_nlist_bounds():
+    assert derive_nlist(0) == 4
+    assert derive_nlist(10000) == 400
+    assert derive_nlist(10 ** 12) == 65536
+
+
+class FakeStatsService:
+    def __init__(self, live_rows, nlist):
+        self.collection_name = "documents"
+        self._stats = {"rows": live_rows, "live_rows": live_rows, "deleted_ratio": 0.0, "nlist": nlist}
+
+    def flush(self):
+        pass
+
+    def stats(self):
+        return dict(self._stats)
+
+
+def _maintenance(stub_rebuild: bool = True, **kwargs):
+    kwargs.setdefault("interval", 1)
+    kwargs.setdefault("flush_interval", 1)
+    kwargs.setdefault("compaction_ratio", 0.5)
+    kwargs.setdefault("growth_factor", 2.0)
+    kwargs.setdefault("min_rows", 1000)
+    maintenance = IndexMaintenance(lambda: [], **kwargs)
+    if stub_rebuild:
+        maintenance.started = []
+        maintenance._start_rebuild = lambda service, live_rows, **_: maintenance.started.append(live_rows)
+    return maintenance
+
+
+@pytest.mark.parametrize("live_rows, nlist, rows_at_build, expected", [
+    (25000, 400, None, [25000]),     # nlist 400 → 10000 행에서 구축된 것으로 역산, 2.5 배 증가
+    (15000, 400, None, []),          # 1.5 배 → 아직
+    (25000, 400, 20000, []),         # 기록된 구축 시점 행 수가 역산보다 우선
+    (900, 16, None, []),             # min_rows 미만
+    (25000, None, None, []),         # index 정보 없음
+])
+def test_rebuild_starts_when_rows_outgrow_index(live_rows, nlist, rows_at_build, expected):
+    maintenance = _maintenance()
+    service = FakeStatsService(live_rows, nlist)
+    maintenance._state(service)["rows_at_build"] = rows_at_build
+
+    asyncio.run(maintenance._maintain(service))
+
+    assert maintenance.started == expected
+
+
+# ---- alias 전환 ---- #
+def test_rebuild_swaps_alias_and_drops_previous(milvus):
+    service = make_service(milvus, rows=["a", "b"])
+    # 이미 alias 로 서비스 중인 collection
+    milvus.rename_collection("documents", "documents_v1")
+    milvus.aliases["documents"] = "documents_v1"
+
+    shadow_name = service.rebuild({"params": {"nlist": 8}}, batch_size=1)
+
+    assert milvus.aliases["documents"] == shadow_name
+    assert set(milvus.collections) == {shadow_name}
+    assert set(service.collection.rows) == {"a", "b"}
+
+
+def test_pre_alias_collection_is_renamed_not_dropped(milvus):
+    service = make_service(milvus, rows=["a"])
+
+    shadow_name = service.rebuild({"params": {"nlist": 8}})
+
+    assert milvus.aliases["documents"] == shadow_name
+    assert set(milvus.collections) == {shadow_name}
+    assert set(service.collection.rows) == {"a"}
+
+
+def test_pre_alias_swap_failure_keeps_serving_collection(milvus):
+    service = make_service(milvus, rows=["a"])
+    milvus.fail_create_alias = True
+
+    with pytest.raises(Exception):
+        service.rebuild({"params": {"nlist": 8}})
+
+    assert set(milvus.collections) == {"documents"}
+    assert "documents" not in milvus.aliases
+    assert set(service.collection.rows) == {"a"}
+
+
+# ---- 재임베딩 ---- #
+class FakeEmbedder:
+    """ 새 모델: 임베딩 첫 값이 본문 길이. hooks[n] 은 n 번째 임베딩 호출 중에 실행 (복사 중 쓰기 요청) """
+
+    model_name = "new-model"
+    dimension = 4
+
+    def __init__(self, hooks=None):
+        self.hooks = dict(hooks or {})
+        self.calls = []
+
+
+    async def embed_documents(self, texts):
+        self.calls.append((list(texts), current_priority(), threading.get_ident()))
+        hook = self.hooks.pop(len(self.calls), None)
+        if hook is not None:
+            # 요청은 별도 task (복사 작업의 contextvar 를 물려받지 않음)
+            await asyncio.get_running_loop().create_task(hook(), context=contextvars.Context())
+        return [[float(len(text)), 1.0, 1.0, 1.0] for text in texts]
+
+
+def test_reembed_keeps_writes_made_during_copy(milvus):
+    service = make_service(milvus, rows=["a", "b", "c"])
+    maintenance = _maintenance(stub_rebuild=False)
+
+    async def concurrent_writes():
+        # "b" batch 를 임베딩하는 동안 들어온 수정 (복사본이 덮어쓰면 안 됨) / 이미 복사된 "a" 삭제
+        await service.insert_document([{"id": "b", "text": "b-new", "embedding": [0.0] * 4, "metadata": {}}])
+        await service.delete_documents(["a"])
+
+    embedder = FakeEmbedder(hooks={2: concurrent_writes})
+    switched = []
+
+    async def scenario():
+        swapped = []
+        await maintenance.reembed(
+            service, 
+            embedder, 
+            on_swap=lambda: swapped.append(threading.get_ident()), 
+            batch_size=1,
+            switch_embedder=lambda: switched.append(service._shadow_lock.locked())
+        )
+        await maintenance._rebuilds[service.collection_name]
+        return swapped, threading.get_ident()
+
+    swapped, loop_thread = asyncio.run(scenario())
+
+    rows = service.collection.rows
+    assert set(rows) == {"b", "c"}
+    assert rows["b"]["text"] == "b-new" and rows["b"]["embedding"][0] == 5.0
+    assert rows["c"]["embedding"][0] == 1.0
+    assert service.embedding_info()["embedding_model"] == "new-model"
+    assert list(milvus.collections) == [milvus.aliases["documents"]]
+
+    # 임베딩은 모두 event loop 에서, 복사는 bulk / 쓰기 요청은 요청의 우선순위로
+    priorities = {tuple(texts): priority for texts, priority, _ in embedder.calls}
+    assert priorities == {("a",): "bulk", ("b",): "bulk", ("b-new",): "interactive", ("c",): "bulk"}
+    assert {thread for _, _, thread in embedder.calls} == {loop_thread}
+    assert swapped == [loop_thread]
+    # 질의 / 쓰기 임베딩 모델은 alias 전환과 같은 lock 안에서 교체
+    assert switched == [True]
+    assert maintenance.state["documents"]["rebuilding"] is False
+
+
+def test_concurrent_reembed_starts_one_rebuild(milvus):
+    service = make_service(milvus, rows=["a"])
+    maintenance = _maintenance(stub_rebuild=False)
+
+    async def scenario():
+        results = await asyncio.gather(
+            maintenance.reembed(service, FakeEmbedder(), batch_size=10),
+            maintenance.reembed(service, FakeEmbedder(), batch_size=10),
+            return_exceptions=True
+        )
+        await maintenance._rebuilds[service.collection_name]
+        return results
+
+    results = asyncio.run(scenario())
+    assert results[0] is None and isinstance(results[1], RuntimeError)
+    assert len(milvus.collections) == 1
+
+
+def test_insert_during_swap_lands_in_new_collection(milvus):
+    service = make_service(milvus)
+    shadow = FakeCollection(milvus, "documents_new", model="new-model")
+
+    async def transform(rows):
+        # 변환을 기다리는 사이 alias 전환
+        service.collection, service._shadow = shadow, None
+        return [{**row, "embedding": [9.0] * 4} for row in rows]
+
+    service._shadow, service._shadow_transform = shadow, transform
+    asyncio.run(service.insert_document([{"id": "x", "text": "x", "embedding": [0.0] * 4, "metadata": {}}]))
+
+    assert shadow.rows["x"]["embedding"] == [9.0] * 4
+    assert milvus.collections["documents"].rows == {}
+
+
+def test_insert_retries_when_rebuild_starts_during_transform(milvus):
+    service = make_service(milvus)
+    shadow = FakeCollection(milvus, "documents_new", model="new-model")
+
+    async def transform(rows):
+        return [{**row, "embedding": [9.0] * 4} for row in rows]
+
+    write, threads = service._write, []
+    def start_rebuild_then_write(**kwargs):
+        # 변환 없이 읽은 직후 재구축 시작 → 원본 행을 shadow 에 쓰지 않고 변환부터 다시
+        threads.append(threading.get_ident())
+        if service._shadow is None and kwargs.get("transform") is None:
+            service._shadow, service._shadow_transform = shadow, transform
+        return write(**kwargs)
+    service._write = start_rebuild_then_write
+
+    async def scenario():
+        await service.insert_document([{"id": "x", "text": "x", "embedding": [0.0] * 4, "metadata": {}}])
+        return threading.get_ident()
+
+    loop_thread = asyncio.run(scenario())
+
+    assert shadow.rows["x"]["embedding"] == [9.0] * 4
+    assert milvus.collections["documents"].rows["x"]["embedding"] == [0.0] * 4
+    # 쓰기는 event loop 밖에서 (rebuild thread 가 잡은 lock 을 loop 에서 기다리지 않음)
+    assert len(threads) == 2 and loop_thread not in threads
+
+
+def test_shadow_is_loaded_outside_write_lock(milvus, monkeypatch):
+    service = make_service(milvus, rows=["a"])
+    locked = []
+    monkeypatch.setattr(FakeCollection, "load", lambda collection: locked.append(service._shadow_lock.locked()))
+
+    service.rebuild({"params": {"nlist": 8}})
+
+    assert locked == [False]
+
+
+def test_rows_from_previous_model_are_rejected_after_swap(milvus):
+    service = make_service(milvus, rows=["a"])
+    service.rebuild({"params": {"nlist": 8}}, schema=milvus_module.build_schema(4, "new-model"))
+    row = {"id": "a", "text": "a-new", "embedding": [0.0] * 4, "metadata": {}}
+
+    # 전환 전에 이전 모델로 임베딩한 쓰기 / 질의는 새 collection 에 닿지 않고, 수정이면 기존 문서도 남는다
+    with pytest.raises(milvus_module.EmbeddingMismatchError):
+        asyncio.run(service.insert_document([row], embedding_model="old-model"))
+    with pytest.raises(milvus_module.EmbeddingMismatchError):
+        asyncio.run(service.update_document("a", "a-new", [0.0] * 4, embedding_model="old-model"))
+    with pytest.raises(milvus_module.EmbeddingMismatchError):
+        asyncio.run(service.search_documents([0.0] * 4, embedding_model="old-model"))
+    assert service.collection.rows["a"]["text"] == "a"
+
+    asyncio.run(service.update_document("a", "a-new", [1.0] * 4, embedding_model="new-model"))
+    assert service.collection.rows["a"]["text"] == "a-new"
+
+
+# ---- chunk collection (doc_id scalar field) ---- #
+def test_chunk_rows_carry_indexed_parent_id(milvus):
+    service = make_service(milvus, name="documents__chunks")
+    service.parent_field = True
+    chunk = {"id": "a#0", "text": "a", "embedding": [0.0] * 4, "metadata": {"doc_id": "a", "chunk": 0}}
+
+    asyncio.run(service.insert_document([chunk]))
+    assert service.collection.rows["a#0"]["doc_id"] == "a"
+    assert service.parent_expr(["a", "b"]) == 'doc_id in ["a", "b"]'
+
+    # 재구축한 collection 에도 doc_id field 와 index 가 이어진다
+    shadow_name = service.rebuild({"params": {"nlist": 8}})
+    assert milvus.collections[shadow_name].rows["a#0"]["doc_id"] == "a"
+    assert milvus.collections[shadow_name].created_indexes == ["embedding", "doc_id"]
+
+
+def test_chunk_collection_without_parent_field_filters_on_metadata(milvus):
+    milvus.collections["documents__chunks"] = FakeCollection(milvus, "documents__chunks")
+    service = MilvusService.__new__(MilvusService)
+    service.collection_name, service.client, service.parent_field = "documents__chunks", milvus, True
+
+    service.init_collection()
+
+    assert service.parent_field is False
+    assert service.parent_expr(["a"]) == 'metadata["doc_id"] in ["a"]'
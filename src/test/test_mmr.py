@@ -0,0 +1,48 @@
+import numpy as np
+from services.mmr import cosine_scores, mmr_select
+
+
+QUERY = [1.0, 0.0, 0.0]
+CANDIDATES = [
+    [0.95, 0.30, 0.0],     # 0: 가장 관련
+    [0.94, 0.31, 0.02],    # 1: 0 과 거의 같은 문서
+    [0.80, 0.0, 0.60],     # 2: 관련 있고 다른 방향
+    [0.0, 1.0, 0.0],       # 3: 무관
+]
+
+
+def test_relevance_only_keeps_search_order():
+    assert mmr_select(QUERY, CANDIDATES, k=3, lambda_mult=1.0) == [0, 1, 2]
+
+
+def test_mmr_prefers_diverse_documents():
+    assert mmr_select(QUERY, CANDIDATES, k=2, lambda_mult=0.5) == [0, 2]
+
+
+def test_duplicate_threshold_drops_near_duplicates():
+    selected = mmr_select(QUERY, CANDIDATES, k=4, lambda_mult=1.0, duplicate_threshold=0.98)
+
+    assert 1 not in selected
+    assert selected[:2] == [0, 2]
+
+
+def test_edge_cases():
+    assert mmr_select(QUERY, [], k=3) == []
+    assert mmr_select(QUERY, CANDIDATES, k=0) == []
+    assert sorted(mmr_select(QUERY, CANDIDATES, k=10)) == [0, 1, 2, 3]
+
+
+def test_large_candidate_set():
+    rng = np.random.default_rng(0)
+    candidates = rng.standard_normal((200, 32))
+    selected = mmr_select(candidates[0], candidates, k=10, lambda_mult=0.7)
+
+    assert selected[0] == 0
+    assert len(set(selected)) == 10
+
+
+def test_cosine_scores_ignore_vector_norm():
+    scores = cosine_scores([1.0, 0.0], [[3.0, 0.0], [0.0, 2.0], [1.0, 1.0]])
+
+    assert np.allclose(scores, [1.0, 0.0, np.sqrt(0.5)], atol=1e-6)
+    assert cosine_scores([1.0, 0.0], []).shape == (0,)
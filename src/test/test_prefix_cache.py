@@ -0,0 +1,27 @@
+from services.prefix_cache import PrefixCacheTracker
+
+
+def test_shared_prefix_is_cached():
+    tracker = PrefixCacheTracker(block_size=4)
+    header = list(range(100, 112))    # 3 blocks 공통 지시문
+
+    assert tracker.observe(header + [1, 2, 3, 4, 5]) == 0
+    # 공통 3 block + 다음 block 일부가 같아도 block 단위로만 적중
+    assert tracker.observe(header + [1, 2, 3, 9, 9]) == 12
+    assert tracker.observe(header + [1, 2, 3, 4, 7]) == 16
+
+
+def test_block_hash_depends_on_prefix():
+    tracker = PrefixCacheTracker(block_size=2)
+    tracker.observe([1, 2, 3, 4])
+
+    # 같은 block 이라도 앞 block 이 다르면 재사용되지 않음
+    assert tracker.observe([9, 9, 3, 4]) == 0
+
+
+def test_lru_eviction():
+    tracker = PrefixCacheTracker(block_size=2, num_blocks=2)
+    tracker.observe([1, 2, 3, 4])
+    tracker.observe([5, 6, 7, 8])
+
+    assert tracker.observe([1, 2, 3, 4]) == 0
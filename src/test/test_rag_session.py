@@ -0,0 +1,139 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+import chains.rag_chain as rag_chain_module
+from chains.prompts import RAG_SYSTEM_PROMPT
+from chains.rag_chain import RAGChain
+from services.session import InvalidSessionError, SessionStore
+
+
+# 질문마다 서로 직교하는 임베딩 → working set 재사용 없이 매 턴 새 문서를 검색
+EMBEDDINGS = {"q1": [1.0, 0.0, 0.0], "q2": [0.0, 1.0, 0.0], "q3": [0.0, 0.0, 1.0]}
+
+
+class FakeDocumentService:
+    embedding_service = SimpleNamespace(model_name="old-model")
+
+    async def embed_query(self, query):
+        return EMBEDDINGS[query]
+
+
+    async def search_similar_documents(self, query, limit, query_embedding, embedding_model, **kwargs):
+        assert embedding_model == self.embedding_service.model_name
+        doc_id = f"doc-{query}"
+        return [{"id": doc_id, "text": f"{doc_id} 본문 " * 20, "embedding": query_embedding, "metadata": {}}]
+
+
+class FakeLLM:
+    """ 공백 단위 토큰, 생성 중 on_generate 실행 (턴 진행 중 문서 수정) """
+
+    def __init__(self, budget):
+        self.budget = budget
+        self.prompts = []
+        self.on_generate = None
+
+
+    def count_tokens(self, texts):
+        return [len(text.split()) for text in texts]
+
+
+    def prompt_token_budget(self, params=None):
+        return self.budget
+
+
+    async def agenerate(self, prompts, params=None):
+        self.prompts.extend(prompts)
+        if self.on_generate is not None:
+            self.on_generate()
+        return ["짧은 답변"]
+
+
+@pytest.fixture(autouse=True)
+def session_config(monkeypatch):
+    monkeypatch.setattr(rag_chain_module.CFG, "session_reuse_threshold", 0.9, raising=False)
+    monkeypatch.setattr(rag_chain_module.CFG, "max_seq_length", 10000, raising=False)
+
+
+def _chain(budget):
+    store = SessionStore(maxsize=4)
+    chain = RAGChain(llm_service=FakeLLM(budget), document_service=FakeDocumentService(), session_store=store)
+    return chain, store
+
+
+def _ask(chain, *questions):
+    async def run():
+        return [await chain.query(question, max_docs=1, session_id="s1") for question in questions]
+    return asyncio.run(run())
+
+
+def test_prompt_drops_oldest_whole_turns_to_fit_token_budget():
+    chain, store = _chain(budget=110)
+    _ask(chain, "q1", "q2", "q3")
+
+    session = store.get_or_create("s1")
+    llm = chain.llm_service
+    assert [turn["documents"] for turn in session.history] == [["doc-q2"], ["doc-q3"]]
+    assert list(session.documents) == ["doc-q2", "doc-q3"]
+    assert all(llm.count_tokens([prompt])[0] <= llm.budget for prompt in llm.prompts)
+
+    # 버린 턴 뒤부터 그대로 이어지고, 문서 번호는 계속 증가
+    assert llm.prompts[2].startswith(RAG_SYSTEM_PROMPT + session.history[0]["text"])
+    assert "문서 3:" in llm.prompts[2]
+
+
+def test_prompt_is_appended_while_under_budget():
+    chain, store = _chain(budget=10000)
+    _ask(chain, "q1", "q2")
+
+    first, second = chain.llm_service.prompts
+    assert second.startswith(first)
+    assert len(store.get_or_create("s1").history) == 2
+
+
+def test_updated_document_resets_session():
+    chain, store = _chain(budget=10000)
+    _ask(chain, "q1")
+
+    assert store.invalidate_documents(["doc-q1"]) == 1
+    session = store.get_or_create("s1")
+    assert session.history == [] and session.documents == {}
+
+    [result] = _ask(chain, "q1")
+    assert result["metadata"]["retrieval"] == "search"
+
+
+def test_document_changed_during_turn_is_not_recorded():
+    chain, store = _chain(budget=10000)
+    _ask(chain, "q1")
+    chain.llm_service.on_generate = lambda: store.invalidate_documents(["doc-q2"])
+
+    [result] = _ask(chain, "q2")
+
+    session = store.get_or_create("s1")
+    assert result["answer"] == "짧은 답변"
+    assert [turn["documents"] for turn in session.history] == [["doc-q1"]]
+    assert session.turns == 2 and not session.stale
+
+
+def test_reembedded_model_restarts_session():
+    chain, store = _chain(budget=10000)
+    _ask(chain, "q1")
+    chain.document_service.embedding_service = SimpleNamespace(model_name="new-model")
+
+    # 같은 질문이어도 이전 모델의 working set 과 비교하지 않고 새로 검색
+    [result] = _ask(chain, "q1")
+
+    session = store.get_or_create("s1")
+    assert result["metadata"]["retrieval"] == "search"
+    assert session.embedding_model == "new-model"
+    assert [turn["documents"] for turn in session.history] == [["doc-q1"]]
+
+
+def test_session_query_rejects_multiple_completions():
+    chain, store = _chain(budget=10000)
+
+    with pytest.raises(InvalidSessionError):
+        asyncio.run(chain.query("q1", max_docs=1, params=SimpleNamespace(n=2), session_id="s1"))
+    assert len(store) == 0
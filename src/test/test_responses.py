@@ -0,0 +1,58 @@
+import gzip
+import json
+
+import msgpack
+import numpy as np
+
+from services.responses import choose_encoding, choose_media_type, encode_body, pack_vectors
+
+
+HITS = [
+    {"id": "doc-1", "score": 0.91, "text": "벡터 데이터베이스 " * 200, "embedding": [0.25, -0.5, 1.0]},
+    {"id": "doc-2", "score": 0.52, "text": "짧은 문서", "metadata": {"source": "wiki"}},
+]
+
+
+def test_json_body_matches_standard_encoder():
+    body, media_type, headers = encode_body({"status": "success", "results": HITS})
+    assert media_type == "application/json"
+    assert "Content-Encoding" not in headers
+    assert json.loads(body) == {"status": "success", "results": HITS}
+
+
+def test_large_body_is_compressed_only_when_accepted():
+    content = {"status": "success", "results": HITS}
+
+    body, _, headers = encode_body(content, accept_encoding="gzip, deflate", compress_min_bytes=1024)
+    assert headers["Content-Encoding"] == "gzip"
+    assert json.loads(gzip.decompress(body)) == content
+
+    small, _, headers = encode_body({"status": "success"}, accept_encoding="gzip", compress_min_bytes=1024)
+    assert "Content-Encoding" not in headers and json.loads(small) == {"status": "success"}
+
+
+def test_negotiation_respects_quality_values():
+    assert choose_encoding(None) is None
+    assert choose_encoding("gzip;q=0, identity") is None
+    assert choose_encoding("*") in ("br", "gzip")
+
+    assert choose_media_type(None) == "application/json"
+    assert choose_media_type("application/json, application/msgpack;q=0.5") == "application/json"
+    assert choose_media_type("application/x-msgpack") == "application/x-msgpack"
+
+
+def test_msgpack_packs_vectors_as_float32_bytes():
+    body, media_type, _ = encode_body(
+        {"status": "success", "results": pack_vectors(HITS)}, accept="application/msgpack"
+    )
+    assert media_type == "application/msgpack"
+
+    results = msgpack.unpackb(body, raw=False)["results"]
+    assert isinstance(results[0]["embedding"], bytes)
+    assert np.frombuffer(results[0]["embedding"], "<f4").tolist() == [0.25, -0.5, 1.0]
+    assert results[1] == HITS[1]
+
+
+def test_packed_vectors_still_serialize_as_json_arrays():
+    body, _, _ = encode_body({"results": pack_vectors(HITS)})
+    assert json.loads(body)["results"][0]["embedding"] == [0.25, -0.5, 1.0]
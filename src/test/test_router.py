@@ -0,0 +1,222 @@
+import asyncio
+import os
+import socket
+import subprocess
+import sys
+import time
+
+import httpx
+import pytest
+from fastapi import HTTPException
+from router.app import GenerationRouter
+from router.balancer import LoadBalancer, NoHealthyWorkerError
+
+TEST_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _start_worker(name: str,
+                  delay: float = 0.0,
+                  fail: bool = False
+                  ):
+    port = _free_port()
+    env = dict(
+        os.environ,
+        FAKE_WORKER_NAME=name,
+        FAKE_WORKER_DELAY=str(delay),
+        FAKE_WORKER_FAIL="1" if fail else "0"
+    )
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "fake_worker:app", "--app-dir", TEST_DIR,
+         "--port", str(port), "--log-level", "warning"],
+        env=env
+    )
+    url = f"http://127.0.0.1:{port}"
+
+    # worker 기동 대기
+    for _ in range(100):
+        try:
+            httpx.get(f"{url}/health", timeout=0.2)
+            return process, url
+        except httpx.TransportError:
+            time.sleep(0.1)
+
+    process.kill()
+    raise RuntimeError(f"fake worker {name} did not start")
+
+
+@pytest.fixture
+def workers():
+    started = []
+
+    def start(*args, **kwargs):
+        process, url = _start_worker(*args, **kwargs)
+        started.append(process)
+        return process, url
+
+    yield start
+
+    for process in started:
+        process.kill()
+        process.wait()
+
+
+# ---- LoadBalancer ---- #
+def test_least_outstanding_selection():
+    balancer = LoadBalancer(["http://a", "http://b"])
+    first = balancer.acquire()
+    second = balancer.acquire()
+
+    assert first is not second
+    balancer.release(first)
+    assert balancer.select() is first
+
+
+def test_kv_cache_policy_prefers_free_cache():
+    balancer = LoadBalancer(["http://a", "http://b"], policy="kv_cache")
+    a, b = balancer.workers
+    balancer.update_health(a, healthy=True, kv_cache_usage=0.9)
+    balancer.update_health(b, healthy=True, kv_cache_usage=0.1)
+    b.outstanding = 5
+
+    assert balancer.select() is b
+
+
+def test_unhealthy_worker_is_skipped():
+    balancer = LoadBalancer(["http://a", "http://b"], max_failures=2)
+    a, b = balancer.workers
+    balancer.mark_failure(a)
+    balancer.mark_failure(a)
+
+    assert all(balancer.select() is b for _ in range(4))
+    balancer.mark_failure(b)
+    balancer.mark_failure(b)
+    with pytest.raises(NoHealthyWorkerError):
+        balancer.select()
+
+
+# ---- GenerationRouter + subprocess fake worker ---- #
+def test_router_spreads_concurrent_requests(workers):
+    _, url_a = workers("a", delay=0.3)
+    _, url_b = workers("b", delay=0.3)
+
+    async def scenario():
+        router = GenerationRouter([url_a, url_b], request_timeout=5)
+        await router.start()
+        try:
+            results = await asyncio.gather(*(
+                router.forward("/generate", {"prompt": str(i)}) for i in range(6)
+            ))
+        finally:
+            await router.stop()
+        return [result["results"].split(":")[0] for result in results]
+
+    names = asyncio.run(scenario())
+    assert names.count("a") == 3 and names.count("b") == 3
+
+
+def test_router_fails_over_to_healthy_worker(workers):
+    _, url_bad = workers("bad", fail=True)
+    process_dead, url_dead = workers("dead")
+    _, url_ok = workers("ok")
+    process_dead.kill()
+    process_dead.wait()
+
+    async def scenario():
+        router = GenerationRouter([url_bad, url_dead, url_ok], request_timeout=5, max_failures=1)
+        await router.start()
+        try:
+            results = [await router.forward("/generate", {"prompt": "q"}) for _ in range(3)]
+            return results, router.balancer.status()
+        finally:
+            await router.stop()
+
+    results, status = asyncio.run(scenario())
+    assert all(result["results"] == "ok:q" for result in results)
+    assert [worker["healthy"] for worker in status] == [False, False, True]
+
+
+def test_router_request_timeout(workers):
+    _, url_slow = workers("slow", delay=2.0)
+
+    async def scenario():
+        router = GenerationRouter([url_slow], request_timeout=0.5)
+        await router.start()
+        try:
+            await router.forward("/generate", {"prompt": "q"})
+        finally:
+            await router.stop()
+
+    with pytest.raises(HTTPException) as exc_info:
+        asyncio.run(scenario())
+    assert exc_info.value.status_code == 504
+
+
+def test_router_fails_over_on_connect_timeout():
+    def handler(request: httpx.Request) -> httpx.Response:
+        if request.url.host == "unreachable":
+            raise httpx.ConnectTimeout("connect timed out", request=request)
+        return httpx.Response(200, json={"status": "success", "results": "ok"})
+
+    async def scenario():
+        router = GenerationRouter(["http://unreachable", "http://ok"], max_failures=1)
+        router._client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        try:
+            results = [await router.forward("/generate", {"prompt": "q"}) for _ in range(2)]
+            return results, router.balancer.status()
+        finally:
+            await router._client.aclose()
+
+    results, status = asyncio.run(scenario())
+    assert all(result["results"] == "ok" for result in results)
+    assert [worker["healthy"] for worker in status] == [False, True]
+
+
+def test_router_fails_over_on_pool_timeout():
+    def handler(request: httpx.Request) -> httpx.Response:
+        if request.url.host == "busy":
+            raise httpx.PoolTimeout("pool timed out", request=request)
+        return httpx.Response(200, json={"status": "success", "results": "ok"})
+
+    async def scenario():
+        router = GenerationRouter(["http://busy", "http://ok"], max_failures=1)
+        router._client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        try:
+            result = await router.forward("/generate", {"prompt": "q"})
+            return result, router.balancer.status()
+        finally:
+            await router._client.aclose()
+
+    result, status = asyncio.run(scenario())
+    assert result["results"] == "ok"
+    # router 쪽 pool 문제이므로 worker 는 계속 healthy
+    assert [worker["healthy"] for worker in status] == [True, True]
+
+
+def test_router_passes_client_errors_through():
+    requests = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        requests.append(request.url.host)
+        return httpx.Response(400, json={"detail": "Prompt cannot be empty"})
+
+    async def scenario():
+        router = GenerationRouter(["http://a", "http://b"], max_failures=1)
+        router._client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        try:
+            with pytest.raises(HTTPException) as exc_info:
+                await router.forward("/generate", {"prompt": " "})
+            return exc_info.value, router.balancer.status()
+        finally:
+            await router._client.aclose()
+
+    error, status = asyncio.run(scenario())
+    # 다른 worker 로 재시도하지 않고, worker 를 실패로 세지 않으며, detail 을 다시 감싸지 않는다
+    assert len(requests) == 1
+    assert error.status_code == 400 and error.detail == "Prompt cannot be empty"
+    assert all(worker["healthy"] for worker in status)
@@ -0,0 +1,102 @@
+import asyncio
+import time
+
+import pytest
+
+from services.admission import AdmissionController
+from services.deadline import DeadlineExceeded, deadline_scope
+from services.scheduler import BULK, INTERACTIVE, PriorityScheduler, current_priority, priority_scope
+
+
+async def _run(scheduler, name, priority, order, hold=0.0):
+    async with scheduler.slot(priority):
+        order.append(name)
+        await asyncio.sleep(hold)
+
+
+def test_interactive_waiters_run_before_bulk():
+    async def run():
+        scheduler = PriorityScheduler("generation")
+        order = []
+        first = asyncio.create_task(_run(scheduler, "bulk-running", BULK, order, hold=0.01))
+        await asyncio.sleep(0)
+        tasks = [
+            asyncio.create_task(_run(scheduler, "bulk-1", BULK, order)),
+            asyncio.create_task(_run(scheduler, "interactive-1", INTERACTIVE, order)),
+            asyncio.create_task(_run(scheduler, "bulk-2", BULK, order)),
+            asyncio.create_task(_run(scheduler, "interactive-2", INTERACTIVE, order)),
+        ]
+        await asyncio.gather(first, *tasks)
+        assert order == ["bulk-running", "interactive-1", "interactive-2", "bulk-1", "bulk-2"]
+        assert scheduler.status() == {"running": None, "waiting": {INTERACTIVE: 0, BULK: 0}}
+
+    asyncio.run(run())
+
+
+def test_starved_bulk_runs_ahead_of_interactive():
+    async def run():
+        scheduler = PriorityScheduler("generation", starvation_seconds=0.01)
+        order = []
+        first = asyncio.create_task(_run(scheduler, "interactive-running", INTERACTIVE, order, hold=0.02))
+        await asyncio.sleep(0)
+        bulk = asyncio.create_task(_run(scheduler, "bulk", BULK, order))
+        interactive = asyncio.create_task(_run(scheduler, "interactive", INTERACTIVE, order))
+        await asyncio.gather(first, bulk, interactive)
+        assert order == ["interactive-running", "bulk", "interactive"]
+
+    asyncio.run(run())
+
+
+def test_cancelled_waiter_does_not_block_queue():
+    async def run():
+        scheduler = PriorityScheduler("embedding")
+        order = []
+        first = asyncio.create_task(_run(scheduler, "running", BULK, order, hold=0.01))
+        await asyncio.sleep(0)
+        cancelled = asyncio.create_task(_run(scheduler, "cancelled", INTERACTIVE, order))
+        waiting = asyncio.create_task(_run(scheduler, "waiting", BULK, order))
+        await asyncio.sleep(0)
+        cancelled.cancel()
+        await asyncio.gather(first, waiting)
+        assert order == ["running", "waiting"]
+
+    asyncio.run(run())
+
+
+def test_endpoint_priority_keeps_header_override():
+    async def run():
+        admission = AdmissionController()
+        async with admission.slot("llm_generate_batch"):
+            assert current_priority() == BULK
+        async with admission.slot("rag_query"):
+            assert current_priority() == INTERACTIVE
+
+        # 요청 헤더로 정한 class 가 endpoint 기본값보다 우선
+        with priority_scope(INTERACTIVE):
+            async with admission.slot("llm_generate_batch"):
+                assert current_priority() == INTERACTIVE
+
+    asyncio.run(run())
+
+
+def test_queue_wait_is_bounded_by_request_deadline():
+    async def run():
+        scheduler = PriorityScheduler("generation")
+        order = []
+        holder = asyncio.create_task(_run(scheduler, "holder", INTERACTIVE, order, hold=0.2))
+        await asyncio.sleep(0)
+
+        start = time.monotonic()
+        with deadline_scope(0.05):
+            with pytest.raises(DeadlineExceeded):
+                await scheduler.acquire(INTERACTIVE)
+        assert time.monotonic() - start < 0.15
+        assert scheduler.status()["waiting"] == {INTERACTIVE: 0, BULK: 0}
+
+        # 빠진 요청이 차례를 잡고 있지 않으므로 다음 요청이 바로 이어받는다
+        await holder
+        await _run(scheduler, "next", BULK, order)
+        assert order == ["holder", "next"]
+        assert scheduler.status()["running"] is None
+
+    asyncio.run(run())
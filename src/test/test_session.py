@@ -0,0 +1,98 @@
+import asyncio
+import time
+
+import pytest
+
+from services.session import InvalidSessionError, Session, SessionStore
+
+
+def _doc(doc_id, embedding):
+    return {"id": doc_id, "text": f"본문 {doc_id}", "embedding": embedding, "metadata": {}}
+
+
+def test_match_reuses_working_set_only_above_threshold():
+    session = Session("s1")
+    assert session.match([1.0, 0.0], limit=2, min_score=0.5) is None
+
+    session.add_turn("턴", 1, [_doc("a", [1.0, 0.0]), _doc("b", [0.6, 0.8]), _doc("c", [0.0, 1.0])])
+
+    matched = session.match([0.9, 0.1], limit=2, min_score=0.8)
+    assert [doc["id"] for doc in matched] == ["a", "b"]
+    assert matched[0]["text"] == "본문 a" and matched[0]["score"] > matched[1]["score"]
+
+    # 가장 가까운 문서도 기준 미만이면 새로 검색
+    assert session.match([-1.0, 0.0], limit=2, min_score=0.5) is None
+
+
+def test_turns_append_and_drop_whole():
+    session = Session("s1")
+    session.add_turn("첫 턴 ", 2, [_doc("b", [1.0]), _doc("a", [1.0])])
+    assert [doc["id"] for doc in session.missing([_doc("a", [1.0]), _doc("c", [1.0])])] == ["c"]
+    session.add_turn("둘째 턴 ", 3, [_doc("c", [1.0])])
+
+    assert list(session.documents) == ["b", "a", "c"]
+    assert session.transcript == "첫 턴 둘째 턴 " and session.tokens == 5
+    assert session.next_index == 4 and session.turns == 2
+
+    session.drop_oldest_turn()
+    assert list(session.documents) == ["c"]
+    assert session.transcript == "둘째 턴 " and session.tokens == 3
+    assert session.next_index == 4
+
+    session.reset()
+    assert session.documents == {} and session.transcript == "" and session.next_index == 1
+    assert session.epoch == 1
+
+
+def test_store_resets_sessions_holding_changed_documents():
+    store = SessionStore(maxsize=4)
+    holding = store.get_or_create("holding")
+    holding.add_turn("턴", 1, [_doc("a", [1.0])])
+    other = store.get_or_create("other")
+    other.add_turn("턴", 1, [_doc("b", [1.0])])
+
+    assert store.invalidate_documents(["a"]) == 1
+    assert holding.history == [] and len(other.history) == 1
+
+
+def test_store_marks_busy_sessions_stale():
+    store = SessionStore(maxsize=4)
+    session = store.get_or_create("busy")
+
+    async def run():
+        async with session.lock:
+            store.invalidate_documents(["x"])
+        store.invalidate_documents(["y"])
+
+    asyncio.run(run())
+    assert session.stale == {"x"}
+
+
+def test_store_evicts_least_recently_used_session():
+    store = SessionStore(maxsize=2)
+    first = store.get_or_create("first")
+    store.get_or_create("second")
+    assert store.get_or_create("first") is first
+
+    store.get_or_create("third")
+    assert len(store) == 2
+    assert store.get_or_create("first") is first
+    assert store.delete("third")
+    assert not store.delete("second")    # 이미 밀려남
+
+
+def test_store_rejects_invalid_session_id():
+    with pytest.raises(InvalidSessionError):
+        SessionStore(maxsize=2).get_or_create("../etc")
+
+
+def test_active_session_outlives_ttl():
+    store = SessionStore(maxsize=4, ttl=0.05)
+    session = store.get_or_create("active")
+    idle = store.get_or_create("idle")
+
+    # 만든 지 TTL 이 지나도 턴마다 갱신된 session 은 유지
+    for _ in range(3):
+        time.sleep(0.03)
+        assert store.get_or_create("active") is session
+    assert store.get_or_create("idle") is not idle
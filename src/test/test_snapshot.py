@@ -0,0 +1,42 @@
+import numpy as np
+from services.snapshot import SnapshotIndex, read_snapshot, read_snapshot_metadata, write_snapshot
+
+
+def _rows(count, dimension, seed=0):
+    rng = np.random.default_rng(seed)
+    return [{
+        "id": f"doc_{i}",
+        "text": f"문서 {i}",
+        "metadata": {"source": "test", "n": i},
+        "embedding": rng.standard_normal(dimension).tolist()
+    } for i in range(count)]
+
+
+def test_snapshot_roundtrip(tmp_path):
+    path = str(tmp_path / "corpus.arrow")
+    rows = _rows(25, 8)
+
+    count = write_snapshot(path, [rows[:10], rows[10:]], dimension=8, metadata={"embedding_model": "m"})
+    restored = [row for batch in read_snapshot(path) for row in batch]
+
+    assert count == 25
+    assert read_snapshot_metadata(path)["embedding_model"] == "m"
+    assert [row["id"] for row in restored] == [row["id"] for row in rows]
+    assert restored[3]["metadata"] == {"source": "test", "n": 3}
+    # float16 저장 오차
+    np.testing.assert_allclose(restored[3]["embedding"], rows[3]["embedding"], rtol=1e-2, atol=1e-2)
+
+
+def test_snapshot_index_search(tmp_path):
+    path = str(tmp_path / "corpus.arrow")
+    rows = _rows(300, 16, seed=1)
+    write_snapshot(path, [rows[:100], rows[100:]], dimension=16)
+
+    index = SnapshotIndex(path, block_size=64)
+    results = index.search(rows[142]["embedding"], limit=3)
+    index.close()
+
+    assert len(index) == 300
+    assert results[0]["id"] == "doc_142"
+    assert results[0]["score"] > 0.99
+    assert results[0]["score"] >= results[1]["score"] >= results[2]["score"]
@@ -0,0 +1,77 @@
+from services.speculative import NgramProposer, estimate_acceptance, speculative_greedy_decode
+
+
+# 문서 (10 ~ 19) 를 그대로 옮겨 쓰는 "모델": 마지막 토큰 다음 문서 토큰, 문서 끝이면 EOS(0)
+DOCUMENT = list(range(10, 20))
+EOS = 0
+
+
+def next_token(tokens):
+    last = tokens[-1]
+    if last in DOCUMENT[:-1]:
+        return DOCUMENT[DOCUMENT.index(last) + 1]
+    if last == DOCUMENT[-1]:
+        return EOS
+    return DOCUMENT[0]
+
+
+def verify(tokens, draft):
+    # draft 의 각 위치에서 target 의 greedy 토큰 (한 번의 forward 로 검증)
+    target = []
+    for i in range(len(draft) + 1):
+        target.append(next_token(tokens + draft[:i]))
+    return target
+
+
+def greedy_decode(prompt, max_tokens):
+    tokens, generated = list(prompt), []
+    while len(generated) < max_tokens:
+        token = next_token(tokens)
+        tokens.append(token)
+        generated.append(token)
+        if token == EOS:
+            break
+    return generated
+
+
+def test_propose_copies_tokens_after_matching_ngram():
+    proposer = NgramProposer(num_speculative_tokens=3, max_ngram=3)
+
+    assert proposer.propose([1, 2, 3, 4, 5, 9, 2, 3]) == [4, 5, 9]
+    assert proposer.propose([7, 8, 9]) == []
+
+
+def test_propose_prefers_longest_then_most_recent_match():
+    proposer = NgramProposer(num_speculative_tokens=2, max_ngram=2)
+
+    # 2-gram (5, 6) 일치가 1-gram 보다 우선
+    assert proposer.propose([5, 6, 1, 6, 2, 5, 6]) == [1, 6]
+    # 1-gram 6 은 가장 최근 위치 뒤의 토큰을 제안
+    assert proposer.propose([6, 1, 6, 2, 3, 6]) == [2, 3]
+
+
+def test_speculative_output_matches_greedy_with_fewer_steps():
+    prompt = [1, 2] + DOCUMENT + [3, 4, 10]
+    proposer = NgramProposer(num_speculative_tokens=4, max_ngram=3)
+
+    result = speculative_greedy_decode(verify, prompt, max_tokens=20, proposer=proposer, eos_token_id=EOS)
+
+    assert result.token_ids == greedy_decode(prompt, 20)
+    assert result.steps < len(result.token_ids)
+    assert result.acceptance_rate > 0.5
+
+
+def test_max_tokens_is_respected():
+    prompt = DOCUMENT + [10]
+    proposer = NgramProposer(num_speculative_tokens=5)
+
+    result = speculative_greedy_decode(verify, prompt, max_tokens=3, proposer=proposer)
+
+    assert result.token_ids == [11, 12, 13]
+
+
+def test_estimate_acceptance():
+    # prefill 1 토큰 + decode 3 step 에 9 토큰 → draft 5 개 채택
+    assert estimate_acceptance(num_output_tokens=9, num_decode_steps=3, num_speculative_tokens=4) == (12, 5)
+    # speculation 없이 step 당 1 토큰
+    assert estimate_acceptance(num_output_tokens=4, num_decode_steps=3, num_speculative_tokens=4) == (12, 0)
@@ -0,0 +1,162 @@
+import asyncio
+import threading
+import time
+from types import SimpleNamespace
+
+import pytest
+
+import services.tenant as tenant_module
+from services.admission import AdmissionRejected
+from services.tenant import DEFAULT_TENANT, Tenant, TenantRegistry, UnknownTenantError
+
+
+class FakeCollection:
+    def __init__(self, name: str):
+        self.collection_name = name
+        self.loaded = False
+
+    def load(self):
+        self.loaded = True
+
+    def release(self):
+        self.loaded = False
+
+
+class FakeRegistry(TenantRegistry):
+    """ Milvus / 모델 없이 tenant 를 만드는 registry (생성 지연 / 횟수 기록) """
+
+    def __init__(self, create_delay: float = 0.0, **kwargs):
+        super().__init__(SimpleNamespace(model_name="fake-embedder"), llm_service=None, **kwargs)
+        self.create_delay = create_delay
+        self.created = []
+        self._created_lock = threading.Lock()
+
+
+    def _create(self, tenant_id: str) -> Tenant:
+        if tenant_id != DEFAULT_TENANT:
+            time.sleep(self.create_delay)
+        with self._created_lock:
+            self.created.append(tenant_id)
+        document_service = SimpleNamespace(
+            milvus_service=FakeCollection(self.collection_name(tenant_id)),
+            chunk_service=None, query_cache=None, text_cache=None, deduplicator=None
+        )
+        rag_chain = SimpleNamespace(answer_cache=None, session_store=None)
+        return Tenant(tenant_id, document_service, rag_chain)
+
+
+@pytest.fixture(autouse=True)
+def no_rate_limit(monkeypatch):
+    monkeypatch.setattr(tenant_module.CFG, "tenant_rate_limit", None, raising=False)
+
+
+def _registry(**kwargs) -> FakeRegistry:
+    kwargs.setdefault("max_loaded", 10)
+    kwargs.setdefault("idle_seconds", None)
+    kwargs.setdefault("max_tenants", 10)
+    kwargs.setdefault("allowed_tenants", None)
+    return FakeRegistry(**kwargs)
+
+
+def test_cold_tenant_does_not_block_other_tenants():
+    registry = _registry(create_delay=0.5)
+
+    async def scenario():
+        async with registry.use(None):
+            pass
+
+        async def use(tenant_id):
+            async with registry.use(tenant_id) as tenant:
+                return tenant, time.monotonic()
+
+        start = time.monotonic()
+        slow_a, slow_b, (_, default_done) = await asyncio.gather(use("slow"), use("slow"), use(None))
+        return slow_a[0], slow_b[0], default_done - start
+
+    slow_a, slow_b, default_latency = asyncio.run(scenario())
+    assert slow_a is slow_b
+    assert registry.created.count("slow") == 1
+    assert default_latency < 0.2
+
+
+def test_failed_creation_is_retried_by_next_request():
+    registry = _registry()
+    attempts = []
+    create = registry._create
+
+    def flaky_create(tenant_id):
+        attempts.append(tenant_id)
+        if len(attempts) == 1:
+            raise RuntimeError("milvus unavailable")
+        return create(tenant_id)
+
+    registry._create = flaky_create
+
+    async def scenario():
+        with pytest.raises(RuntimeError):
+            async with registry.use("a"):
+                pass
+        async with registry.use("a") as tenant:
+            return tenant
+
+    assert asyncio.run(scenario()).tenant_id == "a"
+    assert attempts == ["a", "a"]
+
+
+def test_registry_evicts_least_recently_used_idle_tenant():
+    registry = _registry(max_tenants=3)
+
+    async def scenario():
+        for tenant_id in (None, "a", "b", "c"):
+            async with registry.use(tenant_id):
+                pass
+        return registry.status()
+
+    status = asyncio.run(scenario())
+    assert list(status) == [DEFAULT_TENANT, "b", "c"]
+
+
+def test_registry_rejects_new_tenant_when_all_are_in_use():
+    registry = _registry(max_tenants=2)
+
+    async def scenario():
+        async with registry.use(None):
+            pass
+        async with registry.use("a") as tenant_a:
+            with pytest.raises(AdmissionRejected) as exc_info:
+                async with registry.use("b"):
+                    pass
+            assert tenant_a.loaded
+        return exc_info.value.status_code
+
+    assert asyncio.run(scenario()) == 503
+
+
+def test_rebuilding_tenant_is_not_released_or_evicted():
+    rebuilding = {TenantRegistry.collection_name("a")}
+    registry = _registry(max_tenants=3, max_loaded=1, idle_seconds=0.01, busy=lambda name: name in rebuilding)
+
+    async def scenario():
+        for tenant_id in (None, "a", "b"):
+            async with registry.use(tenant_id):
+                pass
+        await asyncio.sleep(0.02)
+        released = await registry.release_idle()
+        # a 는 재구축 중이라 b 가 대신 밀려난다
+        async with registry.use("c"):
+            pass
+        return released
+
+    released = asyncio.run(scenario())
+    assert released == ["b"]
+    assert list(registry.status()) == [DEFAULT_TENANT, "a", "c"]
+    assert registry.status()["a"]["loaded"]
+
+
+def test_allowed_tenants():
+    registry = _registry(allowed_tenants=["acme"])
+
+    assert registry.normalize("acme") == "acme"
+    assert registry.normalize(None) == DEFAULT_TENANT
+    with pytest.raises(UnknownTenantError):
+        registry.normalize("other")
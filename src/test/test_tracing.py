@@ -0,0 +1,71 @@
+import asyncio
+import json
+import os
+
+from services.profiler import profile_request
+from services.tracing import InMemorySpanExporter, JsonlSpanExporter, span, start_trace
+
+
+def test_span_is_noop_without_trace():
+    with span("rag.retrieve") as current:
+        assert current is None
+
+
+def test_nested_spans_across_tasks_and_threads():
+    exporter = InMemorySpanExporter()
+
+    def decode():
+        with span("llm.decode", requests=1) as current:
+            current.set_attribute("steps", 3)
+
+    async def run():
+        with start_trace("POST /rag/query", exporter) as root:
+            with span("rag.retrieve"):
+                await asyncio.gather(
+                    asyncio.create_task(asyncio.sleep(0)),
+                    asyncio.to_thread(decode)
+                )
+        return root
+
+    root = asyncio.run(run())
+    trace = exporter.traces[0]
+    spans = {s.name: s for s in trace.spans}
+
+    assert trace.trace_id == root.trace.trace_id
+    assert spans["rag.retrieve"].parent_id == root.span_id
+    assert spans["llm.decode"].parent_id == spans["rag.retrieve"].span_id
+    assert spans["llm.decode"].attributes == {"requests": 1, "steps": 3}
+    assert set(trace.breakdown()) == {"POST /rag/query", "rag.retrieve", "llm.decode"}
+
+
+def test_error_status_and_otlp_export(tmp_path):
+    path = os.path.join(tmp_path, "traces.jsonl")
+    exporter = JsonlSpanExporter(path)
+
+    try:
+        with start_trace("POST /llm/generate", exporter):
+            with span("llm.tokenize"):
+                raise ValueError("boom")
+    except ValueError:
+        pass
+
+    with open(path) as f:
+        record = json.loads(f.readline())
+
+    spans = record["resourceSpans"][0]["scopeSpans"][0]["spans"]
+    assert [s["name"] for s in spans] == ["POST /llm/generate", "llm.tokenize"]
+    assert len(spans[0]["traceId"]) == 32 and len(spans[1]["spanId"]) == 16
+    assert spans[1]["parentSpanId"] == spans[0]["spanId"]
+    assert spans[1]["status"] == {"code": 2, "message": "ValueError: boom"}
+
+
+def test_profile_request_writes_stats(tmp_path):
+    with profile_request(str(tmp_path), "trace-1", top_n=5) as profile:
+        sum(i * i for i in range(10000))
+
+        # 동시에 두 번째 profiling 은 켜지지 않는다
+        with profile_request(str(tmp_path), "trace-2") as nested:
+            assert nested is None
+
+    assert os.path.exists(profile.path)
+    assert "cumulative" in profile.summary
@@ -0,0 +1,75 @@
+import itertools
+from types import SimpleNamespace
+
+import pytest
+
+import services.vllm as vllm_module
+from services.vllm import VLLMService
+
+
+@pytest.fixture
+def engine_config(monkeypatch):
+    def configure(prefix_caching=False, speculative_mode=None):
+        monkeypatch.setattr(vllm_module.CFG, "enable_prefix_caching", prefix_caching, raising=False)
+        monkeypatch.setattr(vllm_module.CFG, "speculative_mode", speculative_mode, raising=False)
+        monkeypatch.setattr(vllm_module.CFG, "num_speculative_tokens", 4, raising=False)
+        monkeypatch.setattr(vllm_module.CFG, "ngram_prompt_lookup_max", 4, raising=False)
+        monkeypatch.setattr(vllm_module.CFG, "ngram_prompt_lookup_min", 1, raising=False)
+    return configure
+
+
+def test_default_engine_runs_on_pinned_vllm(engine_config):
+    engine_config()
+
+    assert VLLMService._engine_kwargs("0.2.5") == {}
+
+
+@pytest.mark.parametrize("prefix_caching, speculative_mode, message", [
+    (True, None, "CFG.enable_prefix_caching requires vLLM >= 0.4.0"),
+    (False, "ngram", "CFG.speculative_mode requires vLLM >= 0.4.2"),
+])
+def test_unsupported_engine_options_fail_at_startup(engine_config, prefix_caching, speculative_mode, message):
+    engine_config(prefix_caching, speculative_mode)
+
+    with pytest.raises(ValueError, match=message):
+        VLLMService._engine_kwargs("0.2.5")
+
+
+def test_engine_options_on_supported_vllm(engine_config):
+    engine_config(True, "ngram")
+
+    kwargs = VLLMService._engine_kwargs("0.4.2")
+    assert kwargs["enable_prefix_caching"] is True and kwargs["speculative_model"] == "[ngram]"
+
+
+class FailingEngine:
+    """ 요청 추가는 받고 step 에서 실패하는 llm_engine """
+
+    def __init__(self):
+        self.requests = set()
+
+
+    def add_request(self, request_id, prompt, params, prompt_token_ids=None):
+        self.requests.add(request_id)
+
+
+    def has_unfinished_requests(self):
+        return bool(self.requests)
+
+
+    def step(self):
+        raise RuntimeError("CUDA error")
+
+
+    def abort_request(self, request_ids):
+        self.requests.difference_update(request_ids)
+
+
+def test_step_failure_aborts_added_requests():
+    engine = FailingEngine()
+    service = SimpleNamespace(_vllm_engine=SimpleNamespace(llm_engine=engine, request_counter=itertools.count()))
+
+    with pytest.raises(RuntimeError):
+        VLLMService._step_requests(service, [[1, 2], [3]], [None, None])
+    # 실패한 호출의 요청이 남아 다음 호출의 step 에 섞이지 않는다
+    assert not engine.has_unfinished_requests()
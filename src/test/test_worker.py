@@ -0,0 +1,76 @@
+import asyncio
+import importlib
+
+import pytest
+from fastapi.testclient import TestClient
+
+import services.vllm as vllm_module
+from services.vllm import GenerationParams, TokenLimitError, VLLMService
+
+
+class StubVLLMService(VLLMService):
+    """ 엔진 없이 검증 로직만 쓰는 VLLMService (생성까지 가면 엔진 장애로 실패) """
+
+    _instance = None
+
+    def __init__(self):
+        # VLLMService.__init__ (토크나이저 / 엔진 로드) 를 건너뛰고 pydantic 필드만 채운다
+        super(VLLMService, self).__init__(model_name="stub", max_input_tokens=8, max_tokens=16)
+        self._stop_token_ids = None
+
+
+    def _tokenize_batch(self, prompts):
+        return [prompt.split() for prompt in prompts]
+
+
+    def _prompt_token_limit(self, sampling_params):
+        return self.max_input_tokens
+
+
+    async def _generate(self, prompt_token_ids, sampling_params):
+        raise RuntimeError("engine is down")
+
+
+    def kv_cache_usage(self):
+        return 0.0
+
+
+    def scheduler_status(self):
+        return {}
+
+
+@pytest.fixture
+def client(monkeypatch):
+    # worker 는 import 시점에 VLLMService 를 만든다
+    monkeypatch.setattr(vllm_module, "VLLMService", StubVLLMService)
+    import router.worker as worker_module
+    worker_module = importlib.reload(worker_module)
+    return TestClient(worker_module.app)
+
+
+@pytest.mark.parametrize("path, payload", [
+    ("/generate", {"prompt": "   "}),                                                  # 빈 프롬프트
+    ("/generate", {"prompt": "q", "params": {"top_k": -5}}),                           # SamplingParams 검증
+    ("/generate", {"prompt": "a b c d e f g h i j"}),                                  # 토큰 한도 초과
+    ("/generate_batch", {"prompts": ["a", "b"], "params": [None]}),                    # 파라미터 개수
+    ("/generate_batch", {"prompts": ["a"], "params": [{"top_k": -5}]}),
+])
+def test_invalid_requests_are_client_errors(client, path, payload):
+    response = client.post(path, json=payload)
+
+    assert response.status_code == 400
+
+
+def test_engine_failure_is_server_error(client):
+    response = client.post("/generate", json={"prompt": "q"})
+
+    assert response.status_code == 500
+
+
+def test_service_keeps_request_errors_unwrapped():
+    service = StubVLLMService()
+
+    with pytest.raises(TokenLimitError):
+        asyncio.run(service._call("a b c d e f g h i j"))
+    with pytest.raises(ValueError):
+        asyncio.run(service.agenerate(["a", "b"], [GenerationParams()]))